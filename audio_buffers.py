@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+零拷贝音频读取
+音频读入预分配、可复用的 int16 NumPy 缓冲区（文件用 readinto，套接字用 recv_into，
+环形缓冲区用 RingBuffer.readinto），再把 memoryview 切片直接交给识别器，
+稳定运行时每个音频块不再分配新的 bytes 对象
+
+注意：交出去的 memoryview 指向同一块缓冲区，下一次读取会覆盖其内容，需要保留数据的地方要自行 bytes() 复制
+"""
+
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# (WAV编码, 位数) -> 采样格式名，与 resampler.SAMPLE_FORMATS 一致
+WAV_SAMPLE_FORMATS = {(WAVE_FORMAT_PCM, 16): "int16", (WAVE_FORMAT_IEEE_FLOAT, 32): "float32"}
+SAMPLE_WIDTHS = {"int16": 2, "float32": 4}
+
+# (KaldiRecognizer, C库, ffi)，首次送入 memoryview 时才导入 vosk，不影响启动耗时
+_vosk_binding = None
+
+
+class ChunkBuffer:
+    """预分配的 int16 音频块缓冲区"""
+
+    def __init__(self, chunk_frames: int, channels: int = 1):
+        """
+        初始化缓冲区
+
+        Args:
+            chunk_frames (int): 每块帧数
+            channels (int): 声道数
+        """
+        import numpy as np
+
+        self.chunk_frames = chunk_frames
+        self.channels = channels
+        self.samples = np.zeros(chunk_frames * channels, dtype=np.int16)
+        # 按字节寻址的视图，len() 为字节数，与 bytes 一致
+        self.view = memoryview(self.samples).cast('B')
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.view)
+
+    def readinto(self, reader) -> memoryview:
+        """
+        从文件对象读满一块（文件末尾时可能不足一块）
+
+        Args:
+            reader: 支持 readinto() 的二进制文件对象
+
+        Returns:
+            memoryview: 已填充部分的视图，读到末尾时长度为0
+        """
+        filled = 0
+        view = self.view
+        while filled < len(view):
+            n = reader.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        return view[:filled]
+
+    def recv_into(self, sock, nbytes: Optional[int] = None) -> memoryview:
+        """
+        从套接字接收恰好 nbytes 字节
+
+        Args:
+            sock (socket.socket): 套接字
+            nbytes (Optional[int]): 接收字节数，默认一整块
+
+        Returns:
+            memoryview: 已填充部分的视图
+        """
+        nbytes = len(self.view) if nbytes is None else nbytes
+        filled = 0
+        view = self.view
+        while filled < nbytes:
+            n = sock.recv_into(view[filled:nbytes])
+            if not n:
+                raise ConnectionError("连接已关闭")
+            filled += n
+        return view[:nbytes]
+
+
+def accept_waveform(recognizer, data) -> bool:
+    """
+    把音频送入识别器；Vosk 的 KaldiRecognizer 只接受 bytes，这里对 memoryview 用 cffi 直接传指针，不复制
+
+    Args:
+        recognizer: KaldiRecognizer 或接口一致的识别器
+        data: bytes 或 memoryview
+
+    Returns:
+        bool: 检测到句尾返回True
+    """
+    global _vosk_binding
+    if isinstance(data, memoryview):
+        if _vosk_binding is None:
+            try:
+                import vosk
+                _vosk_binding = (vosk.KaldiRecognizer, vosk._c, vosk._ffi)
+            except (ImportError, AttributeError):
+                _vosk_binding = (None, None, None)
+        recognizer_class, lib, ffi = _vosk_binding
+        if recognizer_class is not None and type(recognizer) is recognizer_class:
+            result = lib.vosk_recognizer_accept_waveform(recognizer._handle, ffi.from_buffer(data), len(data))
+            if result < 0:
+                raise Exception("Failed to process waveform")
+            return result != 0
+    return recognizer.AcceptWaveform(data)
+
+
+def read_wav_header(f) -> Tuple[int, int, int, int, str]:
+    """
+    解析WAV头，找到PCM数据的位置和采样格式
+
+    Args:
+        f: 以二进制方式打开、位于文件开头的文件对象
+
+    Returns:
+        tuple: (数据起始偏移, 数据字节数, 采样率, 声道数, 采样格式 int16/float32)
+    """
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("不是有效的WAV文件")
+    rate = channels = bits = fmt = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV文件缺少数据块")
+        chunk_id, size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            body = f.read(size)
+            fmt, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if fmt == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # 扩展格式的真实编码在子格式GUID的前两个字节
+                fmt = struct.unpack("<H", body[24:26])[0]
+        elif chunk_id == b"data":
+            sample_format = WAV_SAMPLE_FORMATS.get((fmt, bits))
+            if sample_format is None:
+                raise ValueError("仅支持16位PCM或32位浮点格式的WAV文件")
+            return f.tell(), size, rate, channels, sample_format
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def wav_data_offset(f) -> Tuple[int, int, int, int]:
+    """
+    解析16位PCM格式WAV的文件头，找到PCM数据的位置
+
+    Args:
+        f: 以二进制方式打开、位于文件开头的文件对象
+
+    Returns:
+        tuple: (数据起始偏移, 数据字节数, 采样率, 声道数)
+    """
+    offset, size, rate, channels, sample_format = read_wav_header(f)
+    if sample_format != "int16":
+        raise ValueError("仅支持16位PCM格式的WAV文件")
+    return offset, size, rate, channels
+
+
+def open_raw_audio(path: str, sample_rate: int = 16000, channels: int = 1, sample_format: str = "int16"):
+    """
+    以原始二进制方式打开任意格式的音频文件并定位到采样数据，格式转换由 resampler.py 负责
+
+    Args:
+        path (str): WAV或裸PCM文件路径
+        sample_rate (int): 裸PCM文件的采样率
+        channels (int): 裸PCM文件的声道数
+        sample_format (str): 裸PCM文件的采样格式（int16 或 float32）
+
+    Returns:
+        tuple: (文件对象, 采样率, 声道数, 采样格式, 总帧数)
+    """
+    f = open(path, 'rb', buffering=0)
+    try:
+        if path.lower().endswith('.wav'):
+            offset, size, sample_rate, channels, sample_format = read_wav_header(f)
+            size = min(size, os.path.getsize(path) - offset)
+            f.seek(offset)
+        else:
+            size = os.path.getsize(path)
+        frame_bytes = SAMPLE_WIDTHS[sample_format] * channels
+        return f, sample_rate, channels, sample_format, size // frame_bytes
+    except Exception:
+        f.close()
+        raise
+
+
+def open_pcm(path: str, sample_rate: int = 16000):
+    """
+    以原始二进制方式打开音频文件并定位到PCM数据，供 ChunkBuffer.readinto 使用
+
+    Args:
+        path (str): WAV或裸PCM（16位单声道）文件路径
+        sample_rate (int): 裸PCM文件的采样率
+
+    Returns:
+        tuple: (文件对象, 采样率, 总帧数)
+    """
+    f, rate, channels, sample_format, total_frames = open_raw_audio(path, sample_rate)
+    if channels != 1 or sample_format != "int16":
+        f.close()
+        raise ValueError("仅支持16位单声道PCM格式的WAV文件")
+    return f, rate, total_frames
+
+
+def iter_chunks(reader, chunk_frames: int, limit_frames: Optional[int] = None,
+                frame_bytes: int = 2) -> Iterator[memoryview]:
+    """
+    从文件逐块读取音频，所有块复用同一个缓冲区
+
+    Args:
+        reader: 支持 readinto() 的二进制文件对象
+        chunk_frames (int): 每块帧数
+        limit_frames (Optional[int]): 最多读取的帧数（WAV数据块之后可能还有其他块）
+        frame_bytes (int): 每帧字节数，多声道或 float32 音频交给重采样器前按原始字节读取
+
+    Yields:
+        memoryview: 当前块的视图，下一次迭代时内容会被覆盖
+    """
+    buffer = ChunkBuffer(chunk_frames * frame_bytes // 2)
+    remaining = None if limit_frames is None else limit_frames * frame_bytes
+    while remaining is None or remaining > 0:
+        data = buffer.readinto(reader)
+        if remaining is not None:
+            data = data[:remaining]
+            remaining -= len(data)
+        if not data:
+            break
+        yield data
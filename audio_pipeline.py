@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频采集与解码解耦的生产者/消费者管线
+PyAudio回调线程把音频写入预分配的环形缓冲区，独立的解码线程从中取数据调用识别器，
+解码暂时变慢时音频在缓冲区中排队而不会丢失
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+class RingBuffer:
+    """预分配的字节环形缓冲区（单生产者/单消费者）"""
+
+    def __init__(self, capacity: int):
+        """
+        初始化环形缓冲区
+
+        Args:
+            capacity (int): 缓冲区容量（字节）
+        """
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._read_pos = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.total_written = 0
+        self.total_read = 0
+        self.overruns = 0
+        self.dropped_bytes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes) -> bool:
+        """
+        写入数据，空间不足时整块丢弃并计入溢出次数（回调线程中不能阻塞）
+
+        Args:
+            data (bytes): 音频数据
+
+        Returns:
+            bool: 写入成功返回True，溢出返回False
+        """
+        n = len(data)
+        with self._cond:
+            if n > self.capacity - self._size:
+                self.overruns += 1
+                self.dropped_bytes += n
+                return False
+            start = (self._read_pos + self._size) % self.capacity
+            first = min(n, self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            if first < n:
+                self._view[:n - first] = data[first:]
+            self._size += n
+            self.total_written += n
+            self._cond.notify()
+            return True
+
+    def read(self, n: int, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        读取恰好n字节，数据不足时等待；缓冲区关闭后返回剩余数据
+
+        Args:
+            n (int): 读取字节数
+            timeout (Optional[float]): 最长等待秒数
+
+        Returns:
+            Optional[bytes]: 读取的数据，超时返回None，关闭且已读空时返回b""
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size >= n or self._closed, timeout):
+                return None
+            n = min(n, self._size)
+            start = self._read_pos
+            first = min(n, self.capacity - start)
+            data = bytes(self._view[start:start + first])
+            if first < n:
+                data += bytes(self._view[:n - first])
+            self._read_pos = (start + n) % self.capacity
+            self._size -= n
+            self.total_read += n
+            return data
+
+    def readinto(self, out: memoryview, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        读取恰好 len(out) 字节到调用方预分配的缓冲区，不创建新的 bytes 对象；缓冲区关闭后读取剩余数据
+
+        Args:
+            out (memoryview): 可写的目标缓冲区
+            timeout (Optional[float]): 最长等待秒数
+
+        Returns:
+            Optional[int]: 读取的字节数，超时返回None，关闭且已读空时返回0
+        """
+        n = len(out)
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size >= n or self._closed, timeout):
+                return None
+            n = min(n, self._size)
+            start = self._read_pos
+            first = min(n, self.capacity - start)
+            out[:first] = self._view[start:start + first]
+            if first < n:
+                out[first:n] = self._view[:n - first]
+            self._read_pos = (start + n) % self.capacity
+            self._size -= n
+            self.total_read += n
+            return n
+
+    def close(self):
+        """
+        关闭缓冲区，唤醒等待中的读取方
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class AudioPipeline:
+    """采集线程 -> 环形缓冲区 -> 解码线程"""
+
+    def __init__(self, sample_rate: int = 16000, chunk_frames: int = 4096,
+                 frames_per_buffer: int = 1024, buffer_seconds: float = 10.0):
+        """
+        初始化音频管线
+
+        Args:
+            sample_rate (int): 音频采样率
+            chunk_frames (int): 解码线程每次送入识别器的帧数
+            frames_per_buffer (int): PyAudio回调每次交付的帧数
+            buffer_seconds (float): 环形缓冲区能容纳的音频时长
+        """
+        self.sample_rate = sample_rate
+        self.chunk_frames = chunk_frames
+        self.frames_per_buffer = frames_per_buffer
+        self.ring = RingBuffer(int(sample_rate * buffer_seconds) * 2)
+        # 解码线程取音频块的函数，启用指标时替换为计时版本（见 metrics.RecognitionMetrics.bind_pipeline）
+        self.read_chunk = self.ring.readinto
+        # (写入结束位置, 采集时刻)，用于计算端到端延迟
+        self._capture_marks = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.error: Optional[BaseException] = None
+        self.input_overflows = 0
+        self.chunks = 0
+        self.max_depth = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def callback(self, in_data, frame_count, time_info, status):
+        """
+        PyAudio回调：只做一次内存拷贝，立即返回
+        """
+        import pyaudio
+
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if self.ring.write(in_data):
+            self._capture_marks.append((self.ring.total_written, time.monotonic()))
+        return (None, pyaudio.paContinue)
+
+    def open_stream(self, audio):
+        """
+        以回调模式打开输入流
+
+        Args:
+            audio (pyaudio.PyAudio): PyAudio实例
+
+        Returns:
+            pyaudio.Stream: 已打开的音频流
+        """
+        import pyaudio
+
+        return audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self.callback
+        )
+
+    def start(self, process_chunk: Callable[[memoryview], None]):
+        """
+        启动解码线程
+
+        Args:
+            process_chunk: 处理一个音频块的函数，在解码线程中调用；
+                传入的是复用缓冲区的 memoryview，需要保留数据时要自行复制
+        """
+        self._running = True
+        self._thread = threading.Thread(target=self._decode_loop, args=(process_chunk,),
+                                        name="decoder", daemon=True)
+        self._thread.start()
+
+    def _decode_loop(self, process_chunk: Callable[[memoryview], None]):
+        # 所有音频块复用同一块缓冲区，稳定运行时解码线程不再分配内存
+        chunk = memoryview(bytearray(self.chunk_frames * 2))
+        read_chunk = self.read_chunk
+        try:
+            while self._running:
+                depth = len(self.ring)
+                if depth > self.max_depth:
+                    self.max_depth = depth
+                n = read_chunk(chunk, 0.5)
+                if n is None:
+                    continue
+                if not n:
+                    break
+                process_chunk(chunk[:n])
+                self._record_latency()
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._running = False
+
+    def _record_latency(self):
+        # 取出已被完全消费的采集标记，最后一个即本块末尾样本的采集时刻
+        consumed = self.ring.total_read
+        captured_at = None
+        while self._capture_marks and self._capture_marks[0][0] <= consumed:
+            captured_at = self._capture_marks.popleft()[1]
+        self.chunks += 1
+        if captured_at is not None:
+            latency = time.monotonic() - captured_at
+            self.latency_sum += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+
+    def is_running(self) -> bool:
+        """
+        解码线程是否仍在运行
+        """
+        return self._running
+
+    def stop(self, timeout: float = 2.0):
+        """
+        停止管线：关闭缓冲区，等待解码线程处理完剩余音频
+        """
+        self.ring.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._running = False
+
+    def stats(self) -> dict:
+        """
+        获取管线统计信息
+
+        Returns:
+            dict: 溢出次数、队列深度和端到端延迟等计数器
+        """
+        bytes_per_second = self.sample_rate * 2
+        return {
+            "chunks": self.chunks,
+            "ring_overruns": self.ring.overruns,
+            "dropped_seconds": round(self.ring.dropped_bytes / bytes_per_second, 3),
+            "input_overflows": self.input_overflows,
+            "queue_depth_seconds": round(len(self.ring) / bytes_per_second, 3),
+            "max_queue_depth_seconds": round(self.max_depth / bytes_per_second, 3),
+            "avg_latency_ms": round(self.latency_sum / self.chunks * 1000, 1) if self.chunks else 0.0,
+            "max_latency_ms": round(self.latency_max * 1000, 1),
+        }
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线批量转写程序
+使用进程池并行转写录音文件（WAV/PCM），每个工作进程只加载一次Vosk模型，
+结果以JSONL格式逐条输出，并附带每个文件的实时率(RTF)
+采样率、声道数或采样格式（float32）与模型不一致的文件先经过 resampler.py 流式转换再送入识别器
+指定 --words-dir 时每个文件的词级时间戳和置信度逐句写出为 JSONL/SRT/WebVTT（见 word_export.py）
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import multiprocessing
+from typing import Iterator, List, Optional
+
+from audio_buffers import SAMPLE_WIDTHS, accept_waveform, iter_chunks, open_raw_audio
+
+# 每个工作进程各自持有一份模型，在进程初始化时加载，之后所有文件复用
+_worker_model = None
+# 模型加载失败时的错误信息，由任务函数报告
+_worker_model_error = None
+_worker_sample_rate = 16000
+_worker_chunk_frames = 4000
+_worker_model_rate = 16000
+_worker_raw_format = (1, "int16")
+# ({文件路径: 导出前缀}, 格式列表)，None表示不导出词级结果
+_worker_word_export = None
+
+AUDIO_EXTENSIONS = ('.wav', '.pcm', '.raw')
+
+
+def load_worker_model(model_path: str):
+    """
+    在工作进程初始化函数中加载模型
+
+    初始化函数抛出异常时 multiprocessing.Pool 会不断重建工作进程，任务永远不会完成，
+    所以这里捕获异常并返回错误信息，由任务函数报告
+
+    Args:
+        model_path (str): Vosk模型路径
+
+    Returns:
+        tuple: (模型, 错误信息)，加载成功时错误信息为None
+    """
+    try:
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        return Model(model_path), None
+    except Exception as e:
+        return None, f"模型加载失败: {e}"
+
+
+def check_model(model_path: str) -> Optional[str]:
+    """
+    在创建进程池之前检查模型目录：不存在，或与完整性清单不符
+
+    Returns:
+        Optional[str]: 错误信息，没有发现问题时为None
+    """
+    from model_manifest import validate_model
+
+    if not os.path.isdir(model_path):
+        return f"模型路径 '{model_path}' 不存在！"
+    problems = validate_model(model_path)
+    if problems:
+        return f"模型文件与清单不符: {'; '.join(problems[:5])}"
+    return None
+
+
+def _init_worker(model_path: str, sample_rate: int, chunk_frames: int, model_rate: int = 16000,
+                 channels: int = 1, sample_format: str = "int16", word_export=None):
+    """
+    工作进程初始化：加载一次Vosk模型
+
+    Args:
+        model_path (str): Vosk模型路径
+        sample_rate (int): PCM文件的采样率（WAV文件以文件头为准）
+        chunk_frames (int): 每次送入识别器的帧数
+        model_rate (int): 识别器的采样率，其他采样率的音频先重采样到这个采样率
+        channels (int): PCM文件的声道数（WAV文件以文件头为准）
+        sample_format (str): PCM文件的采样格式（WAV文件以文件头为准）
+        word_export (Optional[tuple]): ({文件路径: 导出前缀}, 格式列表)，导出词级时间戳和置信度
+    """
+    global _worker_model, _worker_sample_rate, _worker_chunk_frames, _worker_model_rate, _worker_raw_format
+    global _worker_word_export, _worker_model_error
+    _worker_model, _worker_model_error = load_worker_model(model_path)
+    _worker_sample_rate = sample_rate
+    _worker_chunk_frames = chunk_frames
+    _worker_model_rate = model_rate
+    _worker_raw_format = (channels, sample_format)
+    _worker_word_export = word_export
+
+
+def open_audio(path: str, sample_rate: int = 16000):
+    """
+    打开音频文件
+
+    Args:
+        path (str): WAV或裸PCM（16位单声道）文件路径
+        sample_rate (int): 裸PCM文件的采样率
+
+    Returns:
+        tuple: (文件对象, 按帧数读取的函数, 采样率, 总帧数)
+    """
+    if path.lower().endswith('.wav'):
+        wf = wave.open(path, 'rb')
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != 'NONE':
+            wf.close()
+            raise ValueError("仅支持16位单声道PCM格式的WAV文件")
+        return wf, wf.readframes, wf.getframerate(), wf.getnframes()
+
+    f = open(path, 'rb')
+    total_frames = os.path.getsize(path) // 2
+    return f, lambda n: f.read(n * 2), sample_rate, total_frames
+
+
+def transcribe_file(path: str) -> dict:
+    """
+    在工作进程中转写单个文件
+
+    Args:
+        path (str): 音频文件路径
+
+    Returns:
+        dict: 转写结果，包含文本、音频时长、解码耗时和实时率
+    """
+    from vosk import KaldiRecognizer
+    from resampler import make_resampler
+
+    record = {"file": path}
+    if _worker_model_error:
+        record["error"] = _worker_model_error
+        return record
+    start = time.perf_counter()
+    exporter = None
+    try:
+        # 音频读入复用的缓冲区后以 memoryview 直接送入识别器，每块不再分配新的 bytes
+        channels, sample_format = _worker_raw_format
+        audio, rate, channels, sample_format, total_frames = open_raw_audio(
+            path, _worker_sample_rate, channels, sample_format)
+        with audio:
+            resampler = make_resampler(rate, _worker_model_rate, channels, sample_format)
+            recognizer = KaldiRecognizer(_worker_model, _worker_model_rate)
+            if _worker_word_export:
+                from word_export import WordExporter
+                prefixes, formats = _worker_word_export
+                recognizer.SetWords(True)
+                exporter = WordExporter(prefixes[path], formats)
+            texts = []
+
+            def collect(raw):
+                result = json.loads(raw)
+                if result.get('text'):
+                    texts.append(result['text'])
+                if exporter is not None:
+                    exporter.add_result(result)
+
+            def feed(data):
+                if accept_waveform(recognizer, data):
+                    collect(recognizer.Result())
+
+            for data in iter_chunks(audio, _worker_chunk_frames, total_frames,
+                                    SAMPLE_WIDTHS[sample_format] * channels):
+                feed(resampler.process(data) if resampler else data)
+            if resampler:
+                feed(resampler.flush())
+                record["converted_from"] = f"{rate}Hz/{channels}ch/{sample_format}"
+            collect(recognizer.FinalResult())
+    except Exception as e:
+        record["error"] = str(e)
+        return record
+    finally:
+        if exporter is not None:
+            word_stats = exporter.close()
+
+    decode_time = time.perf_counter() - start
+    duration = total_frames / float(rate) if rate else 0.0
+    record["text"] = " ".join(texts)
+    record["duration"] = round(duration, 3)
+    record["decode_time"] = round(decode_time, 3)
+    record["rtf"] = round(decode_time / duration, 4) if duration > 0 else None
+    if exporter is not None:
+        record["confidence"] = word_stats
+        record["word_files"] = exporter.paths
+    return record
+
+
+def collect_audio_files(inputs: List[str]) -> List[str]:
+    """
+    展开输入参数中的目录，收集所有音频文件
+
+    Args:
+        inputs (List[str]): 文件或目录路径列表
+
+    Returns:
+        List[str]: 排序后的音频文件路径列表
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                for name in names:
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        files.append(os.path.join(root, name))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            print(f"警告：跳过不存在的路径: {item}", file=sys.stderr)
+    return sorted(files)
+
+
+def transcribe_files(paths: List[str], model_path: str = "model", processes: Optional[int] = None,
+                     sample_rate: int = 16000, chunk_frames: int = 4000, model_rate: int = 16000,
+                     channels: int = 1, sample_format: str = "int16", word_export=None) -> Iterator[dict]:
+    """
+    使用进程池并行转写多个文件，结果按完成顺序逐条返回
+
+    Args:
+        paths (List[str]): 音频文件路径列表
+        model_path (str): Vosk模型路径
+        processes (Optional[int]): 工作进程数，默认为CPU核心数
+        sample_rate (int): 裸PCM文件的采样率
+        chunk_frames (int): 每次送入识别器的帧数
+        model_rate (int): 识别器的采样率
+        channels (int): 裸PCM文件的声道数
+        sample_format (str): 裸PCM文件的采样格式
+        word_export (Optional[tuple]): (输出目录, 格式列表)，导出每个文件的词级时间戳和置信度
+
+    Yields:
+        dict: 每个文件的转写结果
+    """
+    if not paths:
+        return
+    processes = min(processes or os.cpu_count() or 1, len(paths))
+    if word_export:
+        from word_export import output_prefixes
+        # 导出文件名在分发任务前统一确定，并行的工作进程不会写到同一个文件
+        words_dir, formats = word_export
+        word_export = (output_prefixes(paths, words_dir), formats)
+    with multiprocessing.Pool(processes, initializer=_init_worker,
+                              initargs=(model_path, sample_rate, chunk_frames, model_rate,
+                                        channels, sample_format, word_export)) as pool:
+        for record in pool.imap_unordered(transcribe_file, paths, chunksize=1):
+            yield record
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 离线批量转写")
+    parser.add_argument("inputs", nargs="+", help="音频文件或目录（WAV/PCM）")
+    parser.add_argument("-m", "--model", default="model", help="Vosk模型路径 (默认: model)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="工作进程数 (默认: CPU核心数)")
+    parser.add_argument("-o", "--output", default=None, help="JSONL输出文件 (默认: 标准输出)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="裸PCM文件的采样率 (默认: 16000)")
+    parser.add_argument("--chunk-frames", type=int, default=4000, help="每次送入识别器的帧数 (默认: 4000)")
+    parser.add_argument("--channels", type=int, default=1, help="裸PCM文件的声道数 (默认: 1)")
+    parser.add_argument("--sample-format", choices=["int16", "float32"], default="int16",
+                        help="裸PCM文件的采样格式 (默认: int16)")
+    parser.add_argument("--model-rate", type=int, default=16000,
+                        help="模型采样率，其他采样率、多声道或float32的音频先转换 (默认: 16000)")
+    parser.add_argument("--words-dir", default=None,
+                        help="词级时间戳和置信度的输出目录，按输入的相对路径写出 <文件名>.jsonl/.srt/.vtt")
+    parser.add_argument("--word-formats", default="jsonl,srt,vtt",
+                        help="词级导出格式，逗号分隔 (默认: jsonl,srt,vtt)")
+    args = parser.parse_args()
+
+    error = check_model(args.model)
+    if error:
+        print(f"错误：{error}", file=sys.stderr)
+        return 1
+
+    files = collect_audio_files(args.inputs)
+    if not files:
+        print("错误：未找到任何音频文件", file=sys.stderr)
+        return 1
+
+    word_export = None
+    if args.words_dir:
+        from word_export import EXPORT_FORMATS
+        formats = [name.strip() for name in args.word_formats.split(",") if name.strip()]
+        unknown = set(formats) - set(EXPORT_FORMATS)
+        if unknown:
+            print(f"错误：不支持的导出格式: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 1
+        word_export = (args.words_dir, formats)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total_audio = 0.0
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for record in transcribe_files(files, args.model, args.jobs, args.sample_rate, args.chunk_frames,
+                                       args.model_rate, args.channels, args.sample_format, word_export):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if "error" in record:
+                failed += 1
+            else:
+                total_audio += record["duration"]
+    except KeyboardInterrupt:
+        print("\n用户中断转写", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    wall = time.perf_counter() - start
+    print(f"完成 {len(files)} 个文件 (失败 {failed} 个)，音频总时长 {total_audio:.1f}s，"
+          f"耗时 {wall:.1f}s，整体速度 {total_audio / wall if wall > 0 else 0:.1f}x 实时", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+可复现的语音识别基准测试
+按识别程序使用的块大小（4000/4096帧）把语料中的WAV文件送入KaldiRecognizer，
+统计实时率、首个部分结果延迟、端点后完整结果延迟、峰值内存和字错误率(CER)，
+并输出JSON便于跟踪回归
+
+语料目录中每个 xxx.wav 可附带同名的 xxx.txt 作为参考文本
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_transcription import collect_audio_files, open_audio
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    当前进程的峰值常驻内存（MB），不支持的平台返回None
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def normalize_text(text: str) -> str:
+    """
+    去掉空白，按字符计算中文错误率
+    """
+    return "".join(text.split())
+
+
+def edit_distance(ref: str, hyp: str) -> int:
+    """
+    计算两个字符串的编辑距离
+    """
+    if len(ref) < len(hyp):
+        ref, hyp = hyp, ref
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1]
+
+
+def character_error_rate(ref: str, hyp: str) -> Optional[float]:
+    """
+    计算字错误率，参考文本为空时返回None
+    """
+    ref, hyp = normalize_text(ref), normalize_text(hyp)
+    if not ref:
+        return None
+    return edit_distance(ref, hyp) / len(ref)
+
+
+def load_reference(path: str) -> Optional[str]:
+    """
+    读取音频文件同名的参考文本
+    """
+    ref_path = os.path.splitext(path)[0] + ".txt"
+    if not os.path.exists(ref_path):
+        return None
+    with open(ref_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def benchmark_file(model, path: str, chunk_frames: int, sample_rate: int = 16000) -> dict:
+    """
+    以流式方式识别一个文件并记录各项指标
+
+    延迟均以"音频时钟 + 计算耗时"计算，与机器负载无关的部分可复现：
+    - 首个部分结果延迟 = 出现首个非空部分结果时已送入的音频位置 - 首词开始时间 + 该块的解码耗时
+    - 完整结果延迟 = 返回完整结果时已送入的音频位置 - 该句末词结束时间 + 该块的解码耗时
+
+    Args:
+        model: 已加载的vosk.Model
+        path (str): 音频文件路径
+        chunk_frames (int): 每次送入识别器的帧数
+        sample_rate (int): 裸PCM文件的采样率
+
+    Returns:
+        dict: 单个文件的指标
+    """
+    from vosk import KaldiRecognizer
+
+    audio, read_frames, rate, total_frames = open_audio(path, sample_rate)
+    recognizer = KaldiRecognizer(model, rate)
+    recognizer.SetWords(True)
+
+    texts = []
+    first_word_start = None
+    first_partial_pos = None
+    first_partial_compute = None
+    final_latencies = []
+    fed_frames = 0
+    decode_time = 0.0
+
+    def on_result(result: dict, pos: float, compute: float):
+        nonlocal first_word_start
+        words = result.get('result') or []
+        if result.get('text'):
+            texts.append(result['text'])
+        if words:
+            if first_word_start is None:
+                first_word_start = words[0]['start']
+            final_latencies.append(max(0.0, pos - words[-1]['end']) + compute)
+
+    with audio:
+        while True:
+            data = read_frames(chunk_frames)
+            if not data:
+                break
+            fed_frames += len(data) // 2
+            pos = fed_frames / rate
+            start = time.perf_counter()
+            if recognizer.AcceptWaveform(data):
+                result = json.loads(recognizer.Result())
+                compute = time.perf_counter() - start
+                on_result(result, pos, compute)
+            else:
+                partial = json.loads(recognizer.PartialResult())
+                compute = time.perf_counter() - start
+                if partial.get('partial') and first_partial_pos is None:
+                    first_partial_pos = pos
+                    first_partial_compute = compute
+            decode_time += compute
+        start = time.perf_counter()
+        result = json.loads(recognizer.FinalResult())
+        compute = time.perf_counter() - start
+        decode_time += compute
+        on_result(result, fed_frames / rate, compute)
+
+    duration = total_frames / float(rate)
+    hypothesis = " ".join(texts)
+    reference = load_reference(path)
+    record = {
+        "file": os.path.relpath(path, ROOT) if path.startswith(ROOT) else path,
+        "duration": round(duration, 3),
+        "decode_time": round(decode_time, 4),
+        "rtf": round(decode_time / duration, 4) if duration else None,
+        "first_partial_latency": None,
+        "final_latency_mean": None,
+        "final_latency_max": None,
+        "utterances": len(final_latencies),
+        "hypothesis": hypothesis,
+        "reference": reference,
+        "cer": None,
+    }
+    if first_partial_pos is not None and first_word_start is not None:
+        record["first_partial_latency"] = round(max(0.0, first_partial_pos - first_word_start) + first_partial_compute, 4)
+    if final_latencies:
+        record["final_latency_mean"] = round(sum(final_latencies) / len(final_latencies), 4)
+        record["final_latency_max"] = round(max(final_latencies), 4)
+    if reference is not None:
+        cer = character_error_rate(reference, hypothesis)
+        record["cer"] = round(cer, 4) if cer is not None else None
+    return record
+
+
+def summarize(records: List[dict]) -> dict:
+    """
+    汇总所有文件的指标
+    """
+    ok = [r for r in records if "error" not in r]
+    audio = sum(r["duration"] for r in ok)
+    decode = sum(r["decode_time"] for r in ok)
+    first = [r["first_partial_latency"] for r in ok if r["first_partial_latency"] is not None]
+    finals = [r["final_latency_mean"] for r in ok if r["final_latency_mean"] is not None]
+    # CER按字符数加权
+    ref_chars = 0
+    errors = 0
+    for r in ok:
+        if r["cer"] is not None:
+            n = len(normalize_text(r["reference"]))
+            ref_chars += n
+            errors += r["cer"] * n
+    return {
+        "files": len(records),
+        "failed": len(records) - len(ok),
+        "audio_seconds": round(audio, 3),
+        "decode_seconds": round(decode, 3),
+        "rtf": round(decode / audio, 4) if audio else None,
+        "first_partial_latency_p50": _percentile(first, 0.5),
+        "first_partial_latency_p95": _percentile(first, 0.95),
+        "final_latency_p50": _percentile(finals, 0.5),
+        "final_latency_p95": _percentile(finals, 0.95),
+        "cer": round(errors / ref_chars, 4) if ref_chars else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_benchmark(model_path: str, files: List[str], chunk_sizes: List[int], sample_rate: int = 16000,
+                  model=None) -> dict:
+    """
+    对每种块大小运行一遍语料
+
+    Args:
+        model_path (str): Vosk模型路径
+        files (List[str]): 音频文件列表
+        chunk_sizes (List[int]): 要测试的块大小（帧）
+        sample_rate (int): 裸PCM文件的采样率
+        model: 已加载的vosk.Model，提供时不再加载
+
+    Returns:
+        dict: 完整的基准测试报告
+    """
+    import vosk
+
+    load_time = None
+    if model is None:
+        vosk.SetLogLevel(-1)
+        start = time.perf_counter()
+        model = vosk.Model(model_path)
+        load_time = time.perf_counter() - start
+
+    runs = []
+    for chunk_frames in chunk_sizes:
+        records = []
+        for path in files:
+            try:
+                records.append(benchmark_file(model, path, chunk_frames, sample_rate))
+            except Exception as e:
+                records.append({"file": path, "error": str(e)})
+        runs.append({"chunk_frames": chunk_frames, "summary": summarize(records), "files": records})
+
+    return {
+        "model": model_path,
+        "model_load_seconds": round(load_time, 3) if load_time is not None else None,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "vosk": getattr(vosk, "__version__", None),
+        },
+        "runs": runs,
+    }
+
+
+def record_rtf(report: dict):
+    """
+    把实时率最低的一组块大小的结果记录到模型注册表
+    """
+    from model_registry import get_registry
+
+    runs = [run for run in report["runs"] if run["summary"]["rtf"] is not None]
+    if not runs:
+        return
+    best = min(runs, key=lambda run: run["summary"]["rtf"])
+    summary = best["summary"]
+    registry = get_registry(os.path.join(ROOT, "models"))
+    registry.record_benchmark(report["model"], summary["rtf"], chunk_frames=best["chunk_frames"], cer=summary["cer"],
+                              audio_seconds=summary["audio_seconds"], cpu_count=report["environment"]["cpu_count"])
+    print(f"已记录到模型注册表: RTF {summary['rtf']} (chunk={best['chunk_frames']})", file=sys.stderr)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 语音识别基准测试")
+    parser.add_argument("corpus", nargs="+",
+                        help="WAV/PCM文件或目录，同名 .txt 为参考文本")
+    parser.add_argument("-m", "--model", default=os.path.join(ROOT, "model"), help="Vosk模型路径 (默认: 内置 model/)")
+    parser.add_argument("--chunk-frames", type=int, nargs="+", default=[4000, 4096],
+                        help="测试的块大小 (默认: 4000 4096)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="裸PCM文件的采样率 (默认: 16000)")
+    parser.add_argument("-o", "--output", default=None, help="JSON报告输出文件 (默认: 标准输出)")
+    parser.add_argument("--record", action="store_true",
+                        help="把测得的实时率记录到模型注册表（models/index.json），选择模型时可参考")
+    args = parser.parse_args()
+
+    files = collect_audio_files(args.corpus)
+    if not files:
+        print("错误：未找到任何音频文件", file=sys.stderr)
+        return 1
+
+    report = run_benchmark(args.model, files, args.chunk_frames, args.sample_rate)
+    if args.record:
+        record_rtf(report)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        for run in report["runs"]:
+            print(f"chunk={run['chunk_frames']}: {json.dumps(run['summary'], ensure_ascii=False)}")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型解压基准测试
+生成一个结构类似Vosk模型的zip（几个大文件加若干小文件），对比 ZipFile.extractall 与
+download_model.extract_model 的并行解压耗时，并测量按清单快速校验和重新计算哈希校验的耗时
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from download_model import extract_model
+from model_manifest import validate_model
+
+# (成员名, 大小MB)，比例参考 vosk-model-cn-0.22
+LAYOUT = [
+    ("graph/HCLG.fst", 0.45),
+    ("graph/Gr.fst", 0.25),
+    ("am/final.mdl", 0.15),
+    ("rescore/G.carpa", 0.1),
+    ("ivector/final.ie", 0.03),
+    ("graph/words.txt", 0.01),
+    ("conf/model.conf", 0.0),
+    ("ivector/global_cmvn.stats", 0.0),
+]
+
+
+def make_model_zip(path: str, total_mb: int):
+    """
+    生成测试用的模型zip：内容为量化噪声，压缩率与真实模型文件相近
+    """
+    rng = np.random.default_rng(0)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, fraction in LAYOUT:
+            size = max(1024, int(total_mb * fraction * 1024 * 1024))
+            data = (rng.standard_normal(size) * 8).astype(np.int8).tobytes()
+            zf.writestr(f"vosk-model-bench/{name}", data)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="模型解压基准测试")
+    parser.add_argument("--size-mb", type=int, default=400, help="解压后模型的总大小（MB）")
+    parser.add_argument("--workers", type=int, default=None, help="解压线程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "vosk-model-bench.zip")
+        make_model_zip(zip_path, args.size_mb)
+
+        serial_dir = os.path.join(tmp, "serial")
+        start = time.perf_counter()
+        with zipfile.ZipFile(zip_path) as zf:
+            zf.extractall(serial_dir)
+        serial = time.perf_counter() - start
+        shutil.rmtree(serial_dir)
+
+        parallel_dir = os.path.join(tmp, "parallel")
+        start = time.perf_counter()
+        extract_model(zip_path, parallel_dir, workers=args.workers)
+        parallel = time.perf_counter() - start
+
+        model_dir = os.path.join(parallel_dir, "vosk-model-bench")
+        start = time.perf_counter()
+        problems = validate_model(model_dir)
+        quick = time.perf_counter() - start
+        start = time.perf_counter()
+        validate_model(model_dir, deep=True)
+        deep = time.perf_counter() - start
+
+    report = {
+        "size_mb": args.size_mb,
+        "extractall_seconds": round(serial, 3),
+        "parallel_seconds": round(parallel, 3),
+        "speedup": round(serial / parallel, 2),
+        "validate_ms": round(quick * 1000, 2),
+        "validate_deep_seconds": round(deep, 3),
+        "valid": problems == [],
+    }
+    print(f"extractall: {serial:.2f} 秒, 并行解压（含哈希和清单）: {parallel:.2f} 秒, {serial / parallel:.2f}x")
+    print(f"按清单校验: {quick * 1000:.2f} ms, 重新计算哈希: {deep:.2f} 秒")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
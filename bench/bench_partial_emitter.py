@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部分结果发送器基准测试
+把语料按识别程序的块大小送入KaldiRecognizer，对比原来每个块都调用 PartialResult() 并打印整句的方式
+与 PartialEmitter 节流+增量方式，统计每分钟音频节省的解码器调用次数和输出字节数
+"""
+
+import os
+import sys
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_transcription import collect_audio_files, open_audio
+from partial_emitter import PartialEmitter
+
+
+def replay(model, path: str, chunk_frames: int, emitter: PartialEmitter, sample_rate: int = 16000) -> dict:
+    """
+    以原来的方式识别一个文件，同时把同样的部分结果交给发送器
+
+    Returns:
+        dict: 原方式的部分结果调用次数和输出字节数
+    """
+    from vosk import KaldiRecognizer
+
+    audio, read_frames, rate, _ = open_audio(path, sample_rate)
+    recognizer = KaldiRecognizer(model, rate)
+    emitter.sample_rate = rate
+    calls = 0
+    printed = 0
+    with audio:
+        while True:
+            data = read_frames(chunk_frames)
+            if not data:
+                break
+            if recognizer.AcceptWaveform(data):
+                emitter.final(json.loads(recognizer.Result())['text'])
+                continue
+            # 原方式每个块都调用并解析；基准需要完整的假设序列，节流只影响发送器的统计
+            raw = recognizer.PartialResult()
+            calls += 1
+            printed += len(raw.encode("utf-8"))
+            if emitter.poll_due(len(data)):
+                emitter.update(json.loads(raw)['partial'])
+        emitter.final(json.loads(recognizer.FinalResult())['text'])
+    return {"calls": calls, "bytes": printed}
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="部分结果发送器基准测试")
+    parser.add_argument("corpus", nargs="+",
+                        help="WAV/PCM文件或目录")
+    parser.add_argument("-m", "--model", default=os.path.join(ROOT, "model"), help="Vosk模型路径 (默认: 内置 model/)")
+    parser.add_argument("--chunk-frames", type=int, default=4096, help="块大小 (默认: 4096)")
+    parser.add_argument("--interval", type=float, nargs="+", default=[0.0, 0.25, 0.5, 1.0],
+                        help="测试的最小查询间隔（秒） (默认: 0 0.25 0.5 1.0)")
+    args = parser.parse_args()
+
+    files = collect_audio_files(args.corpus)
+    if not files:
+        print("错误：未找到任何音频文件", file=sys.stderr)
+        return 1
+
+    import vosk
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+
+    for interval in args.interval:
+        emitter = PartialEmitter(interval)
+        calls = 0
+        printed = 0
+        for path in files:
+            baseline = replay(model, path, args.chunk_frames, emitter)
+            calls += baseline["calls"]
+            printed += baseline["bytes"]
+        stats = emitter.stats()
+        minutes = stats["audio_seconds"] / 60.0 or 1.0
+        report = {
+            "interval": interval,
+            "audio_seconds": stats["audio_seconds"],
+            "baseline_calls_per_minute": round(calls / minutes, 1),
+            "emitter_calls_per_minute": round(stats["partial_polls"] / minutes, 1),
+            "baseline_bytes_per_minute": round(printed / minutes, 1),
+            "emitter_bytes_per_minute": round(stats["emitted_bytes"] / minutes, 1),
+            "unchanged_suppressed": stats["unchanged"],
+        }
+        print(json.dumps(report, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分段并行转写基准测试
+把语料中的录音（间隔1秒静音）拼接成一个长录音，先整段串行解码，再按不同进程数分段并行解码，
+报告墙钟耗时、相对串行的加速比，以及分段结果相对串行结果和参考文本的字错误率(CER)
+"""
+
+import os
+import sys
+import json
+import wave
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from audio_buffers import open_pcm
+from batch_transcription import collect_audio_files
+from segmented_transcription import transcribe_long_file
+from bench.asr_benchmark import character_error_rate, load_reference
+
+
+def _cer(ref, hyp):
+    value = character_error_rate(ref, hyp) if ref else None
+    return round(value, 4) if value is not None else None
+
+
+def build_long_recording(files, path: str, minutes: float, sample_rate: int = 16000):
+    """
+    循环拼接语料直到达到指定时长
+
+    Returns:
+        Optional[str]: 拼接后的参考文本，有文件缺少参考文本时为None
+    """
+    gap = bytes(sample_rate * 2)
+    target = int(minutes * 60 * sample_rate * 2)
+    written = 0
+    references = []
+    with wave.open(path, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        while written < target:
+            for name in files:
+                f, rate, frames = open_pcm(name)
+                with f:
+                    if rate != sample_rate:
+                        continue
+                    data = f.read(frames * 2)
+                out.writeframes(data + gap)
+                written += len(data) + len(gap)
+                references.append(load_reference(name))
+                if written >= target:
+                    break
+            if not references:
+                raise ValueError(f"语料中没有 {sample_rate} Hz 的16位单声道录音")
+    return None if None in references else " ".join(references)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="分段并行转写基准测试")
+    parser.add_argument("corpus", nargs="+",
+                        help="WAV文件或目录，同名 .txt 为参考文本")
+    parser.add_argument("-m", "--model", default=os.path.join(ROOT, "model"), help="Vosk模型路径 (默认: 内置 model/)")
+    parser.add_argument("--minutes", type=float, default=10.0, help="拼接后的录音时长（分钟）(默认: 10)")
+    parser.add_argument("--jobs", type=int, nargs="+", default=None, help="测试的进程数 (默认: 2 4 ... CPU核心数)")
+    parser.add_argument("--segment-seconds", type=float, default=60.0, help="目标段长（秒）(默认: 60)")
+    args = parser.parse_args()
+
+    files = collect_audio_files(args.corpus)
+    if not files:
+        print("错误：未找到任何音频文件", file=sys.stderr)
+        return 1
+    cpus = os.cpu_count() or 1
+    jobs = args.jobs or sorted({n for n in (2, 4, 8, 16) if n < cpus} | {cpus})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "long.wav")
+        reference = build_long_recording(files, path, args.minutes)
+        # 段长大于录音时长时只有一段，即整段串行解码
+        serial = transcribe_long_file(path, args.model, 1, segment_seconds=args.minutes * 120)
+        runs = []
+        for n in jobs:
+            record = transcribe_long_file(path, args.model, n, args.segment_seconds)
+            runs.append({
+                "processes": n,
+                "segments": record["segments"],
+                "wall_time": record["wall_time"],
+                "speedup_vs_serial": round(serial["wall_time"] / record["wall_time"], 2),
+                "cer_vs_serial": _cer(serial["text"], record["text"]),
+                "cer": _cer(reference, record["text"]),
+            })
+            print(f"{n:>3} 进程: {record['segments']} 段, {record['wall_time']:.1f}s, "
+                  f"加速 {runs[-1]['speedup_vs_serial']}x, 相对串行 CER {runs[-1]['cer_vs_serial']}", file=sys.stderr)
+
+    report = {
+        "model": args.model,
+        "audio_seconds": serial["duration"],
+        "cpu_count": cpus,
+        "serial": {"wall_time": serial["wall_time"],
+                   "cer": _cer(reference, serial["text"])},
+        "runs": runs,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自定义词汇匹配基准测试
+对比原来的列表逐词扫描 [word for word in words if word in text] 与 VocabMatcher 自动机索引
+"""
+
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vocab_matcher import VocabMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_words(path: str):
+    """
+    读取词汇表文件
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def synthetic_vocab(base, size: int, seed: int = 0):
+    """
+    以真实词汇的字符集合成指定规模的词汇表
+    """
+    rng = random.Random(seed)
+    chars = sorted({ch for word in base for ch in word})
+    vocab = list(dict.fromkeys(base))
+    seen = set(vocab)
+    while len(vocab) < size:
+        word = ''.join(rng.choices(chars, k=rng.randint(2, 6)))
+        if word not in seen:
+            seen.add(word)
+            vocab.append(word)
+    return vocab
+
+
+def make_texts(vocab, count: int, seed: int = 1):
+    """
+    生成模拟识别结果：若干词汇与随机字符拼接
+    """
+    rng = random.Random(seed)
+    filler = "请把温度调一下的了吗呢好"
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(2, 5)):
+            parts.append(rng.choice(vocab))
+            parts.append(''.join(rng.choices(filler, k=rng.randint(0, 3))))
+        texts.append(''.join(parts))
+    return texts
+
+
+def bench(func, texts, repeat: int = 3) -> float:
+    """
+    返回每句文本的最佳平均耗时（秒）
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts)
+
+
+def main():
+    """
+    主函数
+    """
+    base = load_words(os.path.join(ROOT, "split_words.txt"))
+    report = []
+    for size in (len(base), 5000, 20000):
+        vocab = synthetic_vocab(base, size)
+        texts = make_texts(vocab, 500)
+
+        start = time.perf_counter()
+        matcher = VocabMatcher(vocab)
+        build = time.perf_counter() - start
+
+        scan = bench(lambda text: [word for word in vocab if word in text], texts)
+        indexed = bench(matcher.find, texts)
+        report.append({
+            "vocab_size": size,
+            "build_ms": round(build * 1000, 2),
+            "list_scan_us": round(scan * 1e6, 2),
+            "matcher_us": round(indexed * 1e6, 2),
+            "speedup": round(scan / indexed, 1),
+        })
+        print(f"词汇量 {size:>6}: 列表扫描 {scan * 1e6:9.1f} us/句, "
+              f"自动机 {indexed * 1e6:7.1f} us/句, 加速 {scan / indexed:6.1f}x, 构建 {build * 1000:.1f} ms")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词级导出基准测试
+用合成的识别结果模拟长录音（每秒约3个词，每句10个词），测量：
+- JSONL 写出速度：word_export 的格式串写法与逐词 json.dumps 对比，并检查两者解析后内容一致
+- 内存：录音时长增加10倍时导出过程的内存峰值不变
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_export import WordExporter
+
+WORDS = ["你好", "万和", "热水器", "调到", "三十五度", "开启", "AI节能模式", "零冷水", "预热", "关闭"]
+
+
+def make_results(hours: float):
+    """
+    逐句生成与 KaldiRecognizer.Result() 相同格式的JSON字符串
+    """
+    rng = random.Random(0)
+    t = 0.0
+    end_time = hours * 3600
+    while t < end_time:
+        words = []
+        for _ in range(10):
+            duration = rng.uniform(0.2, 0.4)
+            words.append({"conf": round(rng.uniform(0.3, 1.0), 6), "end": round(t + duration, 2),
+                          "start": round(t, 2), "word": rng.choice(WORDS)})
+            t += duration
+        t += 0.5
+        yield json.dumps({"result": words, "text": " ".join(w["word"] for w in words)}, ensure_ascii=False)
+
+
+def export(results, prefix: str, formats) -> int:
+    with WordExporter(prefix, formats) as exporter:
+        return sum(exporter.add_result(raw) for raw in results)
+
+
+def export_json_dumps(results, path: str) -> int:
+    """对照组：逐词 json.dumps"""
+    count = 0
+    with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+        for index, raw in enumerate(results):
+            for w in json.loads(raw).get("result", ()):
+                f.write(json.dumps({"word": w["word"], "start": w["start"], "end": w["end"],
+                                    "conf": w["conf"], "utt": index}, ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+
+def main():
+    """
+    主函数
+    """
+    results = list(make_results(2.0))
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # 两种写法都包含 json.loads 解析识别结果，差别只在编码输出
+        start = time.perf_counter()
+        words = export(results, os.path.join(tmp, "fast"), ["jsonl"])
+        fast = time.perf_counter() - start
+        start = time.perf_counter()
+        export_json_dumps(results, os.path.join(tmp, "dumps.jsonl"))
+        dumps = time.perf_counter() - start
+        with open(os.path.join(tmp, "fast.jsonl"), encoding='utf-8') as a, \
+                open(os.path.join(tmp, "dumps.jsonl"), encoding='utf-8') as b:
+            same = all(abs(x[k] - y[k]) < 1e-3 if isinstance(x[k], float) else x[k] == y[k]
+                       for x, y in zip(map(json.loads, a), map(json.loads, b)) for k in x)
+
+        start = time.perf_counter()
+        export(results, os.path.join(tmp, "all"), ["jsonl", "srt", "vtt"])
+        all_formats = time.perf_counter() - start
+
+        peaks = {}
+        for hours in (1.0, 10.0):
+            tracemalloc.start()
+            export(make_results(hours), os.path.join(tmp, f"mem{hours}"), ["jsonl", "srt", "vtt"])
+            peaks[hours] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    report = {
+        "words": words,
+        "jsonl_words_per_second": round(words / fast),
+        "json_dumps_words_per_second": round(words / dumps),
+        "speedup": round(dumps / fast, 2),
+        "same_content": same,
+        "all_formats_words_per_second": round(words / all_formats),
+        "peak_kb_1h": round(peaks[1.0] / 1024, 1),
+        "peak_kb_10h": round(peaks[10.0] / 1024, 1),
+    }
+    print(f"2小时录音 {words} 个词: JSONL {words / fast:,.0f} 词/秒, 逐词 json.dumps {words / dumps:,.0f} 词/秒 "
+          f"({dumps / fast:.2f}x), 内容一致: {'是' if same else '否'}")
+    print(f"三种格式同时写出: {words / all_formats:,.0f} 词/秒")
+    print(f"内存峰值: 1小时 {peaks[1.0] / 1024:.1f} KB, 10小时 {peaks[10.0] / 1024:.1f} KB")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+块大小与解码/端点参数自动调优
+在录制好的语料上遍历 chunk_frames、beam、max-active 和端点静音时长，
+输出 延迟 / CER / CPU 三个目标上的帕累托前沿，并把选中的配置写成识别程序可加载的profile
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import itertools
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_transcription import collect_audio_files
+from recognition_profile import prepare_model_dir, save_profile
+from bench.asr_benchmark import run_benchmark
+
+OBJECTIVES = ("latency", "cer", "cpu")
+INF = float("inf")
+
+
+def endpoint_overrides(silence: float) -> Dict[str, float]:
+    """
+    以rule2的静音时长为基准，按模型默认的 1:2:4 比例设置rule2/3/4
+    """
+    return {
+        "endpoint.rule2.min-trailing-silence": silence,
+        "endpoint.rule3.min-trailing-silence": round(silence * 2, 3),
+        "endpoint.rule4.min-trailing-silence": round(silence * 4, 3),
+    }
+
+
+def dominates(a: dict, b: dict) -> bool:
+    """
+    a 在所有目标上不差于 b 且至少一个目标更好
+    """
+    return all(a[k] <= b[k] for k in OBJECTIVES) and any(a[k] < b[k] for k in OBJECTIVES)
+
+
+def pareto_front(points: List[dict]) -> List[dict]:
+    """
+    计算帕累托前沿（所有目标越小越好）
+    """
+    return [p for p in points if not any(dominates(q, p) for q in points if q is not p)]
+
+
+def choose(front: List[dict], weights: Dict[str, float]) -> dict:
+    """
+    按归一化后的加权和从前沿中选出一个配置
+    """
+    spans = {}
+    for k in OBJECTIVES:
+        # 所有点都缺失的目标（如语料没有参考文本时的CER）不参与选择
+        values = [p[k] for p in front if p[k] != INF]
+        if values:
+            spans[k] = (min(values), (max(values) - min(values)) or 1.0)
+    return min(front, key=lambda p: sum(weights.get(k, 1.0) * (p[k] - low) / span
+                                        for k, (low, span) in spans.items()))
+
+
+def _jsonable(point: dict) -> dict:
+    """
+    把缺失目标的无穷大转换为null，保证输出为标准JSON
+    """
+    return {k: (None if v == INF else v) for k, v in point.items()}
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """
+    解析 "cer=2,latency=1,cpu=0.5" 形式的权重
+    """
+    weights = {}
+    for item in filter(None, text.split(',')):
+        key, value = item.split('=', 1)
+        if key not in OBJECTIVES:
+            raise ValueError(f"未知的目标: {key}")
+        weights[key] = float(value)
+    return weights
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 块大小与端点参数调优")
+    parser.add_argument("corpus", nargs="+", help="WAV/PCM文件或目录，同名 .txt 为参考文本")
+    parser.add_argument("-m", "--model", default=os.path.join(ROOT, "model"), help="Vosk模型路径 (默认: 内置 model/)")
+    parser.add_argument("--chunk-frames", type=int, nargs="+", default=[2000, 4000, 4096, 8000])
+    parser.add_argument("--beam", type=float, nargs="+", default=[8.0, 10.0, 12.0])
+    parser.add_argument("--max-active", type=int, nargs="+", default=[2000, 5000])
+    parser.add_argument("--silence", type=float, nargs="+", default=[0.3, 0.5, 0.8],
+                        help="rule2最短尾部静音秒数，rule3/4按1:2:4比例设置 (默认: 0.3 0.5 0.8)")
+    parser.add_argument("--weights", default="cer=1,latency=1,cpu=1", help="从前沿中选择配置时各目标的权重")
+    parser.add_argument("-o", "--output", default=None, help="完整调优报告JSON输出文件 (默认: 标准输出)")
+    parser.add_argument("--profile-out", default=os.path.join(ROOT, "profiles", "tuned.json"),
+                        help="选中配置的输出路径 (默认: profiles/tuned.json)")
+    args = parser.parse_args()
+
+    import vosk
+    vosk.SetLogLevel(-1)
+
+    files = collect_audio_files(args.corpus)
+    if not files:
+        print("错误：未找到任何音频文件", file=sys.stderr)
+        return 1
+    weights = parse_weights(args.weights)
+
+    points = []
+    grid = list(itertools.product(args.beam, args.max_active, args.silence))
+    for index, (beam, max_active, silence) in enumerate(grid, 1):
+        overrides = {"beam": beam, "max-active": max_active}
+        overrides.update(endpoint_overrides(silence))
+        model_dir = prepare_model_dir(args.model, overrides)
+        print(f"[{index}/{len(grid)}] beam={beam} max-active={max_active} silence={silence}", file=sys.stderr)
+        model = vosk.Model(model_dir)
+        for chunk_frames in args.chunk_frames:
+            cpu_start = time.process_time()
+            report = run_benchmark(model_dir, files, [chunk_frames], model=model)
+            cpu = time.process_time() - cpu_start
+            summary = report["runs"][0]["summary"]
+            latency = summary["final_latency_p50"]
+            points.append({
+                "chunk_frames": chunk_frames,
+                "model_conf": overrides,
+                # 没有完整结果或参考文本时以无穷大计，不会进入前沿
+                "latency": latency if latency is not None else INF,
+                "cer": summary["cer"] if summary["cer"] is not None else INF,
+                "cpu": round(cpu / summary["audio_seconds"], 4) if summary["audio_seconds"] else INF,
+                "summary": summary,
+            })
+        del model
+        gc.collect()
+
+    front = pareto_front(points)
+    selected = choose(front, weights)
+    profile = {
+        "chunk_frames": selected["chunk_frames"],
+        "model_conf": selected["model_conf"],
+        "metrics": _jsonable({k: selected[k] for k in OBJECTIVES}),
+        "tuned_on": {"model": args.model, "files": len(files), "weights": weights},
+    }
+    save_profile(args.profile_out, profile)
+
+    report = {
+        "points": [_jsonable(p) for p in points],
+        "pareto_front": [points.index(p) for p in front],
+        "selected": points.index(selected),
+        "profile": args.profile_out,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    print("\n帕累托前沿 (latency 秒 / CER / CPU 秒每音频秒):", file=sys.stderr)
+    for p in sorted(front, key=lambda p: p["latency"]):
+        mark = " <- 选中" if p is selected else ""
+        print(f"  chunk={p['chunk_frames']:<5} beam={p['model_conf']['beam']:<5} "
+              f"max-active={p['model_conf']['max-active']:<5} "
+              f"silence={p['model_conf']['endpoint.rule2.min-trailing-silence']:<4} "
+              f"latency={p['latency']} cer={p['cer']} cpu={p['cpu']}{mark}", file=sys.stderr)
+    print(f"已写入配置: {args.profile_out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别结果的意图/槽位提取
+把完整识别结果转换为结构化指令，例如 "调到三十五度" -> {"intent": "set", "action": "调到", "slots": {"temperature": 35}}
+
+匹配表在初始化时由词汇表生成并预编译：
+- 动作词：分类规则中的动作词，加上词汇表中 "<动词><数字>度" 形式词汇的动词部分（如 往上调、调低），
+  按其中的方向字判定为升高/降低/设置
+- 查询词：词汇表中包含查询标记的词汇（如 温度多少、模式是什么）
+- 功能名：classify_words 分出的长功能词（如 节能功能、零冷水模式）
+动作词和功能名各用一个 VocabMatcher 自动机匹配，数量槽位用一个预编译正则，中文数字先归一化为阿拉伯数字
+
+也可以批量处理日志：python command_parser.py transcripts.jsonl -o commands.jsonl
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from typing import Dict, Iterable, List, Optional
+
+from grammar_cache import GRAMMAR_RULES, classify_words
+from vocab_matcher import VocabMatcher
+
+NLU_RULES = {
+    "action_intents": {
+        "开": "turn_on", "开启": "turn_on", "启动": "turn_on",
+        "关": "turn_off", "关闭": "turn_off", "停止": "turn_off",
+        "设置": "set", "调到": "set",
+    },
+    "increase_markers": "上升高增提加大强",
+    "decrease_markers": "下降低减小弱",
+    "query_markers": ["多少", "几", "什么", "查"],
+    "quantity_slots": {"度": "temperature", "档": "level", "分钟": "minutes", "小时": "hours"},
+    # 只说出功能名（如 "节能模式"）时视为开启该功能
+    "function_intent": "turn_on",
+}
+
+_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4,
+           "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_UNITS = {"十": 10, "百": 100, "千": 1000}
+_NUMERAL_CHARS = "".join(_DIGITS) + "".join(_UNITS) + "万"
+_UNIT_PATTERN = "|".join(sorted(map(re.escape, NLU_RULES["quantity_slots"]), key=len, reverse=True))
+# 只归一化后面紧跟数量单位的数字，避免把 "一下"、"一键" 之类的词改掉
+_NUMBER_RE = re.compile(f"[{_NUMERAL_CHARS}0-9]+(?={_UNIT_PATTERN})")
+_QUANTITY_RE = re.compile(f"([0-9]+)({_UNIT_PATTERN})")
+_TEMPERATURE_VERB_RE = re.compile(
+    f"^([^{_NUMERAL_CHARS}0-9]+)[{_NUMERAL_CHARS}0-9]+{re.escape(GRAMMAR_RULES['temperature_marker'])}$")
+
+
+def chinese_to_int(text: str) -> Optional[int]:
+    """
+    把中文数字转换为整数，支持 三十五、十五、一百零五、两千 以及阿拉伯数字
+
+    Args:
+        text (str): 数字文本
+
+    Returns:
+        Optional[int]: 转换结果，无法识别时返回None
+    """
+    if text.isdigit():
+        return int(text)
+    total = 0
+    section = 0
+    number = 0
+    for ch in text:
+        if ch in _DIGITS:
+            number = _DIGITS[ch]
+        elif ch in _UNITS:
+            # "十五" 省略了前面的 "一"
+            if number == 0 and ch == "十":
+                number = 1
+            section += number * _UNITS[ch]
+            number = 0
+        elif ch == "万":
+            total += (section + number) * 10000
+            section = 0
+            number = 0
+        else:
+            return None
+    return total + section + number
+
+
+def normalize_numbers(text: str) -> str:
+    """
+    去掉识别结果中的空格，并把数量单位前的中文数字替换为阿拉伯数字
+
+    Args:
+        text (str): 识别文本
+
+    Returns:
+        str: 归一化后的文本
+    """
+    text = "".join(text.split())
+
+    def replace(match):
+        value = chinese_to_int(match.group(0))
+        return match.group(0) if value is None else str(value)
+
+    return _NUMBER_RE.sub(replace, text)
+
+
+def _direction_intent(verb: str) -> str:
+    """
+    按动词中的方向字判断意图
+    """
+    if any(ch in NLU_RULES["increase_markers"] for ch in verb):
+        return "increase"
+    if any(ch in NLU_RULES["decrease_markers"] for ch in verb):
+        return "decrease"
+    return "set"
+
+
+class CommandParser:
+    """由词汇表生成匹配表的指令解析器"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        """
+        初始化解析器并预编译匹配表
+
+        Args:
+            words (Iterable[str]): 自定义词汇表
+        """
+        words = list(dict.fromkeys(words))
+        self.intents: Dict[str, str] = {}
+        for action in GRAMMAR_RULES["actions"]:
+            self.intents[action] = NLU_RULES["action_intents"].get(action, "set")
+        queries = set()
+        for word in words:
+            match = _TEMPERATURE_VERB_RE.match(normalize_numbers(word))
+            if match:
+                self.intents.setdefault(match.group(1), _direction_intent(match.group(1)))
+            elif any(marker in word for marker in NLU_RULES["query_markers"]):
+                self.intents.setdefault(word, "query")
+                queries.add(word)
+        self.keywords = VocabMatcher(self.intents)
+        # "模式是什么" 之类的查询句不是功能名
+        self.functions = VocabMatcher(w for w in classify_words(words)["long_functions"] if w not in queries)
+
+    def parse(self, text: str) -> Optional[dict]:
+        """
+        解析一条识别结果
+
+        Args:
+            text (str): 识别文本
+
+        Returns:
+            Optional[dict]: {"intent", "action", "slots", "text"}，没有识别出任何意图或槽位时返回None
+        """
+        text = normalize_numbers(text)
+        if not text:
+            return None
+
+        slots = {}
+        for value, unit in _QUANTITY_RE.findall(text):
+            slots.setdefault(NLU_RULES["quantity_slots"][unit], int(value))
+        functions = self.functions.find(text)
+        if functions:
+            slots["function"] = functions[0][2]
+
+        intent = None
+        action = None
+        for _, _, keyword in self.keywords.find(text):
+            # 查询优先：如 "调到多少度了" 是询问而不是设置
+            if self.intents[keyword] == "query":
+                intent, action = "query", keyword
+                break
+            if intent is None:
+                intent, action = self.intents[keyword], keyword
+        if intent is None:
+            if "function" in slots:
+                intent = NLU_RULES["function_intent"]
+            elif slots:
+                intent = "set"
+            else:
+                return None
+        return {"intent": intent, "action": action, "slots": slots, "text": text}
+
+    def parse_many(self, texts: Iterable[str]) -> List[Optional[dict]]:
+        """
+        批量解析
+
+        Args:
+            texts (Iterable[str]): 识别文本
+
+        Returns:
+            List[Optional[dict]]: 与输入一一对应的解析结果
+        """
+        parse = self.parse
+        return [parse(text) for text in texts]
+
+
+def load_parser(vocab_file: str) -> CommandParser:
+    """
+    由词汇表文件创建解析器
+
+    Args:
+        vocab_file (str): 词汇表文件路径
+
+    Returns:
+        CommandParser: 解析器
+    """
+    with open(vocab_file, 'r', encoding='utf-8') as f:
+        return CommandParser(line.strip() for line in f if line.strip())
+
+
+def _iter_texts(paths: List[str]):
+    """
+    逐行读取日志：JSON行取 text 字段（batch_transcription.py 的输出），其他行按纯文本处理
+    """
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+        with stream:
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("{"):
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        yield None, line
+                        continue
+                    yield record, record.get("text", "")
+                else:
+                    yield None, line
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="识别结果意图/槽位批量提取")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="识别日志（JSONL或纯文本，- 表示标准输入）")
+    parser.add_argument("-v", "--vocab", default="split_words.txt", help="词汇表文件 (默认: split_words.txt)")
+    parser.add_argument("-o", "--output", default=None, help="JSONL输出文件 (默认: 标准输出)")
+    args = parser.parse_args()
+
+    command_parser = load_parser(args.vocab)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    matched = 0
+    elapsed = 0.0
+    try:
+        for record, text in _iter_texts(args.inputs):
+            start = time.perf_counter()
+            command = command_parser.parse(text)
+            elapsed += time.perf_counter() - start
+            count += 1
+            if command is not None:
+                matched += 1
+            output = dict(record) if record is not None else {"text": text}
+            output["command"] = command
+            out.write(json.dumps(output, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    rate = f"{count / elapsed:.0f} 条/秒" if elapsed else "-"
+    print(f"共 {count} 条，识别出指令 {matched} 条，解析速度 {rate}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,34 +13,114 @@ Vosk API 运行时词汇表修改功能演示
 import os
 import sys
 import json
-import pyaudio
-import vosk
 import threading
 import time
+import queue
+from operator import methodcaller
 from typing import List, Optional
+from audio_pipeline import AudioPipeline
+from audio_buffers import accept_waveform
+from vocab_matcher import VocabMatcher
+from command_parser import CommandParser
+from grammar_cache import GrammarCache
+from startup_timing import StartupTimer
+from model_daemon import DEFAULT_SOCKET, daemon_available
+from recognition_profile import resolve_profile
+from partial_emitter import PartialEmitter, ConsoleListener
+from recognition_events import PartialEvent, FinalEvent, async_events
+from vocab_watcher import VocabWatcher
+from dual_decoder import DualDecoder
+from model_warmup import prefetch_model_files, warm_up_recognizer
+from model_manifest import validate_model
+from model_registry import select_model
 
 class CustomVocabRecognizer:
     """自定义词汇表语音识别器"""
     
-    def __init__(self, model_path: str, vocab_file: str, sample_rate: int = 16000):
+    def __init__(self, model_path: Optional[str], vocab_file: str, sample_rate: int = 16000, pool=None,
+                 daemon_socket: Optional[str] = None, profile: Optional[str] = None,
+                 use_vad: bool = True, partial_interval: float = 0.5,
+                 hot_reload: bool = True, reload_interval: float = 1.0, warm_up: bool = True,
+                 prefetch: bool = False, metrics_port: Optional[int] = None,
+                 profile_dir: Optional[str] = None):
         """
         初始化自定义词汇表识别器
         
         Args:
-            model_path (str): Vosk模型路径
+            model_path (Optional[str]): Vosk模型路径，客户端模式下为None表示使用守护进程的默认模型
             vocab_file (str): 自定义词汇表文件路径
             sample_rate (int): 音频采样率
+            pool (RecognizerPool): 可选的共享识别器池，提供时复用池中的模型和识别器
+            daemon_socket (Optional[str]): 可选的模型守护进程套接字，提供时以客户端模式连接守护进程
+            profile (Optional[str]): 可选的识别配置文件（块大小与model.conf覆盖项），由 bench/tune_parameters.py 生成
+            use_vad (bool): 是否启用静音门控，静音块不送入解码器
+            partial_interval (float): 两次查询部分结果的最小间隔（音频秒），0表示每个块都查询
+            hot_reload (bool): 识别过程中监视词汇表文件，修改后在后台重建并在下一个句子边界切换
+            reload_interval (float): 检查词汇表文件的间隔（秒）
+            warm_up (bool): 创建识别器后先用合成音频解码一遍，避免首句承担缺页和延迟初始化的开销
+            prefetch (bool): 加载模型前把模型文件预取到页缓存
+            metrics_port (Optional[int]): 指标HTTP端口（/metrics），None表示不启用指标
+            profile_dir (Optional[str]): 解码性能分析输出目录（折叠栈、逐句耗时、最慢句子的音频），None表示不启用
         """
         self.model_path = model_path
         self.vocab_file = vocab_file
         self.sample_rate = sample_rate
+        self.pool = pool
+        self.daemon_socket = daemon_socket
+        self.profile = profile
+        self.chunk_frames = 4096
+        self.use_vad = use_vad
+        self.vad = None
+        self.warm_up = warm_up
+        self.prefetch = prefetch
+        # 识别循环各阶段调用的函数，启用指标时由 setup_metrics() 替换为计时版本
+        self.metrics_port = metrics_port
+        self.metrics = None
+        self.metrics_server = None
+        self.profile_dir = profile_dir
+        self.profiler = None
+        self._accept = accept_waveform
+        self._result = methodcaller("Result")
+        self._partial_result = methodcaller("PartialResult")
+        self._loads = json.loads
+        # 部分结果按间隔节流，只发送增量
+        self.emitter = PartialEmitter(partial_interval, sample_rate)
+        # 解码线程产生的识别事件，由 events() 的调用方消费
+        self.event_queue = queue.Queue()
+        self.console = ConsoleListener("[实时识别] ")
+        self.timer = StartupTimer()
         self.model = None
         self.recognizer = None
         self.audio = None
         self.stream = None
+        self.pipeline = None
         self.custom_words = []
+        self.matcher = VocabMatcher()
+        self.parser = CommandParser()
+        self.grammar_cache = GrammarCache()
         self.is_running = False
+        self.use_grammar_mode = False
+        self.dual_mode = False
+        # 热重载：监视线程构建好的 (词汇, 匹配器, 指令解析器, 识别器) 等待解码线程在句子边界切换
+        self.hot_reload = hot_reload
+        self.reload_interval = reload_interval
+        self.watcher = None
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        self._in_utterance = False
+        self.reload_stats = {"reloads": 0, "failed": 0, "last_reload_ms": None,
+                             "last_swap_pause_ms": None, "max_swap_pause_ms": 0.0}
         
+    def read_vocabulary(self) -> List[str]:
+        """
+        读取词汇表文件
+        
+        Returns:
+            List[str]: 去除空行和空白字符后的词汇
+        """
+        with open(self.vocab_file, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    
     def load_custom_vocabulary(self) -> bool:
         """
         加载自定义词汇表
@@ -53,9 +133,11 @@ class CustomVocabRecognizer:
                 print(f"错误：词汇表文件不存在: {self.vocab_file}")
                 return False
                 
-            with open(self.vocab_file, 'r', encoding='utf-8') as f:
-                # 读取所有行并去除空行和空白字符
-                self.custom_words = [line.strip() for line in f.readlines() if line.strip()]
+            self.custom_words = self.read_vocabulary()
+            
+            # 构建一次匹配索引和指令解析表，之后每次识别结果都复用
+            self.matcher = VocabMatcher(self.custom_words)
+            self.parser = CommandParser(self.custom_words)
                 
             print(f"成功加载自定义词汇表，共 {len(self.custom_words)} 个词汇")
             print(f"前10个词汇示例: {self.custom_words[:10]}")
@@ -73,12 +155,41 @@ class CustomVocabRecognizer:
             bool: 加载成功返回True，失败返回False
         """
         try:
+            if self.daemon_socket:
+                # 客户端模式：模型常驻在守护进程中，本进程不加载
+                return True
+            
+            if self.pool is not None:
+                if not self.pool.load_model():
+                    return False
+                self.model = self.pool.model
+                return True
+            
             if not os.path.exists(self.model_path):
                 print(f"错误：模型路径不存在: {self.model_path}")
                 return False
                 
-            print(f"正在加载模型: {self.model_path}")
-            self.model = vosk.Model(self.model_path)
+            import vosk
+            
+            # 有清单时按清单快速校验模型文件（只 stat，不读取内容）
+            problems = validate_model(self.model_path)
+            if problems:
+                print(f"错误：模型文件与清单不符: {'; '.join(problems[:5])}")
+                print("请重新运行 download_model.py 安装模型")
+                return False
+            
+            # 识别配置会生成一个应用了覆盖项的模型目录，并可能修改块大小
+            model_dir, chunk_frames = resolve_profile(self.model_path, self.profile)
+            if chunk_frames:
+                self.chunk_frames = chunk_frames
+            
+            if self.prefetch:
+                files, size = prefetch_model_files(model_dir)
+                self.timer.mark("prefetch")
+                print(f"已预取模型文件: {files} 个，{size / 1048576:.1f} MB")
+            print(f"正在加载模型: {model_dir}")
+            self.model = vosk.Model(model_dir)
+            self.timer.mark("model_loaded")
             print("模型加载成功")
             return True
             
@@ -86,36 +197,55 @@ class CustomVocabRecognizer:
             print(f"加载模型时出错: {e}")
             return False
     
-    def setup_recognizer(self, use_grammar_mode: bool = False) -> bool:
+    def _create_recognizer(self, grammar: Optional[str] = None):
+        """
+        创建识别器：客户端模式连接守护进程，共享池模式从池中租借（按语法划分子池），否则在本进程创建
+        
+        Args:
+            grammar (Optional[str]): 语法规则，None表示完整词典
+        """
+        if self.daemon_socket:
+            from model_daemon import RemoteRecognizer
+            return RemoteRecognizer(self.daemon_socket, self.model_path, self.sample_rate, grammar)
+        if self.pool is not None:
+            return self.pool.acquire(grammar)
+        
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate)
+        if grammar is not None:
+            recognizer.SetGrammar(grammar)
+        return recognizer
+    
+    def setup_recognizer(self, use_grammar_mode: bool = False, dual_mode: bool = False) -> bool:
         """
         设置识别器并应用自定义词汇表
         
         Args:
             use_grammar_mode (bool): 是否使用语法模式
+            dual_mode (bool): 是否同时使用语法识别器和词汇表识别器并行解码，按置信度选择结果
         
         Returns:
             bool: 设置成功返回True，失败返回False
         """
         try:
-            # 创建识别器
-            self.recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate)
-            
-            if use_grammar_mode:
+            self.use_grammar_mode = use_grammar_mode
+            self.dual_mode = dual_mode
+            if dual_mode:
+                # 双解码模式
+                grammar = self.create_advanced_grammar()
+                self.recognizer = self._build_for_mode(self.custom_words, grammar)
+                print("已启用双解码模式，语法识别器和词汇表识别器并行解码")
+            elif use_grammar_mode:
                 # 使用语法模式
                 grammar = self.create_advanced_grammar()
-                self.recognizer.SetGrammar(grammar)
+                self.recognizer = self._build_recognizer(self.custom_words, grammar)
                 print("已启用语法模式，将强制识别完整词组")
             else:
                 # 使用词汇表模式
-                words_json = json.dumps(self.custom_words, ensure_ascii=False)
-                self.recognizer.SetWords(words_json)
+                self.recognizer = self._build_recognizer(self.custom_words)
                 print(f"已设置自定义词汇表: {len(self.custom_words)} 个词汇")
             
-            # 启用详细识别选项
-            self.recognizer.SetWords(True)
-            if hasattr(self.recognizer, 'SetPartialWords'):
-                self.recognizer.SetPartialWords(True)
-            
+            self._warm_up_recognizer(self.recognizer)
             print("识别器设置完成")
             return True
             
@@ -123,76 +253,125 @@ class CustomVocabRecognizer:
             print(f"设置识别器时出错: {e}")
             return False
     
+    def _build_recognizer(self, words: List[str], grammar: Optional[str] = None):
+        """
+        创建识别器并应用词汇表和详细识别选项
+        
+        Args:
+            words (List[str]): 自定义词汇
+            grammar (Optional[str]): 语法模式下的JSGF语法，None表示词汇表模式
+        """
+        recognizer = self._create_recognizer(grammar)
+        if grammar is None:
+            recognizer.SetWords(json.dumps(words, ensure_ascii=False))
+        
+        # 启用详细识别选项
+        recognizer.SetWords(True)
+        if hasattr(recognizer, 'SetPartialWords'):
+            recognizer.SetPartialWords(True)
+        return recognizer
+    
+    def _warm_up_recognizer(self, recognizer):
+        """
+        用合成音频预热识别器（守护进程中的识别器已由守护进程预热）
+        """
+        if not self.warm_up or self.daemon_socket:
+            return
+        try:
+            elapsed = warm_up_recognizer(recognizer, self.sample_rate, chunk_frames=self.chunk_frames)
+            self.timer.mark("warmed_up")
+            print(f"识别器预热完成 ({elapsed * 1000:.0f} ms)")
+        except Exception as e:
+            print(f"识别器预热失败: {e}")
+    
+    def _build_for_mode(self, words: List[str], grammar: Optional[str] = None):
+        """
+        按当前识别模式创建识别器，双解码模式下组合一个语法识别器和一个词汇表识别器
+        
+        Args:
+            words (List[str]): 自定义词汇
+            grammar (Optional[str]): JSGF语法，词汇表模式下为None
+        """
+        if self.dual_mode:
+            return DualDecoder(self._build_recognizer(words, grammar), self._build_recognizer(words))
+        return self._build_recognizer(words, grammar)
+    
+    def _release_recognizer(self, recognizer):
+        """
+        归还或关闭不再使用的识别器
+        """
+        if isinstance(recognizer, DualDecoder):
+            recognizer.close()
+            for inner in recognizer.recognizers.values():
+                self._release_recognizer(inner)
+            return
+        if self.pool is not None:
+            self.pool.release(recognizer)
+        elif self.daemon_socket:
+            recognizer.close()
+    
+    def reload_vocabulary(self):
+        """
+        重新读取词汇表并在后台构建新的匹配器和识别器（在监视线程中调用）
+        解码线程继续使用旧识别器，到下一个句子边界时才切换，切换前后不丢音频
+        """
+        start = time.perf_counter()
+        try:
+            words = self.read_vocabulary()
+            matcher = VocabMatcher(words)
+            parser = CommandParser(words)
+            grammar = self.grammar_cache.get_grammar(words) if self.use_grammar_mode or self.dual_mode else None
+            recognizer = self._build_for_mode(words, grammar)
+            if self.warm_up and not self.daemon_socket:
+                # 在监视线程中预热，切换后的第一句话不再变慢
+                warm_up_recognizer(recognizer, self.sample_rate, chunk_frames=self.chunk_frames)
+        except Exception as e:
+            self.reload_stats["failed"] += 1
+            print(f"\n重新加载词汇表失败，继续使用原词汇表: {e}")
+            return
+        
+        self.reload_stats["last_reload_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        with self._pending_lock:
+            replaced = self._pending
+            self._pending = (words, matcher, parser, recognizer)
+        if replaced is not None:
+            # 上一次的结果还没来得及切换，已被更新的版本取代
+            self._release_recognizer(replaced[3])
+        print(f"\n词汇表已更新: {len(words)} 个词汇，构建耗时 {self.reload_stats['last_reload_ms']} ms，将在当前句子结束后生效")
+    
+    def _swap_pending(self):
+        """
+        在句子边界切换到后台构建好的识别器（在解码线程中调用）
+        """
+        start = time.perf_counter()
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        old = self.recognizer
+        self.custom_words, self.matcher, self.parser, self.recognizer = pending
+        self.emitter.reset()
+        pause = (time.perf_counter() - start) * 1000
+        stats = self.reload_stats
+        stats["reloads"] += 1
+        stats["last_swap_pause_ms"] = round(pause, 3)
+        stats["max_swap_pause_ms"] = round(max(stats["max_swap_pause_ms"], pause), 3)
+        self._release_recognizer(old)
+    
     def create_advanced_grammar(self) -> str:
         """
         创建高级语法规则，强制识别完整词组
-        使用JSGF格式
+        使用JSGF格式，生成结果按词汇表哈希缓存在磁盘上，词汇表不变时直接读取
         
         Returns:
             str: JSGF格式的语法规则
         """
-        # 分类词汇
-        long_functions = []  # 3-4字功能词
-        short_words = []     # 1-2字词
-        actions = []         # 动作词
-        temperatures = []    # 温度词
-        
-        for word in self.custom_words:
-            if len(word) >= 3 and any(suffix in word for suffix in ['功能', '模式', '预热', '零冷水', '增压']):
-                long_functions.append(word)
-            elif word in ['开', '关', '启动', '停止', '设置', '调到', '开启', '关闭']:
-                actions.append(word)
-            elif '度' in word:
-                temperatures.append(word)
-            else:
-                short_words.append(word)
-        
-        # 创建JSGF语法规则
-        grammar_lines = [
-            "#JSGF V1.0 UTF-8 zh;",
-            "grammar commands;",
-            ""
-        ]
-        
-        # 添加规则定义
-        if long_functions:
-            long_func_rule = " | ".join(long_functions[:50])  # 限制数量避免过长
-            grammar_lines.append(f"<long_function> = {long_func_rule};")
-        
-        if actions:
-            action_rule = " | ".join(actions)
-            grammar_lines.append(f"<action> = {action_rule};")
-        
-        if temperatures:
-            temp_rule = " | ".join(temperatures[:30])  # 限制数量
-            grammar_lines.append(f"<temperature> = {temp_rule};")
-        
-        if short_words:
-            short_rule = " | ".join(short_words[:50])  # 限制数量
-            grammar_lines.append(f"<short_word> = {short_rule};")
-        
-        # 主规则
-        main_rules = []
-        if long_functions:
-            main_rules.append("<long_function>")
-        if actions and long_functions:
-            main_rules.append("<action> <long_function>")
-        if actions and short_words:
-            main_rules.append("<action> <short_word>")
-        if temperatures:
-            main_rules.append("<temperature>")
-            main_rules.append("调到 <temperature>")
-        
-        if main_rules:
-            main_rule = " | ".join(main_rules)
-            grammar_lines.append(f"public <command> = {main_rule};")
+        misses = self.grammar_cache.misses
+        grammar_text = self.grammar_cache.get_grammar(self.custom_words)
+        if self.grammar_cache.misses > misses:
+            print(f"创建JSGF语法规则: {len(self.custom_words)} 个词汇，已写入缓存 {self.grammar_cache.cache_dir}")
         else:
-            # 如果没有分类成功，使用所有词汇
-            all_words = " | ".join(self.custom_words[:100])  # 限制数量
-            grammar_lines.append(f"public <command> = {all_words};")
-        
-        grammar_text = "\n".join(grammar_lines)
-        print(f"创建JSGF语法规则: {len(long_functions)} 个长功能词, {len(actions)} 个动作词, {len(temperatures)} 个温度词")
+            print("已从缓存加载JSGF语法规则")
         return grammar_text
     
     def setup_audio(self) -> bool:
@@ -203,6 +382,9 @@ class CustomVocabRecognizer:
             bool: 设置成功返回True，失败返回False
         """
         try:
+            # 只有实时采集才需要PyAudio，延迟导入以加快其他用途的启动
+            import pyaudio
+            
             self.audio = pyaudio.PyAudio()
             
             # 检查音频设备
@@ -213,14 +395,9 @@ class CustomVocabRecognizer:
             default_input = self.audio.get_default_input_device_info()
             print(f"默认输入设备: {default_input['name']}")
             
-            # 创建音频流
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=8192
-            )
+            # 以回调模式创建音频流，音频先写入环形缓冲区再由解码线程处理
+            self.pipeline = AudioPipeline(self.sample_rate, chunk_frames=self.chunk_frames)
+            self.stream = self.pipeline.open_stream(self.audio)
             
             print("音频设备设置完成")
             return True
@@ -229,27 +406,96 @@ class CustomVocabRecognizer:
             print(f"设置音频设备时出错: {e}")
             return False
     
-    def start_recognition(self, use_grammar_mode: bool = False):
+    def start(self, use_grammar_mode: bool = False, dual_mode: bool = False) -> bool:
         """
-        开始语音识别
+        加载词汇表和模型、打开音频并启动解码线程，之后通过 events() 获取识别事件
         
         Args:
             use_grammar_mode (bool): 是否使用语法模式
+            dual_mode (bool): 是否使用双解码模式
+        
+        Returns:
+            bool: 启动成功返回True
         """
         if not self.load_custom_vocabulary():
-            return
+            return False
             
         if not self.load_model():
-            return
+            return False
             
-        if not self.setup_recognizer(use_grammar_mode):
-            return
+        if not self.setup_recognizer(use_grammar_mode, dual_mode):
+            return False
+        self.timer.mark("model_ready")
             
         if not self.setup_audio():
-            return
+            return False
+        self.timer.mark("audio_ready")
+        self.setup_vad()
+        self.setup_metrics()
+        process = self.setup_profiler()
         
         self.is_running = True
-        mode_text = "语法模式" if use_grammar_mode else "词汇表模式"
+        self.stream.start_stream()
+        self.pipeline.start(process)
+        if self.hot_reload:
+            self.watcher = VocabWatcher(self.vocab_file, self.reload_vocabulary, self.reload_interval)
+            self.watcher.start()
+        return True
+    
+    def events(self):
+        """
+        识别事件生成器，音频管线结束或 is_running 被置为False后停止并清理资源
+        
+        Yields:
+            PartialEvent 或 FinalEvent（matched_terms 为识别文本中的自定义词汇，command 为提取出的指令）
+        """
+        try:
+            while True:
+                try:
+                    yield self.event_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not (self.is_running and self.pipeline and self.pipeline.is_running()):
+                        break
+            if self.pipeline.error:
+                raise self.pipeline.error
+        finally:
+            self.stop_recognition()
+    
+    def aevents(self):
+        """
+        events() 的异步迭代器版本，用于 async for
+        """
+        return async_events(self)
+    
+    def print_event(self, event):
+        """
+        在终端显示一个识别事件
+        """
+        if event.kind == "partial":
+            self.console(event.update)
+            return
+        self.console.reset()
+        if event.text:
+            print(f"\n[完整识别] {event.text}")
+            if "decoder" in event.data:
+                print(f"[仲裁结果] 采用{'语法' if event.data['decoder'] == 'command' else '词汇表'}识别器，置信度 {event.data['scores']}")
+            if event.matched_terms:
+                print(f"[匹配词汇] {', '.join(event.matched_terms)}")
+            if event.command:
+                print(f"[识别指令] {json.dumps(event.command, ensure_ascii=False)}")
+    
+    def start_recognition(self, use_grammar_mode: bool = False, dual_mode: bool = False):
+        """
+        开始语音识别
+        
+        Args:
+            use_grammar_mode (bool): 是否使用语法模式
+            dual_mode (bool): 是否使用双解码模式
+        """
+        if not self.start(use_grammar_mode, dual_mode):
+            return
+        
+        mode_text = "双解码模式" if dual_mode else "语法模式" if use_grammar_mode else "词汇表模式"
         print(f"\n=== 自定义词汇表语音识别已启动 ({mode_text}) ===")
         print(f"已加载 {len(self.custom_words)} 个自定义词汇")
         if use_grammar_mode:
@@ -258,34 +504,94 @@ class CustomVocabRecognizer:
         print("-" * 60)
         
         try:
-            while self.is_running:
-                # 读取音频数据
-                data = self.stream.read(4096, exception_on_overflow=False)
-                
-                # 处理音频数据
-                if self.recognizer.AcceptWaveform(data):
-                    # 完整识别结果
-                    result = json.loads(self.recognizer.Result())
-                    if result.get('text'):
-                        print(f"\n[完整识别] {result['text']}")
-                        
-                        # 检查是否包含自定义词汇
-                        recognized_text = result['text']
-                        matched_words = [word for word in self.custom_words if word in recognized_text]
-                        if matched_words:
-                            print(f"[匹配词汇] {', '.join(matched_words)}")
-                else:
-                    # 部分识别结果
-                    partial_result = json.loads(self.recognizer.PartialResult())
-                    if partial_result.get('partial'):
-                        print(f"\r[实时识别] {partial_result['partial']}", end='', flush=True)
+            # 解码在独立线程中进行，主线程只显示识别事件
+            for event in self.events():
+                self.print_event(event)
                         
         except KeyboardInterrupt:
             print("\n\n用户中断识别")
         except Exception as e:
             print(f"\n识别过程中出错: {e}")
-        finally:
-            self.stop_recognition()
+    
+    def setup_vad(self):
+        """
+        设置静音门控（需要numpy，未安装时不启用）
+        """
+        if not self.use_vad:
+            return
+        try:
+            from vad import EnergyVAD
+        except ImportError:
+            print("警告：未安装 numpy，静音门控未启用 (pip install numpy)")
+            return
+        self.vad = EnergyVAD(self.sample_rate)
+    
+    def setup_profiler(self):
+        """
+        启用性能分析时开始采样解码线程，并返回带逐句计时的音频块处理函数
+        
+        Returns:
+            Callable: 交给音频管线的处理函数
+        """
+        if self.profile_dir is None:
+            return self.process_audio
+        from decode_profiler import DecodeProfiler
+        self.profiler = DecodeProfiler(self.profile_dir, self.sample_rate)
+        self._accept = self.profiler.wrap_accept(self._accept)
+        self.profiler.start()
+        print(f"已启用解码性能分析，结果将写入: {self.profile_dir}")
+        return self.profiler.wrap_process(self.process_audio)
+    
+    def setup_metrics(self):
+        """
+        启用指标时把识别循环的各阶段函数替换为计时版本，并导出音频管线计数器；
+        未启用时各阶段仍是原始函数，识别循环没有额外开销
+        """
+        if self.metrics_port is None:
+            return
+        from metrics import start_metrics
+        self.metrics, self.metrics_server = start_metrics(self.metrics_port)
+        if self.metrics is None:
+            return
+        self.metrics.bind_pipeline(self.pipeline)
+        self._accept = self.metrics.timed_accept(accept_waveform)
+        self._result = self.metrics.timed_result(methodcaller("Result"))
+        self._partial_result = self.metrics.timed(self.metrics.partial_result, methodcaller("PartialResult"))
+        self._loads = self.metrics.timed(self.metrics.json_parse, json.loads)
+    
+    def process_audio(self, data: memoryview):
+        """
+        识别一个音频块（在解码线程中调用）
+        
+        Args:
+            data (memoryview): 16位单声道PCM数据（复用的缓冲区）
+        """
+        # 静音块不进入解码器
+        if self.vad is not None:
+            data = self.vad.process(data)
+            if data is None:
+                return
+        
+        # 新词汇表只在句子之间切换，正在识别的句子继续由旧识别器完成
+        if self._pending is not None and not self._in_utterance:
+            self._swap_pending()
+        
+        if self._accept(self.recognizer, data):
+            # 完整识别结果，JSON和自定义词汇匹配留给消费者按需计算
+            self._in_utterance = False
+            self.emitter.reset()
+            self.event_queue.put(FinalEvent(self._result(self.recognizer), self.matcher, self.parser, self.metrics))
+            return
+        self._in_utterance = True
+        if self.emitter.poll_due(len(data)):
+            # 部分识别结果，未到查询间隔的块不调用解码器
+            text = self._loads(self._partial_result(self.recognizer)).get('partial', '')
+            self.timer.mark("first_decode")
+            if text:
+                self.timer.mark("first_partial")
+            update = self.emitter.update(text)
+            if update is not None:
+                self.event_queue.put(PartialEvent(text, update))
     
     def stop_recognition(self):
         """
@@ -293,13 +599,50 @@ class CustomVocabRecognizer:
         """
         self.is_running = False
         
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+        
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
+        
+        if self.pipeline:
+            self.pipeline.stop()
+            print(f"\n音频管线统计: {self.pipeline.stats()}")
+            self.pipeline = None
+        
+        if self.vad:
+            print(f"静音门控统计: {self.vad.stats()}")
+        print(f"部分结果统计: {self.emitter.stats()}")
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.profiler is not None:
+            path = self.profiler.stop()
+            if path:
+                print(f"解码性能分析结果已写入: {path} ({self.profiler.summary()})")
+            self.profiler = None
+        if self.hot_reload:
+            print(f"词汇表热重载统计: {self.reload_stats}")
+        if isinstance(self.recognizer, DualDecoder):
+            print(f"双解码统计: {self.recognizer.summary()}")
             
         if self.audio:
             self.audio.terminate()
-            
+            self.audio = None
+        
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._release_recognizer(pending[3])
+        
+        if self.recognizer is not None:
+            self._release_recognizer(self.recognizer)
+            self.recognizer = None
+        
+        print(self.timer.report())
         print("\n语音识别已停止，资源已清理")
     
     def test_vocabulary_matching(self, test_text: str):
@@ -312,50 +655,15 @@ class CustomVocabRecognizer:
         print(f"\n=== 词汇匹配测试 ===")
         print(f"测试文本: {test_text}")
         
-        matched_words = [word for word in self.custom_words if word in test_text]
-        if matched_words:
-            print(f"匹配的自定义词汇: {', '.join(matched_words)}")
+        matches = self.matcher.find(test_text)
+        if matches:
+            print(f"匹配的自定义词汇: {', '.join(f'{word}[{start}:{end}]' for start, end, word in matches)}")
         else:
             print("未找到匹配的自定义词汇")
-
-def select_model() -> Optional[str]:
-    """
-    选择可用的模型
-    
-    Returns:
-        Optional[str]: 选择的模型路径，如果没有可用模型则返回None
-    """
-    models_dir = "models"
-    if not os.path.exists(models_dir):
-        print(f"错误：模型目录不存在: {models_dir}")
-        return None
-    
-    # 查找可用模型
-    available_models = []
-    for item in os.listdir(models_dir):
-        model_path = os.path.join(models_dir, item)
-        if os.path.isdir(model_path):
-            available_models.append(model_path)
-    
-    if not available_models:
-        print("错误：未找到可用的模型")
-        return None
-    
-    print("\n可用的模型:")
-    for i, model in enumerate(available_models, 1):
-        print(f"{i}. {model}")
-    
-    while True:
-        try:
-            choice = input(f"\n请选择模型 (1-{len(available_models)}): ").strip()
-            if choice.isdigit():
-                index = int(choice) - 1
-                if 0 <= index < len(available_models):
-                    return available_models[index]
-            print("无效选择，请重新输入")
-        except KeyboardInterrupt:
-            print("\n用户取消选择")
-            return None
+        
+        command = self.parser.parse(test_text)
+        if command:
+            print(f"识别指令: {json.dumps(command, ensure_ascii=False)}")
 
 def main():
     """
@@ -364,16 +672,27 @@ def main():
     print("=== Vosk API 自定义词汇表语音识别演示 ===")
     print("这个程序演示了如何使用自定义词汇表提高特定领域的识别准确率")
     
-    # 选择模型
-    model_path = select_model()
-    if not model_path:
-        return
-    
     # 词汇表文件路径
     vocab_file = "split_words.txt"
+    # 设置 VOSK_METRICS_PORT 后在该端口导出 /metrics
+    metrics_port = int(os.environ["VOSK_METRICS_PORT"]) if os.environ.get("VOSK_METRICS_PORT") else None
+    # 设置 VOSK_PROFILER_DIR 后采样解码线程，退出时写出折叠栈和最慢句子的音频
+    profile_dir = os.environ.get("VOSK_PROFILER_DIR")
     
-    # 创建识别器
-    recognizer = CustomVocabRecognizer(model_path, vocab_file)
+    # 模型守护进程在运行时以客户端模式启动，跳过模型选择和加载
+    if daemon_available(DEFAULT_SOCKET):
+        print(f"检测到模型守护进程: {DEFAULT_SOCKET}")
+        recognizer = CustomVocabRecognizer(None, vocab_file, daemon_socket=DEFAULT_SOCKET,
+                                           metrics_port=metrics_port, profile_dir=profile_dir)
+    else:
+        # 选择模型
+        model_path = select_model()
+        if not model_path:
+            return
+        
+        # 创建识别器
+        recognizer = CustomVocabRecognizer(model_path, vocab_file, profile=os.environ.get("VOSK_PROFILE"),
+                                           metrics_port=metrics_port, profile_dir=profile_dir)
     
     # 测试词汇匹配
     recognizer.load_custom_vocabulary()
@@ -388,19 +707,25 @@ def main():
             print("\n选择识别模式:")
             print("1. 词汇表模式 (默认)")
             print("2. 语法模式 (强制识别完整词组)")
+            print("3. 双解码模式 (语法和词汇表并行识别，按置信度选择)")
             
+            dual_mode = False
             while True:
-                choice = input("请选择模式 (1/2，直接回车默认选择1): ").strip()
+                choice = input("请选择模式 (1/2/3，直接回车默认选择1): ").strip()
                 if choice == "" or choice == "1":
                     use_grammar_mode = False
                     break
                 elif choice == "2":
                     use_grammar_mode = True
                     break
+                elif choice == "3":
+                    use_grammar_mode = False
+                    dual_mode = True
+                    break
                 else:
-                    print("无效选择，请输入 1 或 2")
+                    print("无效选择，请输入 1、2 或 3")
             
-            recognizer.start_recognition(use_grammar_mode)
+            recognizer.start_recognition(use_grammar_mode, dual_mode)
         else:
             print("程序结束")
     except KeyboardInterrupt:
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解码线程采样分析器
+用于排查线上延迟尖峰到底来自解码器本身、GIL争用还是 AcceptWaveform 周围的Python代码：
+
+- 栈采样：后台线程按固定间隔用 sys._current_frames() 抓取解码线程的调用栈，
+  累计为火焰图工具可直接使用的折叠栈（flamegraph.pl / speedscope 的 "frame;frame;frame 次数" 格式）；
+  按栈顶把每个样本归类为 解码器（C调用中）/ 等待音频 / Python代码
+- GIL争用：采样线程每次醒来的迟到时间。解码器的C调用会释放GIL，Python代码长时间持有GIL时采样线程就会迟到
+- 每句话的解码耗时：解码线程处理该句所有音频块的墙钟时间与音频时长之比，
+  保留最慢的N句及其音频（WAV），可以离线用 batch_transcription.py 回放复现
+
+输出目录结构：
+    stacks.folded      折叠栈
+    summary.json       样本分类、采样迟到统计、每句话统计
+    worst/NN_xxx.wav   最慢的N句话的音频，worst.json 为对应的耗时信息
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import heapq
+import threading
+from collections import Counter
+from typing import Callable, List, Optional
+
+# 栈顶为这些函数时，解码线程正在Vosk的C调用中
+DECODER_FUNCTIONS = {"accept_waveform", "AcceptWaveform", "Result", "PartialResult", "FinalResult"}
+# 栈中出现这些函数时，解码线程在等待音频
+WAIT_FUNCTIONS = {"readinto", "wait"}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)})"
+
+
+class StackSampler:
+    """定时采样指定线程调用栈的后台线程"""
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        """
+        Args:
+            interval (float): 采样间隔（秒）
+            max_depth (int): 每个样本最多记录的栈深度
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.thread_id: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.samples = 0
+        self.lag_sum = 0.0
+        self.lag_max = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        interval = self.interval
+        due = time.perf_counter() + interval
+        while not self._stop.wait(max(0.0, due - time.perf_counter())):
+            now = time.perf_counter()
+            lag = now - due
+            due = max(due + interval, now)
+            if self.thread_id is None:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.sample(frame, lag)
+
+    def sample(self, frame, lag: float = 0.0):
+        """
+        记录一个样本
+
+        Args:
+            frame: 解码线程当前的栈顶帧
+            lag (float): 采样线程本次醒来的迟到时间（秒）
+        """
+        names = []
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            names.append(frame.f_code.co_name)
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.reverse()
+        self.stacks[";".join(labels)] += 1
+        if names and names[0] in DECODER_FUNCTIONS:
+            self.categories["decoder"] += 1
+        elif WAIT_FUNCTIONS.intersection(names[:3]):
+            self.categories["waiting_audio"] += 1
+        else:
+            self.categories["python"] += 1
+        self.samples += 1
+        self.lag_sum += lag
+        if lag > self.lag_max:
+            self.lag_max = lag
+
+    def folded(self) -> str:
+        """
+        Returns:
+            str: 折叠栈文本，每行 "frame;frame;frame 次数"
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        total = self.samples or 1
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "fractions": {name: round(count / total, 4) for name, count in self.categories.items()},
+            # 采样线程迟到越多，说明解码线程以外的Python代码持有GIL越久
+            "sampler_lag_avg_ms": round(self.lag_sum / total * 1000, 3),
+            "sampler_lag_max_ms": round(self.lag_max * 1000, 3),
+        }
+
+
+class DecodeProfiler:
+    """解码线程的采样分析器和逐句耗时记录"""
+
+    def __init__(self, output_dir: str, sample_rate: int = 16000, interval: float = 0.01,
+                 worst_n: int = 10, max_utterance_seconds: float = 30.0):
+        """
+        Args:
+            output_dir (str): 输出目录（停止时在其中创建带时间戳的子目录）
+            sample_rate (int): 音频采样率
+            interval (float): 栈采样间隔（秒）
+            worst_n (int): 保留音频的最慢句子数
+            max_utterance_seconds (float): 每句最多保留的音频时长，超出时只保留最后这么长
+        """
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.worst_n = worst_n
+        self.max_utterance_bytes = int(max_utterance_seconds * sample_rate) * 2
+        self.sampler = StackSampler(interval)
+        self.utterances: List[dict] = []
+        # (解码耗时/音频时长, 序号, 信息, 音频)，小顶堆只保留最慢的N句
+        self._worst: list = []
+        self._audio = bytearray()
+        self._decode_seconds = 0.0
+        self._chunks = 0
+        self._ended = False
+
+    def start(self):
+        self.sampler.start()
+
+    def wrap_accept(self, accept: Callable) -> Callable:
+        """
+        包装 accept_waveform，记录本块是否检测到句尾
+        """
+        def wrapper(recognizer, data):
+            ended = accept(recognizer, data)
+            if ended:
+                self._ended = True
+            return ended
+
+        return wrapper
+
+    def wrap_process(self, process: Callable) -> Callable:
+        """
+        包装解码线程处理一个音频块的函数，记录墙钟耗时和原始音频
+        """
+        def wrapper(data):
+            if self.sampler.thread_id is None:
+                self.sampler.thread_id = threading.get_ident()
+            start = time.perf_counter()
+            try:
+                return process(data)
+            finally:
+                self._record_chunk(data, time.perf_counter() - start)
+
+        return wrapper
+
+    def _record_chunk(self, data, elapsed: float):
+        self._decode_seconds += elapsed
+        self._chunks += 1
+        self._audio += data
+        if len(self._audio) > self.max_utterance_bytes:
+            del self._audio[:len(self._audio) - self.max_utterance_bytes]
+        if self._ended:
+            self._ended = False
+            self._finish_utterance()
+
+    def _finish_utterance(self):
+        audio_seconds = len(self._audio) / 2 / self.sample_rate
+        record = {
+            "index": len(self.utterances),
+            "chunks": self._chunks,
+            "audio_seconds": round(audio_seconds, 3),
+            "decode_seconds": round(self._decode_seconds, 4),
+            "rtf": round(self._decode_seconds / audio_seconds, 4) if audio_seconds else None,
+        }
+        self.utterances.append(record)
+        score = record["rtf"] or 0.0
+        item = (score, record["index"], record, bytes(self._audio))
+        if len(self._worst) < self.worst_n:
+            heapq.heappush(self._worst, item)
+        elif score > self._worst[0][0]:
+            heapq.heapreplace(self._worst, item)
+        self._audio = bytearray()
+        self._decode_seconds = 0.0
+        self._chunks = 0
+
+    def summary(self) -> dict:
+        rtfs = sorted(u["rtf"] for u in self.utterances if u["rtf"] is not None)
+        summary = {"stacks": self.sampler.summary(), "utterances": len(self.utterances)}
+        if rtfs:
+            summary["rtf_median"] = rtfs[len(rtfs) // 2]
+            summary["rtf_p95"] = rtfs[min(len(rtfs) - 1, int(len(rtfs) * 0.95))]
+            summary["rtf_max"] = rtfs[-1]
+        return summary
+
+    def stop(self) -> Optional[str]:
+        """
+        停止采样并写出结果；未结束的句子按已收到的音频计入
+
+        Returns:
+            Optional[str]: 输出目录，写出失败时返回None
+        """
+        self.sampler.stop()
+        if self._chunks:
+            self._finish_utterance()
+        path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S"))
+        try:
+            os.makedirs(os.path.join(path, "worst"), exist_ok=True)
+            with open(os.path.join(path, "stacks.folded"), 'w', encoding='utf-8') as f:
+                f.write(self.sampler.folded())
+            worst = []
+            for rank, (_, _, record, audio) in enumerate(sorted(self._worst, reverse=True), 1):
+                name = f"{rank:02d}_utt{record['index']}_rtf{record['rtf']}.wav"
+                with wave.open(os.path.join(path, "worst", name), 'wb') as wf:
+                    wf.setnchannels(1)
+                    wf.setsampwidth(2)
+                    wf.setframerate(self.sample_rate)
+                    wf.writeframes(audio)
+                worst.append(dict(record, file=os.path.join("worst", name)))
+            with open(os.path.join(path, "worst", "worst.json"), 'w', encoding='utf-8') as f:
+                json.dump(worst, f, ensure_ascii=False, indent=2)
+            with open(os.path.join(path, "summary.json"), 'w', encoding='utf-8') as f:
+                json.dump(dict(self.summary(), per_utterance=self.utterances), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"写出性能分析结果失败: {e}")
+            return None
+        return path
@@ -2,92 +2,509 @@
 # -*- coding: utf-8 -*-
 """
 下载Vosk最小参数模型的脚本
+
+下载支持断点续传（HTTP Range）和多段并行，完成后校验SHA-256；
+下载过的文件按内容哈希存入本地缓存目录（可以是多台机器共享的文件镜像），再次安装时直接取用
+
+非交互使用：python download_model.py cn_standard --force --keep-zip --segments 8
 """
 
 import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import http.client
 import urllib.request
 import zipfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+# 缓存目录，可用环境变量指向共享的文件镜像
+DEFAULT_CACHE_DIR = os.environ.get("VOSK_MODEL_CACHE",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "vosk-models"))
+CHUNK_SIZE = 1 << 20
+# 小于这个大小的文件不分段
+MIN_SEGMENT_SIZE = 8 << 20
+
+# 可下载的模型；填写 sha256 后下载结果会被校验并写入缓存，为空时只下载到本地、不写入缓存
+MODELS = {
+    "cn_small": {
+        "url": "https://alphacephei.com/vosk/models/vosk-model-small-cn-0.22.zip",
+        "filename": "vosk-model-small-cn-0.22.zip",
+        "folder": "vosk-model-small-cn-0.22",
+        "size": "42MB",
+        "description": "中文小型模型（推荐）",
+        "accuracy": "适合移动设备和树莓派，识别速度快"
+    },
+    "cn_standard": {
+        "url": "https://alphacephei.com/vosk/models/vosk-model-cn-0.22.zip",
+        "filename": "vosk-model-cn-0.22.zip",
+        "folder": "vosk-model-cn-0.22",
+        "size": "1.3GB",
+        "description": "中文标准模型（高精度）",
+        "accuracy": "服务器级别，识别精度更高"
+    },
+    "cn_kaldi": {
+        "url": "https://alphacephei.com/vosk/models/vosk-model-cn-kaldi-multicn-0.15.zip",
+        "filename": "vosk-model-cn-kaldi-multicn-0.15.zip",
+        "folder": "vosk-model-cn-kaldi-multicn-0.15",
+        "size": "1.5GB",
+        "description": "中文Kaldi多方言模型",
+        "accuracy": "支持多种中文方言，兼容性好"
+    },
+    "cn_old": {
+        "url": "https://alphacephei.com/vosk/models/vosk-model-cn-0.15.zip",
+        "filename": "vosk-model-cn-0.15.zip",
+        "folder": "vosk-model-cn-0.15",
+        "size": "1.67GB",
+        "description": "中文旧版大模型",
+        "accuracy": "较老版本，但稳定性好"
+    },
+    "en": {
+        "url": "https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip",
+        "filename": "vosk-model-small-en-us-0.15.zip",
+        "folder": "vosk-model-small-en-us-0.15",
+        "size": "40MB",
+        "description": "英文小型模型",
+        "accuracy": "适合英文语音识别"
+    }
+}
+
+def _open_url(url, headers=None, timeout=30):
+    request = urllib.request.Request(url, headers=headers or {})
+    return urllib.request.urlopen(request, timeout=timeout)
+
+def file_sha256(path):
+    """
+    计算文件的SHA-256
+    """
+    digest = hashlib.sha256()
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(buffer[:n])
+    return digest.hexdigest()
+
+def probe_url(url):
+    """
+    探测文件大小和服务器是否支持Range请求
+    
+    Returns:
+        tuple: (文件大小，未知时为None, 是否支持Range)
+    """
+    with _open_url(url, {"Range": "bytes=0-0"}) as response:
+        content_range = response.headers.get("Content-Range", "")
+        if response.status == 206 and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            return (int(total) if total.isdigit() else None), True
+        length = response.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False
+
+class ArtifactCache:
+    """
+    按SHA-256寻址的本地文件缓存
+    
+    目录结构：
+        sha256/ab/abcdef...    文件内容
+        urls/<url的哈希>.json   URL到内容哈希的索引
+    写入都先写临时文件再原子重命名，多台机器通过共享目录同时读写也不会看到写了一半的文件
+    """
+    
+    def __init__(self, root):
+        self.root = root
+    
+    def blob_path(self, sha256):
+        return os.path.join(self.root, "sha256", sha256[:2], sha256)
+    
+    def _url_index(self, url):
+        return os.path.join(self.root, "urls", hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+    
+    def lookup_url(self, url):
+        """
+        查询URL对应的内容哈希
+        
+        Returns:
+            dict: {"sha256", "size", "url"}，没有记录时返回None
+        """
+        try:
+            with open(self._url_index(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def get(self, sha256, size=None):
+        """
+        查询缓存中的文件
+        
+        Returns:
+            str: 文件路径，不存在或大小不符时返回None
+        """
+        path = self.blob_path(sha256)
+        try:
+            if size is not None and os.path.getsize(path) != size:
+                return None
+        except OSError:
+            return None
+        return path if os.path.exists(path) else None
+    
+    def _atomic_write(self, dest, write):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        tmp = f"{dest}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            write(tmp)
+            os.replace(tmp, dest)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    
+    def put(self, path, sha256, url=None):
+        """
+        把已校验的文件放入缓存，并记录URL索引
+        
+        Returns:
+            str: 缓存中的文件路径
+        """
+        blob = self.blob_path(sha256)
+        if not os.path.exists(blob):
+            self._atomic_write(blob, lambda tmp: _link_or_copy(path, tmp))
+        if url:
+            record = {"url": url, "sha256": sha256, "size": os.path.getsize(blob)}
+            def write_index(tmp):
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(record, f)
+            self._atomic_write(self._url_index(url), write_index)
+        return blob
+    
+    def materialize(self, sha256, dest):
+        """
+        把缓存中的文件放到目标路径（同一文件系统上用硬链接，否则复制）
+        """
+        self._atomic_write(dest, lambda tmp: _link_or_copy(self.blob_path(sha256), tmp))
+
+def _link_or_copy(src, dest):
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+class _Progress:
+    """多个下载线程共享的进度计数"""
+    
+    def __init__(self, total, done=0):
+        self.total = total
+        self.done = done
+        self.start_done = done
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+    
+    def add(self, n):
+        with self.lock:
+            self.done += n
+    
+    def show(self):
+        elapsed = time.perf_counter() - self.start
+        speed = (self.done - self.start_done) / elapsed / (1024 * 1024) if elapsed > 0 else 0.0
+        if self.total:
+            percent = min(100, (self.done * 100) // self.total)
+            print(f"\r下载进度: {percent}% ({self.done // (1024*1024)}MB / {self.total // (1024*1024)}MB) "
+                  f"{speed:.1f}MB/s", end='', flush=True)
+        else:
+            print(f"\r已下载: {self.done // (1024*1024)}MB {speed:.1f}MB/s", end='', flush=True)
+
+def _download_segment(url, part_path, segment, progress, retries, cancel):
+    """
+    下载一个分段 [start, end)，segment[2] 为该段已写入的字节数，中断后从这里继续；
+    cancel 被置位（其他分段失败）时尽快返回
+    """
+    start, end = segment[0], segment[1]
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    for attempt in range(retries + 1):
+        if segment[2] >= end - start or cancel.is_set():
+            return
+        try:
+            offset = start + segment[2]
+            # 不带缓冲写入：计入进度的字节已交给操作系统，进程被杀死也不会丢失
+            with _open_url(url, {"Range": f"bytes={offset}-{end - 1}"}) as response, \
+                    open(part_path, 'r+b', buffering=0) as f:
+                if response.status != 206:
+                    raise IOError("服务器没有按Range请求返回分段内容")
+                f.seek(offset)
+                while segment[2] < end - start:
+                    if cancel.is_set():
+                        return
+                    n = response.readinto(buffer[:min(CHUNK_SIZE, end - start - segment[2])])
+                    if not n:
+                        break
+                    written = 0
+                    while written < n:
+                        written += f.write(buffer[written:n])
+                    with progress.lock:
+                        segment[2] += n
+                        progress.done += n
+            if segment[2] >= end - start:
+                return
+            raise IOError("连接提前关闭")
+        except (OSError, http.client.HTTPException) as e:
+            if attempt == retries:
+                raise
+            print(f"\n分段 {start}-{end} 下载中断，{2 ** attempt} 秒后重试: {e}")
+            if cancel.wait(2 ** attempt):
+                return
+
+def _load_state(state_path, url, size):
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("url") == url and state.get("size") == size:
+            return state
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _save_state(state_path, state, lock, part_path):
+    """
+    保存下载进度：先把 part 文件刷到磁盘再写进度文件，记录的字节数不会超过已落盘的内容
+    """
+    with lock:
+        data = json.dumps(state)
+    fd = os.open(part_path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    tmp = state_path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, state_path)
 
-def download_file(url, filename):
+def _fetch(url, part_path, segments, retries):
     """
-    下载文件并显示进度
+    把URL下载到 part_path：支持Range时分段并行、可断点续传，否则单连接完整下载
     """
-    def progress_hook(block_num, block_size, total_size):
-        downloaded = block_num * block_size
-        if total_size > 0:
-            percent = min(100, (downloaded * 100) // total_size)
-            print(f"\r下载进度: {percent}% ({downloaded // (1024*1024)}MB / {total_size // (1024*1024)}MB)", end='', flush=True)
+    size, ranged = probe_url(url)
+    state_path = part_path + ".json"
+    if not ranged or not size:
+        # 服务器不支持Range，只能从头下载
+        progress = _Progress(size)
+        buffer = memoryview(bytearray(CHUNK_SIZE))
+        with _open_url(url) as response, open(part_path, 'wb') as f:
+            while True:
+                n = response.readinto(buffer)
+                if not n:
+                    break
+                f.write(buffer[:n])
+                progress.add(n)
+                progress.show()
+        if size and progress.done != size:
+            raise IOError(f"下载不完整: {progress.done}/{size} 字节")
+        return
+    
+    state = _load_state(state_path, url, size) if os.path.exists(part_path) else None
+    if state is None:
+        count = max(1, min(segments, size // MIN_SEGMENT_SIZE))
+        bounds = [size * i // count for i in range(count + 1)]
+        state = {"url": url, "size": size, "segments": [[bounds[i], bounds[i + 1], 0] for i in range(count)]}
+        with open(part_path, 'wb') as f:
+            f.truncate(size)
+    else:
+        print(f"继续上次未完成的下载 ({sum(s[2] for s in state['segments']) // (1024*1024)}MB 已完成)")
     
+    progress = _Progress(size, sum(s[2] for s in state["segments"]))
+    cancel = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=len(state["segments"]), thread_name_prefix="download") as executor:
+            futures = [executor.submit(_download_segment, url, part_path, segment, progress, retries, cancel)
+                       for segment in state["segments"]]
+            try:
+                pending = futures
+                while pending:
+                    done, pending = wait(pending, timeout=0.5, return_when=FIRST_EXCEPTION)
+                    progress.show()
+                    # 定期保存进度，进程被杀死后也能续传（记录的进度只会落后于实际写入）
+                    _save_state(state_path, state, progress.lock, part_path)
+                    for future in done:
+                        future.result()
+            except BaseException:
+                # 一个分段失败或用户中断时让其余分段在当前块写完后停止，不必等它们下载完整个分段
+                cancel.set()
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        # 退出 with 时会等待其余分段线程结束，这时保存的才是各分段最终写入的字节数
+        _save_state(state_path, state, progress.lock, part_path)
+    os.remove(state_path)
+
+def download_file(url, filename, sha256=None, segments=4, cache_dir=DEFAULT_CACHE_DIR, retries=3):
+    """
+    下载文件并显示进度：分段并行、断点续传、SHA-256校验，并使用本地内容缓存
+    
+    Args:
+        url (str): 下载地址
+        filename (str): 保存路径
+        sha256 (str): 期望的SHA-256，None表示不校验；未校验的文件不写入缓存，避免通过共享缓存扩散
+        segments (int): 并行下载的分段数
+        cache_dir (str): 缓存目录，None表示不使用缓存
+        retries (int): 每个分段失败后的重试次数
+    
+    Returns:
+        str: 文件的SHA-256
+    """
+    cache = ArtifactCache(cache_dir) if cache_dir else None
+    if cache is not None:
+        record = cache.lookup_url(url)
+        expected = sha256 or (record or {}).get("sha256")
+        if expected and cache.get(expected, (record or {}).get("size") if not sha256 else None):
+            cache.materialize(expected, filename)
+            print(f"从缓存获取: {filename} (sha256 {expected[:12]}...)")
+            return expected
+    
+    part_path = filename + ".part"
     print(f"正在下载: {filename}")
-    urllib.request.urlretrieve(url, filename, progress_hook)
-    print("\n下载完成！")
+    _fetch(url, part_path, segments, retries)
+    print("\n正在校验 SHA-256...")
+    actual = file_sha256(part_path)
+    if sha256 and actual != sha256.lower():
+        os.remove(part_path)
+        raise ValueError(f"SHA-256 校验失败: 期望 {sha256}，实际 {actual}")
+    os.replace(part_path, filename)
+    if cache is not None and not sha256:
+        print("警告：未指定 SHA-256，下载结果未经校验，不写入缓存（可用 --sha256 指定）")
+    elif cache is not None:
+        try:
+            cache.put(filename, actual, url)
+        except OSError as e:
+            print(f"警告：写入缓存失败: {e}")
+    print(f"下载完成！(sha256 {actual})")
+    return actual
 
-def extract_model(zip_path, extract_to="."):
+def _member_path(root, name):
+    """
+    把zip成员名转换为 root 下的路径，拒绝绝对路径和 .. 逃逸
+    """
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or os.path.isabs(name) or ":" in parts[0]:
+        raise ValueError(f"zip中包含不安全的路径: {name}")
+    return os.path.join(root, *parts), "/".join(parts)
+
+def extract_model(zip_path, extract_to=".", workers=None):
     """
     解压模型文件
+    
+    各成员在线程池中并行解压（zlib解压和SHA-256计算都会释放GIL），先写入 extract_to 下的临时目录，
+    全部完成后为每个顶层目录写出完整性清单（见 model_manifest.py），再重命名到目标位置；
+    解压中断不会留下不完整的模型目录，已存在的同名目录在新目录就位后才删除
+    
+    Args:
+        zip_path (str): zip文件路径
+        extract_to (str): 解压目标目录
+        workers (int): 解压线程数，默认为CPU核数（最多8）
+    
+    Returns:
+        list: 解压出的顶层路径
     """
+    from model_manifest import file_entry, write_manifest
+    
     print(f"正在解压: {zip_path}")
-    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
-    print("解压完成！")
+    start = time.perf_counter()
+    os.makedirs(extract_to, exist_ok=True)
+    staging = os.path.join(extract_to, f".extract-{os.getpid()}-{int(time.time())}")
+    os.makedirs(staging)
+    handles = []
+    local = threading.local()
+    
+    def extract_member(item):
+        member, target = item
+        archive = getattr(local, "archive", None)
+        if archive is None:
+            # 每个线程使用自己的文件句柄，避免共享读取位置
+            archive = local.archive = zipfile.ZipFile(zip_path, 'r')
+            handles.append(archive)
+        digest = hashlib.sha256()
+        with archive.open(member) as src, open(target, 'wb') as dst:
+            while True:
+                block = src.read(CHUNK_SIZE)
+                if not block:
+                    break
+                digest.update(block)
+                dst.write(block)
+        return file_entry(target, digest.hexdigest())
+    
+    try:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            members = zip_ref.infolist()
+        files = []
+        for member in members:
+            target, name = _member_path(staging, member.filename)
+            if member.is_dir():
+                os.makedirs(target, exist_ok=True)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                files.append((member, target, name))
+        # 大文件先开始，各线程的负载更均衡
+        files.sort(key=lambda item: item[0].file_size, reverse=True)
+        with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1),
+                                thread_name_prefix="extract") as executor:
+            entries = list(executor.map(extract_member, [(member, target) for member, target, _ in files]))
+        
+        # 按顶层目录分组写出清单
+        manifests = {}
+        for (_, _, name), entry in zip(files, entries):
+            top, _, relative = name.partition("/")
+            if relative:
+                manifests.setdefault(top, {})[relative] = entry
+        extracted = []
+        for top in sorted(os.listdir(staging)):
+            source = os.path.join(staging, top)
+            dest = os.path.join(extract_to, top)
+            if os.path.isdir(source):
+                write_manifest(source, manifests.get(top, {}), os.path.basename(zip_path))
+            old = None
+            if os.path.lexists(dest):
+                old = f"{dest}.old-{os.getpid()}"
+                os.rename(dest, old)
+            os.rename(source, dest)
+            if old is not None:
+                if os.path.isdir(old) and not os.path.islink(old):
+                    shutil.rmtree(old)
+                else:
+                    os.remove(old)
+            extracted.append(dest)
+    finally:
+        for archive in handles:
+            archive.close()
+        shutil.rmtree(staging, ignore_errors=True)
+    size = sum(entry["size"] for entry in entries)
+    print(f"解压完成！{len(entries)} 个文件，{size // (1024*1024)}MB，用时 {time.perf_counter() - start:.1f} 秒")
+    return extracted
 
-def setup_model(model_type="cn_small"):
+def setup_model(model_type="cn_small", force=None, keep_zip=None, sha256=None, segments=4,
+                cache_dir=DEFAULT_CACHE_DIR):
     """
     设置模型
     
     Args:
         model_type (str): 模型类型
+        force (bool): 已存在同名模型时是否覆盖，None表示交互询问
+        keep_zip (bool): 是否保留下载的zip文件，None表示交互询问
+        sha256 (str): 期望的zip文件SHA-256，默认使用模型表中的值
+        segments (int): 并行下载的分段数
+        cache_dir (str): 下载缓存目录，None表示不使用缓存
     """
-    models = {
-        "cn_small": {
-            "url": "https://alphacephei.com/vosk/models/vosk-model-small-cn-0.22.zip",
-            "filename": "vosk-model-small-cn-0.22.zip",
-            "folder": "vosk-model-small-cn-0.22",
-            "size": "42MB",
-            "description": "中文小型模型（推荐）",
-            "accuracy": "适合移动设备和树莓派，识别速度快"
-        },
-        "cn_standard": {
-            "url": "https://alphacephei.com/vosk/models/vosk-model-cn-0.22.zip",
-            "filename": "vosk-model-cn-0.22.zip",
-            "folder": "vosk-model-cn-0.22",
-            "size": "1.3GB",
-            "description": "中文标准模型（高精度）",
-            "accuracy": "服务器级别，识别精度更高"
-        },
-        "cn_kaldi": {
-            "url": "https://alphacephei.com/vosk/models/vosk-model-cn-kaldi-multicn-0.15.zip",
-            "filename": "vosk-model-cn-kaldi-multicn-0.15.zip",
-            "folder": "vosk-model-cn-kaldi-multicn-0.15",
-            "size": "1.5GB",
-            "description": "中文Kaldi多方言模型",
-            "accuracy": "支持多种中文方言，兼容性好"
-        },
-        "cn_old": {
-            "url": "https://alphacephei.com/vosk/models/vosk-model-cn-0.15.zip",
-            "filename": "vosk-model-cn-0.15.zip",
-            "folder": "vosk-model-cn-0.15",
-            "size": "1.67GB",
-            "description": "中文旧版大模型",
-            "accuracy": "较老版本，但稳定性好"
-        },
-        "en": {
-            "url": "https://alphacephei.com/vosk/models/vosk-model-small-en-us-0.15.zip",
-            "filename": "vosk-model-small-en-us-0.15.zip",
-            "folder": "vosk-model-small-en-us-0.15",
-            "size": "40MB",
-            "description": "英文小型模型",
-            "accuracy": "适合英文语音识别"
-        }
-    }
-    
-    if model_type not in models:
+    if model_type not in MODELS:
         print(f"不支持的模型类型: {model_type}")
-        print("支持的类型: cn (中文), en (英文)")
+        print(f"支持的类型: {', '.join(MODELS)}")
         return False
     
-    model_info = models[model_type]
+    model_info = MODELS[model_type]
     
     print(f"=== 下载 {model_info['description']} ===")
     print(f"模型大小: {model_info['size']}")
@@ -103,32 +520,38 @@ def setup_model(model_type="cn_small"):
     # 检查是否已存在该特定模型
     model_path = os.path.join(models_dir, model_info['folder'])
     if os.path.exists(model_path):
-        response = input(f"检测到已存在模型文件夹 '{model_info['folder']}'，是否覆盖？(y/n): ")
-        if response.lower() != 'y':
-            print("取消下载")
-            return False
-        shutil.rmtree(model_path)
+        if force is None:
+            response = input(f"检测到已存在模型文件夹 '{model_info['folder']}'，是否覆盖？(y/n): ")
+            force = response.lower() == 'y'
+        if not force:
+            print(f"模型 '{model_info['folder']}' 已存在，跳过")
+            return True
+        # 旧目录在新模型解压就位后才被替换
     
     try:
-        # 下载模型
-        if not os.path.exists(model_info['filename']):
-            download_file(model_info['url'], model_info['filename'])
-        else:
+        # 下载模型（已下载的zip有期望哈希时先校验，不符则重新下载）
+        expected = sha256 or model_info.get('sha256')
+        if os.path.exists(model_info['filename']) and (not expected or file_sha256(model_info['filename']) == expected):
             print(f"模型文件 {model_info['filename']} 已存在，跳过下载")
+        else:
+            download_file(model_info['url'], model_info['filename'], expected, segments, cache_dir)
         
         # 解压模型到models目录
         extract_model(model_info['filename'], models_dir)
         
-        # 检查解压结果
+        # 检查解压结果，并登记到模型注册表
         if os.path.exists(model_path):
+            from model_registry import get_registry
+            get_registry(models_dir).register(model_path)
             print(f"模型已设置完成！模型位置: {model_path}")
         else:
             print(f"警告：未找到解压后的文件夹 {model_info['folder']}")
             return False
         
-        # 清理zip文件
-        cleanup = input("是否删除下载的zip文件？(y/n): ")
-        if cleanup.lower() == 'y':
+        # 清理zip文件（启用缓存时缓存中仍保留一份）
+        if keep_zip is None:
+            keep_zip = input("是否删除下载的zip文件？(y/n): ").lower() != 'y'
+        if not keep_zip:
             os.remove(model_info['filename'])
             print("zip文件已删除")
         
@@ -147,6 +570,22 @@ def main():
     """
     主函数
     """
+    parser = argparse.ArgumentParser(description="Vosk 语音识别模型下载工具（不带参数时进入交互菜单）")
+    parser.add_argument("model", nargs="?", choices=list(MODELS), help="要下载的模型")
+    parser.add_argument("--force", action="store_true", help="覆盖已存在的模型文件夹")
+    parser.add_argument("--keep-zip", action="store_true", help="保留下载的zip文件")
+    parser.add_argument("--sha256", help="期望的zip文件SHA-256（只有校验过的文件才会写入缓存）")
+    parser.add_argument("--segments", type=int, default=4, help="并行下载的分段数")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="下载缓存目录，可指向多台机器共享的镜像（环境变量 VOSK_MODEL_CACHE）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用下载缓存")
+    args = parser.parse_args()
+    
+    if args.model:
+        ok = setup_model(args.model, force=args.force, keep_zip=args.keep_zip, sha256=args.sha256,
+                         segments=args.segments, cache_dir=None if args.no_cache else args.cache_dir)
+        sys.exit(0 if ok else 1)
+    
     print("Vosk 语音识别模型下载工具")
     print("="*50)
     print("请选择要下载的模型：")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+双解码器：JSGF指令识别器和开放词汇识别器并行解码同一段音频
+每个音频块同时提交给两个识别器（各占一个工作线程，Vosk 的C调用期间释放GIL），
+所以每块的延迟取决于较慢的解码器而不是两者之和；每句话结束时由仲裁器按置信度选出一个结果
+
+对外接口与 KaldiRecognizer 一致，可直接替换识别器使用
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from audio_buffers import accept_waveform
+
+UNKNOWN_WORD = "[unk]"
+
+
+def result_confidence(result: dict) -> float:
+    """
+    计算一个完整结果的置信度：词置信度的平均值，[unk] 计为0，空结果为-1
+
+    Args:
+        result (dict): 识别器返回的完整结果
+
+    Returns:
+        float: 置信度
+    """
+    words = result.get("result") or []
+    if not words:
+        return 0.0 if result.get("text") else -1.0
+    return sum(0.0 if w["word"] == UNKNOWN_WORD else w.get("conf", 1.0) for w in words) / len(words)
+
+
+def _merge(first: dict, second: dict) -> dict:
+    """
+    合并同一识别器在等待期间产生的两个完整结果
+    """
+    return {
+        "text": " ".join(filter(None, (first.get("text"), second.get("text")))),
+        "result": (first.get("result") or []) + (second.get("result") or []),
+    }
+
+
+class DualDecoder:
+    """并行的指令/开放词汇双解码器"""
+
+    def __init__(self, command_recognizer, dictation_recognizer, max_wait_chunks: int = 4):
+        """
+        初始化双解码器
+
+        Args:
+            command_recognizer: 使用JSGF语法的指令识别器
+            dictation_recognizer: 开放词汇识别器
+            max_wait_chunks (int): 一个识别器检测到句尾后最多再等另一个识别器多少个块，超时则强制结束它的当前句子
+        """
+        self.recognizers = {"command": command_recognizer, "dictation": dictation_recognizer}
+        self.max_wait_chunks = max_wait_chunks
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="dual-decoder")
+        self._pending: Dict[str, dict] = {}
+        self._waited = 0
+        self._final = ""
+        self.stats = {"chunks": 0, "utterances": 0, "command_wins": 0, "dictation_wins": 0,
+                      "forced_endpoints": 0, "parallel_seconds": 0.0, "sequential_seconds": 0.0}
+
+    def _decode(self, name: str, data):
+        start = time.perf_counter()
+        ended = accept_waveform(self.recognizers[name], data)
+        return ended, time.perf_counter() - start
+
+    def AcceptWaveform(self, data) -> bool:
+        start = time.perf_counter()
+        futures = {name: self._executor.submit(self._decode, name, data) for name in self.recognizers}
+        for name, future in futures.items():
+            ended, elapsed = future.result()
+            self.stats["sequential_seconds"] += elapsed
+            if ended:
+                result = json.loads(self.recognizers[name].Result())
+                if name in self._pending:
+                    result = _merge(self._pending[name], result)
+                self._pending[name] = result
+        self.stats["chunks"] += 1
+        self.stats["parallel_seconds"] += time.perf_counter() - start
+
+        if not self._pending:
+            return False
+        if len(self._pending) < len(self.recognizers):
+            self._waited += 1
+            if self._waited < self.max_wait_chunks:
+                return False
+            # 另一个识别器迟迟没有检测到句尾，强制结束它的当前句子
+            for name, recognizer in self.recognizers.items():
+                if name not in self._pending:
+                    self._pending[name] = json.loads(recognizer.FinalResult())
+            self.stats["forced_endpoints"] += 1
+        self._final = self._arbitrate()
+        return True
+
+    def _arbitrate(self) -> str:
+        """
+        从两个结果中选出置信度更高的一个，相同时优先指令识别器
+        """
+        scores = {name: result_confidence(result) for name, result in self._pending.items()}
+        winner = max(self.recognizers, key=lambda name: (scores[name], name == "command"))
+        result = dict(self._pending[winner])
+        result["decoder"] = winner
+        result["scores"] = {name: round(score, 3) for name, score in scores.items()}
+        self.stats["utterances"] += 1
+        self.stats[f"{winner}_wins"] += 1
+        self._pending = {}
+        self._waited = 0
+        return json.dumps(result, ensure_ascii=False)
+
+    def Result(self) -> str:
+        return self._final
+
+    def PartialResult(self) -> str:
+        # 开放词汇识别器的部分结果更接近用户实际说的内容
+        return self.recognizers["dictation"].PartialResult()
+
+    def FinalResult(self) -> str:
+        for name, recognizer in self.recognizers.items():
+            result = json.loads(recognizer.FinalResult())
+            self._pending[name] = _merge(self._pending[name], result) if name in self._pending else result
+        return self._arbitrate()
+
+    def Reset(self):
+        for recognizer in self.recognizers.values():
+            recognizer.Reset()
+        self._pending = {}
+        self._waited = 0
+
+    def SetWords(self, enable_words):
+        for recognizer in self.recognizers.values():
+            recognizer.SetWords(enable_words)
+
+    def SetPartialWords(self, enable_partial_words):
+        for recognizer in self.recognizers.values():
+            if hasattr(recognizer, "SetPartialWords"):
+                recognizer.SetPartialWords(enable_partial_words)
+
+    def close(self):
+        """
+        停止工作线程（识别器本身由创建者负责归还或关闭）
+        """
+        self._executor.shutdown(wait=True)
+
+    def summary(self) -> dict:
+        """
+        获取统计信息：仲裁结果分布，以及并行解码耗时与两个识别器耗时之和的对比
+
+        Returns:
+            dict: 统计信息
+        """
+        stats = dict(self.stats)
+        stats["parallel_seconds"] = round(stats["parallel_seconds"], 3)
+        stats["sequential_seconds"] = round(stats["sequential_seconds"], 3)
+        return stats
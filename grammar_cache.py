@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSGF语法生成与磁盘缓存
+语法文本按 词汇表内容 + 分类规则 的哈希缓存到磁盘，词汇表不变时重启或新建会话都直接读取缓存
+"""
+
+import os
+import re
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+# 分类规则：修改任何一项都会改变规则指纹，从而使旧缓存失效
+GRAMMAR_RULES = {
+    "version": 1,
+    "long_function_suffixes": ['功能', '模式', '预热', '零冷水', '增压'],
+    "long_function_min_length": 3,
+    "actions": ['开', '关', '启动', '停止', '设置', '调到', '开启', '关闭'],
+    "temperature_marker": '度',
+}
+
+DEFAULT_CACHE_DIR = ".grammar_cache"
+
+_LONG_FUNCTION_RE = re.compile("|".join(map(re.escape, GRAMMAR_RULES["long_function_suffixes"])))
+_ACTIONS = frozenset(GRAMMAR_RULES["actions"])
+
+
+def rules_fingerprint() -> str:
+    """
+    计算分类规则的指纹
+
+    Returns:
+        str: 规则的SHA-256十六进制摘要
+    """
+    payload = json.dumps(GRAMMAR_RULES, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def classify_words(words: List[str]) -> Dict[str, List[str]]:
+    """
+    把词汇分为长功能词、动作词、温度词和短词
+
+    Args:
+        words (List[str]): 词汇列表
+
+    Returns:
+        Dict[str, List[str]]: 分类结果
+    """
+    min_length = GRAMMAR_RULES["long_function_min_length"]
+    marker = GRAMMAR_RULES["temperature_marker"]
+    categories = {"long_functions": [], "actions": [], "temperatures": [], "short_words": []}
+    for word in words:
+        if len(word) >= min_length and _LONG_FUNCTION_RE.search(word):
+            categories["long_functions"].append(word)
+        elif word in _ACTIONS:
+            categories["actions"].append(word)
+        elif marker in word:
+            categories["temperatures"].append(word)
+        else:
+            categories["short_words"].append(word)
+    return categories
+
+
+def build_grammar(words: List[str]) -> str:
+    """
+    生成JSGF语法规则（不截断任何分类）
+
+    Args:
+        words (List[str]): 词汇列表
+
+    Returns:
+        str: JSGF格式的语法规则
+    """
+    categories = classify_words(words)
+    long_functions = categories["long_functions"]
+    actions = categories["actions"]
+    temperatures = categories["temperatures"]
+    short_words = categories["short_words"]
+
+    grammar_lines = [
+        "#JSGF V1.0 UTF-8 zh;",
+        "grammar commands;",
+        ""
+    ]
+
+    if long_functions:
+        grammar_lines.append(f"<long_function> = {' | '.join(long_functions)};")
+    if actions:
+        grammar_lines.append(f"<action> = {' | '.join(actions)};")
+    if temperatures:
+        grammar_lines.append(f"<temperature> = {' | '.join(temperatures)};")
+    if short_words:
+        grammar_lines.append(f"<short_word> = {' | '.join(short_words)};")
+
+    # 主规则
+    main_rules = []
+    if long_functions:
+        main_rules.append("<long_function>")
+    if actions and long_functions:
+        main_rules.append("<action> <long_function>")
+    if actions and short_words:
+        main_rules.append("<action> <short_word>")
+    if temperatures:
+        main_rules.append("<temperature>")
+        main_rules.append("调到 <temperature>")
+
+    if main_rules:
+        grammar_lines.append(f"public <command> = {' | '.join(main_rules)};")
+    else:
+        # 如果没有分类成功，使用所有词汇
+        grammar_lines.append(f"public <command> = {' | '.join(words)};")
+
+    return "\n".join(grammar_lines)
+
+
+class GrammarCache:
+    """按词汇表哈希缓存生成的语法"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        初始化语法缓存
+
+        Args:
+            cache_dir (str): 缓存目录
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(words: List[str]) -> str:
+        """
+        计算缓存键：词汇表内容与分类规则指纹的哈希
+
+        Args:
+            words (List[str]): 词汇列表
+
+        Returns:
+            str: 缓存键
+        """
+        digest = hashlib.sha256(rules_fingerprint().encode("ascii"))
+        digest.update("\n".join(words).encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        """
+        缓存文件路径
+        """
+        return os.path.join(self.cache_dir, f"{key}.jsgf")
+
+    def load(self, key: str) -> Optional[str]:
+        """
+        读取缓存的语法，不存在时返回None
+        """
+        try:
+            with open(self.path_for(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, key: str, grammar: str):
+        """
+        原子地写入缓存文件，写入失败时只打印警告
+        """
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(grammar)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"警告：写入语法缓存失败: {e}")
+
+    def get_grammar(self, words: List[str]) -> str:
+        """
+        获取词汇表对应的语法，缓存未命中时生成并写入缓存
+
+        Args:
+            words (List[str]): 词汇列表
+
+        Returns:
+            str: JSGF格式的语法规则
+        """
+        key = self.cache_key(words)
+        grammar = self.load(key)
+        if grammar is not None:
+            self.hits += 1
+            return grammar
+        self.misses += 1
+        grammar = build_grammar(words)
+        self.store(key, grammar)
+        return grammar
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别服务压测客户端
+并发回放WAV文件到 recognition_server.py，统计每路会话的实时率和尾部延迟，
+用于测量单机可承载的并发流数量
+"""
+
+import sys
+import json
+import time
+import wave
+import random
+import asyncio
+import argparse
+from typing import List
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+def load_wav(path: str) -> bytes:
+    """
+    读取16位单声道WAV文件的PCM数据
+
+    Args:
+        path (str): WAV文件路径
+
+    Returns:
+        bytes: PCM数据
+    """
+    with wave.open(path, 'rb') as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位单声道WAV文件: {path}")
+        return wf.readframes(wf.getnframes())
+
+
+async def _replay(pcm: bytes, send, chunk_bytes: int, sample_rate: int, realtime: bool):
+    """
+    按块发送音频，realtime为True时按音频时长限速
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk_bytes):
+        await send(pcm[offset:offset + chunk_bytes])
+        if realtime:
+            due = start + (offset + chunk_bytes) / 2 / sample_rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def run_tcp_stream(host: str, port: int, pcm: bytes, chunk_bytes: int,
+                         sample_rate: int, realtime: bool) -> dict:
+    """
+    通过TCP回放一路音频
+
+    Returns:
+        dict: 本路会话的统计结果
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    results = []
+    start = time.perf_counter()
+
+    async def collect():
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            results.append(json.loads(line))
+
+    async def send(data: bytes):
+        writer.write(data)
+        await writer.drain()
+
+    collector = asyncio.ensure_future(collect())
+    await _replay(pcm, send, chunk_bytes, sample_rate, realtime)
+    sent = time.perf_counter()
+    writer.write_eof()
+    await collector
+    finished = time.perf_counter()
+    writer.close()
+    return _summarize(results, len(pcm), sample_rate, start, sent, finished)
+
+
+async def run_ws_stream(url: str, pcm: bytes, chunk_bytes: int, sample_rate: int, realtime: bool) -> dict:
+    """
+    通过WebSocket回放一路音频
+
+    Returns:
+        dict: 本路会话的统计结果
+    """
+    results = []
+    async with websockets.connect(url) as ws:
+        start = time.perf_counter()
+
+        async def collect():
+            async for message in ws:
+                results.append(json.loads(message))
+
+        collector = asyncio.ensure_future(collect())
+        await _replay(pcm, ws.send, chunk_bytes, sample_rate, realtime)
+        sent = time.perf_counter()
+        await ws.send('{"eof": 1}')
+        # 服务端发送最终结果后关闭连接
+        await collector
+        finished = time.perf_counter()
+    return _summarize(results, len(pcm), sample_rate, start, sent, finished)
+
+
+def _summarize(results: List[dict], pcm_bytes: int, sample_rate: int,
+               start: float, sent: float, finished: float) -> dict:
+    """
+    汇总一路会话的统计结果
+    """
+    duration = pcm_bytes / 2 / sample_rate
+    texts = [r.get('text') for r in results if r.get('text')]
+    return {
+        "duration": duration,
+        "wall": finished - start,
+        "rtf": (finished - start) / duration if duration else None,
+        "tail_latency": finished - sent,
+        "messages": len(results),
+        "text": " ".join(texts),
+    }
+
+
+async def run_load(args, files: List[str]) -> List[dict]:
+    """
+    按并发数启动多路会话
+    """
+    pcms = [load_wav(f) for f in files]
+    chunk_bytes = args.chunk_frames * 2
+
+    async def one(i: int) -> dict:
+        pcm = pcms[i % len(pcms)] if not args.shuffle else random.choice(pcms)
+        if args.url:
+            return await run_ws_stream(args.url, pcm, chunk_bytes, args.sample_rate, args.realtime)
+        return await run_tcp_stream(args.host, args.port, pcm, chunk_bytes, args.sample_rate, args.realtime)
+
+    return await asyncio.gather(*(one(i) for i in range(args.streams)), return_exceptions=True)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 识别服务压测客户端")
+    parser.add_argument("files", nargs="+", help="回放的WAV文件（16位单声道）")
+    parser.add_argument("-n", "--streams", type=int, default=4, help="并发会话数 (默认: 4)")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP服务地址 (默认: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=2700, help="TCP服务端口 (默认: 2700)")
+    parser.add_argument("--url", default=None, help="使用WebSocket时的地址，如 ws://127.0.0.1:2701")
+    parser.add_argument("--chunk-frames", type=int, default=4000, help="每次发送的帧数 (默认: 4000)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="音频采样率 (默认: 16000)")
+    parser.add_argument("--realtime", action="store_true", help="按实时速度发送，而不是尽快发送")
+    parser.add_argument("--shuffle", action="store_true", help="每路会话随机选择文件")
+    args = parser.parse_args()
+
+    if args.url and websockets is None:
+        print("错误：未安装 websockets (pip install websockets)")
+        return 1
+
+    start = time.perf_counter()
+    results = asyncio.run(run_load(args, args.files))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if isinstance(r, dict)]
+    errors = [r for r in results if not isinstance(r, dict)]
+    for r in errors:
+        print(f"会话失败: {r!r}", file=sys.stderr)
+    if not ok:
+        return 1
+
+    audio = sum(r["duration"] for r in ok)
+    rtfs = sorted(r["rtf"] for r in ok)
+    tails = sorted(r["tail_latency"] for r in ok)
+    print(json.dumps({
+        "streams": args.streams,
+        "failed": len(errors),
+        "realtime": args.realtime,
+        "audio_seconds": round(audio, 2),
+        "wall_seconds": round(wall, 3),
+        "throughput_x_realtime": round(audio / wall, 2) if wall else None,
+        "rtf_p50": round(rtfs[len(rtfs) // 2], 4),
+        "rtf_max": round(rtfs[-1], 4),
+        "tail_latency_p50": round(tails[len(tails) // 2], 4),
+        "tail_latency_max": round(tails[-1], 4),
+    }, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus 风格的指标与分阶段计时
+计数器和直方图在内存中累加，由本地 HTTP 端点按 Prometheus 文本格式（0.0.4）导出：
+    curl http://127.0.0.1:9108/metrics
+
+未启用时识别循环调用的是原始函数，没有任何额外开销；启用后各阶段函数被替换为计时包装
+（见 RecognitionMetrics.timed），每次调用多两次 perf_counter 和一次直方图累加，约1微秒
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+# 秒级耗时的默认分桶：从0.1毫秒（JSON解析、词汇匹配）到2.5秒（采集等待）
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5)
+# Vosk 完整结果中文本为空的写法（"text" : ""），用于不解析JSON地统计非空结果
+_EMPTY_TEXT = re.compile(r'"text"\s*:\s*""')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """只增不减的计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, self.value
+
+
+class CallbackMetric:
+    """采集时才调用函数取值的计数器或仪表，用于导出其他模块已有的统计（如环形缓冲区溢出次数）"""
+
+    def __init__(self, name: str, help_text: str, func: Callable[[], float], kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.func = func
+        self.kind = kind
+
+    def samples(self):
+        yield self.name, self.func()
+
+
+class Histogram:
+    """固定分桶的直方图"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.bounds = list(buckets)
+        # 最后一个桶对应 +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative = 0
+        for bound, n in zip(self.bounds + [float("inf")], counts):
+            cumulative += n
+            yield f'{self.name}_bucket{{le="{_format_value(bound)}"}}', cumulative
+        yield f"{self.name}_sum", total
+        yield f"{self.name}_count", count
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def callback(self, name: str, help_text: str, func: Callable[[], float], kind: str = "gauge") -> CallbackMetric:
+        """
+        注册采集时调用 func 取值的指标；同名指标会被替换（例如重新打开音频管线后指向新的对象）
+        """
+        metric = CallbackMetric(name, help_text, func, kind)
+        with self._lock:
+            self._metrics[name] = metric
+        return metric
+
+    def exposition(self) -> str:
+        """
+        生成 Prometheus 文本格式
+
+        Returns:
+            str: 所有指标的文本
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                samples = list(metric.samples())
+            except Exception:
+                # 回调对象已失效时跳过，不影响其他指标
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {_format_value(value)}" for name, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+class RecognitionMetrics:
+    """识别循环各阶段的指标"""
+
+    def __init__(self, registry: Optional[Registry] = None):
+        """
+        Args:
+            registry (Optional[Registry]): 指标注册表，默认新建
+        """
+        self.registry = registry or Registry()
+        histogram = self.registry.histogram
+        counter = self.registry.counter
+        self.capture_wait = histogram("vosk_capture_wait_seconds", "解码线程等待下一个音频块的时间")
+        self.accept_waveform = histogram("vosk_accept_waveform_seconds", "AcceptWaveform 耗时")
+        self.result = histogram("vosk_result_seconds", "Result/FinalResult 耗时")
+        self.partial_result = histogram("vosk_partial_result_seconds", "PartialResult 耗时")
+        self.json_parse = histogram("vosk_json_parse_seconds", "识别结果JSON解析耗时")
+        self.vocab_match = histogram("vosk_vocab_match_seconds", "自定义词汇匹配耗时")
+        self.endpoints = counter("vosk_endpoints_total", "AcceptWaveform 检测到句尾的次数")
+        self.utterances = counter("vosk_utterances_total", "文本非空的完整识别结果数")
+
+    def timed(self, histogram: Histogram, func: Callable) -> Callable:
+        """
+        把函数包装为记录耗时的版本
+
+        Args:
+            histogram (Histogram): 记录耗时的直方图
+            func (Callable): 原函数
+
+        Returns:
+            Callable: 参数和返回值与原函数相同的包装函数
+        """
+        observe = histogram.observe
+
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                observe(perf_counter() - start)
+
+        return wrapper
+
+    def timed_accept(self, accept: Callable) -> Callable:
+        """
+        包装 accept_waveform：记录耗时并统计句尾触发次数
+        """
+        observe = self.accept_waveform.observe
+        endpoints = self.endpoints
+
+        def wrapper(recognizer, data):
+            start = perf_counter()
+            ended = accept(recognizer, data)
+            observe(perf_counter() - start)
+            if ended:
+                endpoints.inc()
+            return ended
+
+        return wrapper
+
+    def timed_result(self, result: Callable) -> Callable:
+        """
+        包装 Result()：记录耗时并统计文本非空的完整结果数
+
+        在解码线程中计数，与消费者是否解析事件无关；只用正则检查 text 字段是否为空，不解析JSON
+        """
+        observe = self.result.observe
+        utterances = self.utterances
+        empty = _EMPTY_TEXT.search
+
+        def wrapper(recognizer):
+            start = perf_counter()
+            raw = result(recognizer)
+            observe(perf_counter() - start)
+            if not empty(raw):
+                utterances.inc()
+            return raw
+
+        return wrapper
+
+    def bind_pipeline(self, pipeline):
+        """
+        导出音频管线的计数器，并为解码线程的等待计时
+
+        Args:
+            pipeline (AudioPipeline): 音频管线
+        """
+        pipeline.read_chunk = self.timed(self.capture_wait, pipeline.ring.readinto)
+        callback = self.registry.callback
+        callback("vosk_chunks_total", "送入识别流程的音频块数", lambda: pipeline.chunks, "counter")
+        callback("vosk_ring_overruns_total", "环形缓冲区空间不足、整块丢弃新写入音频的次数",
+                 lambda: pipeline.ring.overruns, "counter")
+        callback("vosk_input_overflows_total", "声卡输入溢出次数", lambda: pipeline.input_overflows, "counter")
+        callback("vosk_queue_depth_seconds", "环形缓冲区中待解码的音频时长",
+                 lambda: len(pipeline.ring) / (pipeline.sample_rate * 2))
+
+
+class MetricsServer:
+    """在后台线程中提供 /metrics 的本地HTTP服务"""
+
+    def __init__(self, registry: Registry, port: int = 9108, host: str = "127.0.0.1"):
+        """
+        Args:
+            registry (Registry): 导出的指标注册表
+            port (int): 监听端口，0表示由系统分配
+            host (str): 监听地址，默认只监听本机
+        """
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?", 1)[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.exposition().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def start_metrics(port: Optional[int], host: str = "127.0.0.1"):
+    """
+    按端口参数启用指标：port 为None时返回 (None, None)，识别循环保持原样
+
+    Args:
+        port (Optional[int]): HTTP端口，None表示不启用
+        host (str): 监听地址
+
+    Returns:
+        tuple: (RecognitionMetrics, MetricsServer)，启动失败时打印原因并返回 (None, None)
+    """
+    if port is None:
+        return None, None
+    metrics = RecognitionMetrics()
+    try:
+        server = MetricsServer(metrics.registry, port, host)
+    except OSError as e:
+        print(f"指标服务启动失败，未启用指标: {e}")
+        return None, None
+    server.start()
+    print(f"指标服务已启动: http://{host}:{server.port}/metrics")
+    return metrics, server
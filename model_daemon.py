@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vosk 模型常驻预加载守护进程
+守护进程启动时加载模型并预热识别器，通过Unix域套接字对外提供识别会话；
+识别程序以客户端模式连接后无需在本进程加载模型，冷启动到首个部分结果只需毫秒级
+
+协议（每个连接是一个识别会话）：
+- 客户端先发送一行JSON会话头: {"model": 模型路径或null, "sample_rate": 16000, "grammar": 语法或null}
+  模型只能是启动时指定的模型或注册表中登记的模型
+- 之后每个请求为 1字节类型 + 4字节大端长度 + 负载（不超过 MAX_REQUEST_BYTES），每个响应为 4字节大端长度 + 负载
+- 请求类型: A=AcceptWaveform R=Result P=PartialResult F=FinalResult
+           Z=Reset W=SetWords V=SetPartialWords G=SetGrammar
+- 状态查询：会话头为 {"status": true} 时返回一个响应（各模型池的就绪状态和预热耗时）后关闭连接，
+  编排系统可以用 python model_daemon.py --status 作为就绪探针
+"""
+
+import os
+import sys
+import json
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+from typing import Dict, List, Optional
+
+from recognizer_pool import RecognizerPool
+from model_registry import get_registry, resolve_model_path
+from audio_buffers import accept_waveform
+
+DEFAULT_SOCKET = os.environ.get("VOSK_DAEMON_SOCKET", "/tmp/vosk_model_daemon.sock")
+
+_REQUEST = struct.Struct(">cI")
+_RESPONSE = struct.Struct(">I")
+# 单个请求负载和会话头的上限（约 48kHz 双声道 float32 的 1.3 秒，或 16kHz 16位的 32 秒音频），
+# 格式错误的请求不会让常驻进程分配任意大的内存
+MAX_REQUEST_BYTES = 1 << 20
+MAX_HEADER_BYTES = 64 * 1024
+
+
+def _recv_into(sock: socket.socket, view: memoryview):
+    """
+    从套接字读取恰好 len(view) 字节到预分配的缓冲区
+    """
+    pos = 0
+    while pos < len(view):
+        got = sock.recv_into(view[pos:])
+        if not got:
+            raise ConnectionError("连接已关闭")
+        pos += got
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    """
+    从套接字读取恰好n字节
+    """
+    buf = bytearray(n)
+    _recv_into(sock, memoryview(buf))
+    return bytes(buf)
+
+
+def daemon_available(socket_path: str = DEFAULT_SOCKET) -> bool:
+    """
+    检查守护进程是否在运行
+
+    Args:
+        socket_path (str): 守护进程的套接字路径
+
+    Returns:
+        bool: 可以连接返回True
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def daemon_status(socket_path: str = DEFAULT_SOCKET, timeout: float = 2.0) -> Optional[dict]:
+    """
+    查询守护进程中各模型池的就绪状态
+
+    Args:
+        socket_path (str): 守护进程的套接字路径
+        timeout (float): 超时秒数
+
+    Returns:
+        Optional[dict]: {"ready": 全部就绪, "pools": {模型@采样率: 状态}}，无法连接时返回None
+    """
+    if not daemon_available(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(b'{"status": true}\n')
+            (length,) = _RESPONSE.unpack(_recv_exact(sock, _RESPONSE.size))
+            return json.loads(_recv_exact(sock, length))
+    except (OSError, ValueError):
+        return None
+
+
+class RemoteRecognizer:
+    """与KaldiRecognizer接口一致的守护进程客户端"""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, model: Optional[str] = None,
+                 sample_rate: int = 16000, grammar: Optional[str] = None):
+        """
+        连接守护进程并开启一个识别会话
+
+        Args:
+            socket_path (str): 守护进程的套接字路径
+            model (Optional[str]): 模型路径，None表示使用守护进程的默认模型
+            sample_rate (int): 音频采样率
+            grammar (Optional[str]): 语法或词汇表JSON
+        """
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        header = {"model": model, "sample_rate": sample_rate, "grammar": grammar}
+        self.sock.sendall(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+        reply = json.loads(self._read_response())
+        if "error" in reply:
+            self.sock.close()
+            raise RuntimeError(reply["error"])
+        self.model_path = reply.get("model")
+
+    def _read_response(self) -> bytes:
+        (length,) = _RESPONSE.unpack(_recv_exact(self.sock, _RESPONSE.size))
+        return _recv_exact(self.sock, length)
+
+    def _call(self, kind: bytes, payload: bytes = b"") -> bytes:
+        self.sock.sendall(_REQUEST.pack(kind, len(payload)))
+        if payload:
+            self.sock.sendall(payload)
+        return self._read_response()
+
+    def AcceptWaveform(self, data) -> bool:
+        if len(data) > MAX_REQUEST_BYTES:
+            raise ValueError(f"音频块过大: {len(data)} 字节（上限 {MAX_REQUEST_BYTES}）")
+        return self._call(b"A", data) == b"1"
+
+    def Result(self) -> str:
+        return self._call(b"R").decode("utf-8")
+
+    def PartialResult(self) -> str:
+        return self._call(b"P").decode("utf-8")
+
+    def FinalResult(self) -> str:
+        return self._call(b"F").decode("utf-8")
+
+    def Reset(self):
+        self._call(b"Z")
+
+    def SetWords(self, enable_words):
+        self._call(b"W", b"1" if enable_words else b"0")
+
+    def SetPartialWords(self, enable_partial_words):
+        self._call(b"V", b"1" if enable_partial_words else b"0")
+
+    def SetGrammar(self, grammar: str):
+        reply = self._call(b"G", grammar.encode("utf-8"))
+        if reply:
+            # 守护进程换识别器失败时会返回错误并结束会话
+            self.close()
+            raise RuntimeError(json.loads(reply)["error"])
+
+    def close(self):
+        """
+        结束会话，守护进程会把识别器归还到池中
+        """
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+    def __del__(self):
+        self.close()
+
+
+class ModelDaemon:
+    """持有已加载模型的守护进程"""
+
+    def __init__(self, model_paths: List[str], socket_path: str = DEFAULT_SOCKET,
+                 max_sessions: int = 8, prewarm: int = 2):
+        """
+        初始化守护进程
+
+        Args:
+            model_paths (List[str]): 需要预加载的模型路径，第一个为默认模型
+            socket_path (str): 监听的Unix套接字路径
+            max_sessions (int): 每个模型的最大并发会话数
+            prewarm (int): 每个模型预先创建的识别器数量
+        """
+        # 除路径外也可以是注册表中的模型名称或语言代码（见 model_registry.py）
+        self.model_paths = [os.path.abspath(resolve_model_path(p) or p) for p in model_paths]
+        self.socket_path = socket_path
+        self.max_sessions = max_sessions
+        self.prewarm = prewarm
+        self.pools: Dict[str, RecognizerPool] = {}
+        self._lock = threading.Lock()
+        self.server = None
+
+    def resolve_model(self, model_path: Optional[str]) -> str:
+        """
+        把客户端请求的模型解析为模型目录：只接受启动时指定的模型和注册表中登记的模型，
+        客户端不能让守护进程加载任意路径
+
+        Raises:
+            ValueError: 请求的模型不在允许范围内
+        """
+        if not model_path:
+            return self.model_paths[0]
+        path = os.path.abspath(model_path)
+        if path in self.model_paths:
+            return path
+        entry = get_registry().get(model_path)
+        if entry is not None:
+            return os.path.abspath(entry["path"])
+        raise ValueError(f"守护进程未提供该模型: {model_path}")
+
+    def get_pool(self, model_path: Optional[str], sample_rate: int) -> RecognizerPool:
+        """
+        获取模型对应的识别器池，未预加载的注册表模型会在首次使用时加载
+        """
+        path = self.resolve_model(model_path)
+        key = f"{path}@{sample_rate}"
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                model = next((p.model for p in self.pools.values() if p.model_path == path), None)
+                pool = RecognizerPool(path, sample_rate=sample_rate, max_size=self.max_sessions, model=model)
+                if not pool.load_model():
+                    raise RuntimeError(f"无法加载模型: {path}")
+                self.pools[key] = pool
+        return pool
+
+    def preload(self) -> bool:
+        """
+        预加载所有模型并预热识别器
+
+        Returns:
+            bool: 全部加载成功返回True
+        """
+        for path in self.model_paths:
+            try:
+                pool = self.get_pool(path, 16000)
+                pool.prewarm(self.prewarm)
+                print(pool.warmup.report())
+            except Exception as e:
+                print(f"预加载模型失败: {e}")
+                return False
+        return True
+
+    def status(self) -> dict:
+        """
+        获取各模型池的就绪状态和预热耗时
+
+        Returns:
+            dict: {"ready": 全部就绪, "pools": {模型@采样率: 状态}}
+        """
+        with self._lock:
+            pools = dict(self.pools)
+        states = {key: dict(pool.warmup.to_dict(), **pool.stats()) for key, pool in pools.items()}
+        return {"ready": bool(states) and all(state["ready"] for state in states.values()), "pools": states}
+
+    def handle_session(self, conn: socket.socket):
+        """
+        处理一个客户端会话
+        """
+        header_bytes = b""
+        while not header_bytes.endswith(b"\n"):
+            chunk = conn.recv(1)
+            if not chunk or len(header_bytes) >= MAX_HEADER_BYTES:
+                return
+            header_bytes += chunk
+
+        def respond(payload: bytes):
+            conn.sendall(_RESPONSE.pack(len(payload)) + payload)
+
+        try:
+            header = json.loads(header_bytes)
+            if header.get("status"):
+                respond(json.dumps(self.status(), ensure_ascii=False).encode("utf-8"))
+                return
+            pool = self.get_pool(header.get("model"), int(header.get("sample_rate") or 16000))
+            grammar = header.get("grammar")
+            recognizer = pool.acquire(grammar, timeout=5.0)
+        except Exception as e:
+            respond(json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"))
+            return
+        respond(json.dumps({"model": pool.model_path}, ensure_ascii=False).encode("utf-8"))
+
+        # 音频直接接收到会话内复用的缓冲区，再以 memoryview 交给识别器
+        audio = memoryview(bytearray(65536))
+        try:
+            while True:
+                kind, length = _REQUEST.unpack(_recv_exact(conn, _REQUEST.size))
+                if length > MAX_REQUEST_BYTES:
+                    respond(json.dumps({"error": f"请求过大: {length} 字节（上限 {MAX_REQUEST_BYTES}）"},
+                                       ensure_ascii=False).encode("utf-8"))
+                    return
+                if kind == b"A":
+                    if length > len(audio):
+                        audio = memoryview(bytearray(length))
+                    _recv_into(conn, audio[:length])
+                    respond(b"1" if accept_waveform(recognizer, audio[:length]) else b"0")
+                    continue
+                payload = _recv_exact(conn, length) if length else b""
+                if kind == b"R":
+                    respond(recognizer.Result().encode("utf-8"))
+                elif kind == b"P":
+                    respond(recognizer.PartialResult().encode("utf-8"))
+                elif kind == b"F":
+                    respond(recognizer.FinalResult().encode("utf-8"))
+                elif kind == b"Z":
+                    recognizer.Reset()
+                    respond(b"")
+                elif kind == b"W":
+                    recognizer.SetWords(payload == b"1")
+                    respond(b"")
+                elif kind == b"V":
+                    recognizer.SetPartialWords(payload == b"1")
+                    respond(b"")
+                elif kind == b"G":
+                    # 语法不同的识别器属于不同子池，换一个识别器而不是修改池中的对象
+                    pool.release(recognizer)
+                    recognizer = None
+                    try:
+                        recognizer = pool.acquire(payload.decode("utf-8"), timeout=5.0)
+                    except Exception as e:
+                        # 换不到识别器时会话无法继续，告知客户端后结束会话
+                        respond(json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8"))
+                        return
+                    respond(b"")
+                else:
+                    raise ValueError(f"未知请求类型: {kind!r}")
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if recognizer is not None:
+                pool.release(recognizer)
+
+    def serve_forever(self):
+        """
+        监听Unix套接字并为每个连接启动一个处理线程
+        """
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                daemon.handle_session(self.request)
+
+        if os.path.exists(self.socket_path):
+            if daemon_available(self.socket_path):
+                print(f"错误：已有守护进程在监听 {self.socket_path}")
+                return
+            os.remove(self.socket_path)
+
+        socketserver.ThreadingUnixStreamServer.daemon_threads = True
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        print(f"模型守护进程已启动: {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 模型预加载守护进程")
+    parser.add_argument("-m", "--model", action="append", default=None,
+                        help="预加载的模型路径、名称或语言代码，可重复指定，第一个为默认模型 (默认: model)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Unix套接字路径 (默认: {DEFAULT_SOCKET})")
+    parser.add_argument("--max-sessions", type=int, default=8, help="每个模型的最大并发会话数 (默认: 8)")
+    parser.add_argument("--prewarm", type=int, default=2, help="每个模型预先创建的识别器数 (默认: 2)")
+    parser.add_argument("--status", action="store_true",
+                        help="查询运行中的守护进程是否就绪，就绪时退出码为0（可用作就绪探针）")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("错误：当前系统不支持Unix域套接字")
+        return 1
+
+    if args.status:
+        status = daemon_status(args.socket)
+        print(json.dumps(status, ensure_ascii=False, indent=2))
+        return 0 if status and status["ready"] else 1
+
+    from vosk import SetLogLevel
+    SetLogLevel(-1)
+
+    daemon = ModelDaemon(args.model or ["model"], args.socket, args.max_sessions, args.prewarm)
+    if not daemon.preload():
+        return 1
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\n模型守护进程已停止")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模型目录完整性清单
+解压模型时为每个文件记录大小、SHA-256 和修改时间，写入模型目录下的 .vosk-manifest.json。
+启动时只需对清单中的文件逐个 stat，比较大小和修改时间，不读取文件内容，整个模型目录毫秒级完成校验；
+需要确认内容时可用 deep=True 重新计算哈希
+
+对已有的模型目录生成/校验清单：
+    python model_manifest.py model            # 生成清单
+    python model_manifest.py model --check    # 快速校验
+    python model_manifest.py model --deep     # 重新计算哈希校验
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from typing import Dict, List, Optional
+
+MANIFEST_NAME = ".vosk-manifest.json"
+MANIFEST_VERSION = 1
+_READ_BLOCK = 1 << 20
+
+
+def hash_file(path: str) -> str:
+    """
+    计算文件的SHA-256
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        str: 十六进制哈希
+    """
+    digest = hashlib.sha256()
+    buffer = memoryview(bytearray(_READ_BLOCK))
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(buffer[:n])
+    return digest.hexdigest()
+
+
+def file_entry(path: str, sha256: str) -> dict:
+    """
+    生成清单中一个文件的记录
+
+    Args:
+        path (str): 文件路径
+        sha256 (str): 文件内容的SHA-256
+
+    Returns:
+        dict: {"size", "sha256", "mtime_ns"}
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "sha256": sha256, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_manifest(model_dir: str, files: Optional[Dict[str, dict]] = None, source: Optional[str] = None) -> str:
+    """
+    写出模型目录的清单
+
+    Args:
+        model_dir (str): 模型目录
+        files (Optional[Dict[str, dict]]): 相对路径（以 / 分隔）到文件记录的映射，None表示遍历目录重新计算
+        source (Optional[str]): 模型来源（如zip文件名）
+
+    Returns:
+        str: 清单文件路径
+    """
+    if files is None:
+        files = {}
+        for root, _, names in os.walk(model_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, model_dir).replace(os.sep, "/")
+                if relative != MANIFEST_NAME:
+                    files[relative] = file_entry(path, hash_file(path))
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": source,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "total_bytes": sum(entry["size"] for entry in files.values()),
+        "files": dict(sorted(files.items())),
+    }
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+def load_manifest(model_dir: str) -> Optional[dict]:
+    """
+    读取模型目录的清单
+
+    Returns:
+        Optional[dict]: 清单内容，不存在或无法解析时返回None
+    """
+    try:
+        with open(os.path.join(model_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def validate_model(model_dir: str, deep: bool = False) -> Optional[List[str]]:
+    """
+    按清单校验模型目录
+
+    Args:
+        model_dir (str): 模型目录
+        deep (bool): 是否重新计算每个文件的哈希；默认只比较大小和修改时间
+
+    Returns:
+        Optional[List[str]]: 问题列表，为空表示完整；没有清单时返回None
+    """
+    manifest = load_manifest(model_dir)
+    if manifest is None:
+        return None
+    problems = []
+    for relative, entry in manifest["files"].items():
+        path = os.path.join(model_dir, *relative.split("/"))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            problems.append(f"缺少文件: {relative}")
+            continue
+        if stat.st_size != entry["size"]:
+            problems.append(f"大小不符: {relative} ({stat.st_size} != {entry['size']})")
+        elif deep:
+            if hash_file(path) != entry["sha256"]:
+                problems.append(f"内容不符: {relative}")
+        elif stat.st_mtime_ns != entry["mtime_ns"]:
+            # 修改时间变化不一定意味着内容变化，但快速校验无法确认
+            problems.append(f"文件已被修改: {relative}")
+    return problems
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="生成或校验模型目录的完整性清单")
+    parser.add_argument("model_dir", help="模型目录")
+    parser.add_argument("--check", action="store_true", help="按清单快速校验（只比较大小和修改时间）")
+    parser.add_argument("--deep", action="store_true", help="按清单重新计算哈希校验")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.model_dir):
+        print(f"错误：模型目录不存在: {args.model_dir}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.check or args.deep:
+        problems = validate_model(args.model_dir, deep=args.deep)
+        elapsed = (time.perf_counter() - start) * 1000
+        if problems is None:
+            print(f"未找到清单，请先运行: python model_manifest.py {args.model_dir}")
+            sys.exit(1)
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✓ 模型文件完整 ({elapsed:.1f} ms)")
+        return
+
+    path = write_manifest(args.model_dir, source=os.path.basename(os.path.abspath(args.model_dir)))
+    print(f"已生成清单: {path} ({(time.perf_counter() - start):.1f} 秒)")
+
+
+if __name__ == "__main__":
+    main()
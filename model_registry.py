@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已安装模型的注册表
+models/index.json 记录每个已安装模型的语言、大小、采样率、conf 文件哈希和基准测试测得的实时率，
+程序启动时读取索引即可选择模型，不再扫描目录、也不需要交互输入，适合由进程管理器无人值守地启动：
+
+    from model_registry import get_model
+    model = get_model("cn")          # 按名称、路径或语言查找，同一进程内只加载一次
+
+索引在以下时机更新：download_model.py 安装模型后、bench/asr_benchmark.py --record 记录实时率时、
+查找的模型不在索引中时（自动重新扫描一次），也可以手动运行：
+    python model_registry.py --refresh
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from typing import Dict, List, Optional
+
+from model_manifest import MANIFEST_NAME, load_manifest, validate_model
+
+DEFAULT_MODELS_DIR = os.environ.get("VOSK_MODELS_DIR", "models")
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+# 模型目录名中的语言代码，如 vosk-model-small-cn-0.22、vosk-model-small-en-us-0.15
+_LANGUAGE_PATTERN = re.compile(r"vosk-model-(?:small-)?([a-z]{2,3}(?:-[a-z]{2})?)-\d")
+# 目录名不规范时按 README 第一行猜测语言
+_README_LANGUAGES = {"chinese": "cn", "english": "en", "russian": "ru", "german": "de", "french": "fr",
+                     "spanish": "es", "japanese": "ja", "korean": "ko"}
+
+
+def _hash_small_file(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _detect_language(name: str, path: str) -> Optional[str]:
+    match = _LANGUAGE_PATTERN.match(name)
+    if match:
+        return match.group(1)
+    try:
+        with open(os.path.join(path, "README"), 'r', encoding='utf-8', errors='replace') as f:
+            first_line = f.readline().lower()
+    except OSError:
+        return None
+    return next((code for word, code in _README_LANGUAGES.items() if word in first_line), None)
+
+
+def _detect_sample_rate(path: str) -> int:
+    try:
+        with open(os.path.join(path, "conf", "mfcc.conf"), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("--sample-frequency="):
+                    return int(float(line.split("=", 1)[1]))
+    except (OSError, ValueError):
+        pass
+    return 16000
+
+
+def describe_model(path: str, name: Optional[str] = None) -> dict:
+    """
+    读取模型目录的元数据（只读取 conf 下的小文件，其余文件只 stat）
+
+    Args:
+        path (str): 模型目录
+        name (Optional[str]): 模型名称，默认为目录名
+
+    Returns:
+        dict: 注册表条目
+    """
+    name = name or os.path.basename(os.path.normpath(path))
+    manifest = load_manifest(path)
+    if manifest is not None:
+        size = manifest["total_bytes"]
+    else:
+        size = 0
+        for root, _, names in os.walk(path):
+            for item in names:
+                try:
+                    size += os.path.getsize(os.path.join(root, item))
+                except OSError:
+                    pass
+    conf_dir = os.path.join(path, "conf")
+    conf_hashes = {}
+    if os.path.isdir(conf_dir):
+        for item in sorted(os.listdir(conf_dir)):
+            item_path = os.path.join(conf_dir, item)
+            if os.path.isfile(item_path):
+                conf_hashes[item] = _hash_small_file(item_path)
+    return {
+        "name": name,
+        "path": path,
+        "language": _detect_language(name, path),
+        "size_bytes": size,
+        "sample_rate": _detect_sample_rate(path),
+        "conf_hashes": conf_hashes,
+        "manifest": manifest is not None,
+        "rtf": None,
+    }
+
+
+def _is_model_dir(path: str) -> bool:
+    name = os.path.basename(path)
+    # 跳过解压临时目录和替换中的旧目录
+    if name.startswith(".") or ".old-" in name:
+        return False
+    return os.path.isdir(path) and (os.path.isdir(os.path.join(path, "conf"))
+                                    or os.path.exists(os.path.join(path, MANIFEST_NAME)))
+
+
+class ModelRegistry:
+    """已安装模型的索引"""
+
+    def __init__(self, models_dir: str = DEFAULT_MODELS_DIR):
+        """
+        Args:
+            models_dir (str): 模型存放目录，索引文件为其中的 index.json
+        """
+        self.models_dir = models_dir
+        self.index_path = os.path.join(models_dir, INDEX_NAME)
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get("version") != INDEX_VERSION:
+                    raise ValueError("索引版本不符")
+                self._entries = index["models"]
+            except (OSError, ValueError, KeyError):
+                self.refresh()
+        return self._entries
+
+    def _save(self):
+        if not self._entries and not os.path.isdir(self.models_dir):
+            return
+        index = {"version": INDEX_VERSION, "updated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "models": self._entries}
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.models_dir, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            print(f"警告：写入模型索引失败: {e}")
+
+    def refresh(self) -> List[dict]:
+        """
+        重新扫描模型目录并写出索引；已记录的实时率保留，目录外登记的模型在路径仍存在时保留
+
+        Returns:
+            List[dict]: 所有模型条目
+        """
+        with self._lock:
+            old = self._entries or {}
+            if self._entries is None:
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as f:
+                        old = json.load(f).get("models", {})
+                except (OSError, ValueError):
+                    old = {}
+            entries = {}
+            if os.path.isdir(self.models_dir):
+                for item in sorted(os.listdir(self.models_dir)):
+                    path = os.path.join(self.models_dir, item)
+                    if _is_model_dir(path):
+                        entries[item] = describe_model(path, item)
+            for name, entry in old.items():
+                if name not in entries and entry.get("external") and _is_model_dir(entry["path"]):
+                    entries[name] = describe_model(entry["path"], name)
+                    entries[name]["external"] = True
+                if name in entries:
+                    entries[name]["rtf"] = entry.get("rtf")
+            self._entries = entries
+            self._save()
+            return list(entries.values())
+
+    def register(self, path: str, name: Optional[str] = None) -> dict:
+        """
+        登记一个模型目录（可以在模型存放目录之外，如内置的 model/）
+
+        Args:
+            path (str): 模型目录
+            name (Optional[str]): 名称，默认为目录名
+
+        Returns:
+            dict: 注册表条目
+        """
+        with self._lock:
+            entries = self._load()
+            name = name or os.path.basename(os.path.normpath(path))
+            external = os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.models_dir)
+            entry = describe_model(os.path.abspath(path) if external else path, name)
+            if external:
+                entry["external"] = True
+            if name in entries:
+                entry["rtf"] = entries[name].get("rtf")
+            entries[name] = entry
+            self._save()
+            return entry
+
+    def list_models(self) -> List[dict]:
+        """
+        Returns:
+            List[dict]: 按名称排序的模型条目（读取索引，不扫描目录）
+        """
+        with self._lock:
+            entries = self._load()
+            return [entries[name] for name in sorted(entries)]
+
+    def _find(self, name: str) -> Optional[dict]:
+        entries = self._load()
+        if name in entries:
+            return entries[name]
+        path = os.path.abspath(name)
+        for entry in entries.values():
+            if os.path.abspath(entry["path"]) == path:
+                return entry
+        for entry_name in sorted(entries):
+            if entries[entry_name]["language"] == name:
+                return entries[entry_name]
+        return None
+
+    def get(self, name: Optional[str] = None) -> Optional[dict]:
+        """
+        查找模型
+
+        Args:
+            name (Optional[str]): 模型名称、路径或语言代码（如 cn、en-us）；
+                None 表示默认模型：环境变量 VOSK_MODEL 指定的模型，否则按名称排序的第一个
+
+        Returns:
+            Optional[dict]: 模型条目，找不到时返回None
+        """
+        with self._lock:
+            name = name or os.environ.get("VOSK_MODEL")
+            if name is None:
+                models = self.list_models()
+                if not models:
+                    self.refresh()
+                    models = self.list_models()
+                return models[0] if models else None
+            entry = self._find(name)
+            if entry is None or not os.path.isdir(entry["path"]):
+                # 索引之后安装或删除了模型，重新扫描一次
+                self.refresh()
+                entry = self._find(name)
+            return entry
+
+    def record_benchmark(self, path: str, rtf: float, **details) -> dict:
+        """
+        记录基准测试测得的实时率
+
+        Args:
+            path (str): 模型目录
+            rtf (float): 实时率（解码耗时/音频时长）
+            **details: 附加信息，如块大小和字错误率
+
+        Returns:
+            dict: 更新后的模型条目
+        """
+        with self._lock:
+            entry = self._find(path) or self.register(path)
+            entry["rtf"] = dict(details, value=rtf, measured=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            self._save()
+            return entry
+
+
+_registries: Dict[str, ModelRegistry] = {}
+_models: Dict[str, object] = {}
+# 每个模型目录一把加载锁；_models_lock 只保护上面的字典，不在加载模型期间持有
+_model_locks: Dict[str, threading.Lock] = {}
+_models_lock = threading.Lock()
+
+
+def get_registry(models_dir: str = DEFAULT_MODELS_DIR) -> ModelRegistry:
+    """
+    获取模型存放目录对应的注册表（进程内共享）
+    """
+    with _models_lock:
+        registry = _registries.get(models_dir)
+        if registry is None:
+            registry = _registries[models_dir] = ModelRegistry(models_dir)
+        return registry
+
+
+def resolve_model_path(name: Optional[str] = None, models_dir: str = DEFAULT_MODELS_DIR) -> Optional[str]:
+    """
+    把模型名称/语言/路径解析为模型目录：已存在的目录原样返回，否则查找注册表
+
+    Returns:
+        Optional[str]: 模型目录，找不到时返回None
+    """
+    if name and os.path.isdir(name):
+        return name
+    entry = get_registry(models_dir).get(name)
+    return entry["path"] if entry else None
+
+
+def get_model(name: Optional[str] = None, models_dir: str = DEFAULT_MODELS_DIR):
+    """
+    获取共享的 vosk.Model：同一模型目录在进程内只加载一次，加载前按清单快速校验模型文件
+
+    Args:
+        name (Optional[str]): 模型名称、路径或语言代码，None表示默认模型
+        models_dir (str): 模型存放目录
+
+    Returns:
+        vosk.Model: 已加载的模型
+
+    Raises:
+        KeyError: 找不到模型
+        RuntimeError: 模型文件与清单不符
+    """
+    path = resolve_model_path(name, models_dir)
+    if path is None:
+        raise KeyError(f"未找到模型: {name or '默认模型'}")
+    key = os.path.abspath(path)
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        load_lock = _model_locks.setdefault(key, threading.Lock())
+    # 加载可能耗时数秒：只阻塞等待同一模型的调用，注册表查询和其他模型的加载不受影响
+    with load_lock:
+        with _models_lock:
+            model = _models.get(key)
+        if model is None:
+            problems = validate_model(key)
+            if problems:
+                raise RuntimeError(f"模型文件与清单不符: {'; '.join(problems[:5])}")
+            from vosk import Model
+            model = Model(key)
+            with _models_lock:
+                _models[key] = model
+        return model
+
+
+def select_model(models_dir: str = DEFAULT_MODELS_DIR, interactive: Optional[bool] = None) -> Optional[str]:
+    """
+    选择要使用的模型：设置了 VOSK_MODEL、只安装了一个模型或非交互运行时直接选择，否则列出模型让用户选择
+
+    Args:
+        models_dir (str): 模型存放目录
+        interactive (Optional[bool]): 是否允许交互输入，None表示标准输入为终端时允许
+
+    Returns:
+        Optional[str]: 模型路径，没有可用模型或用户取消时返回None
+    """
+    registry = get_registry(models_dir)
+    requested = os.environ.get("VOSK_MODEL")
+    if requested:
+        entry = registry.get(requested)
+        if entry is None:
+            print(f"错误：未找到模型: {requested}")
+            return None
+        print(f"已选择模型: {entry['path']}")
+        return entry["path"]
+
+    models = registry.list_models()
+    if not models:
+        models = registry.refresh()
+    if not models:
+        print("错误：未找到任何模型")
+        print("请先运行 download_model.py 下载模型")
+        return None
+    if interactive is None:
+        interactive = sys.stdin is not None and sys.stdin.isatty()
+    if len(models) == 1 or not interactive:
+        print(f"已选择模型: {models[0]['path']}")
+        return models[0]["path"]
+
+    print("\n可用的模型：")
+    for i, entry in enumerate(models, 1):
+        print(f"{i}. {_format_entry(entry)}")
+
+    while True:
+        try:
+            choice = input(f"\n请选择模型 (1-{len(models)}): ").strip()
+            if choice.isdigit() and 0 < int(choice) <= len(models):
+                selected = models[int(choice) - 1]["path"]
+                print(f"已选择模型: {selected}")
+                return selected
+            print("无效选择，请重新输入")
+        except (KeyboardInterrupt, EOFError):
+            print("\n取消选择")
+            return None
+
+
+def _format_entry(entry: dict) -> str:
+    parts = [entry["name"], entry["language"] or "未知语言", f"{entry['size_bytes'] / 1048576:.0f}MB",
+             f"{entry['sample_rate']}Hz"]
+    if entry.get("rtf"):
+        parts.append(f"RTF {entry['rtf']['value']}")
+    return "  ".join(parts)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="已安装模型的注册表")
+    parser.add_argument("--models-dir", default=DEFAULT_MODELS_DIR, help=f"模型存放目录 (默认: {DEFAULT_MODELS_DIR})")
+    parser.add_argument("--refresh", action="store_true", help="重新扫描模型目录并更新索引")
+    parser.add_argument("--register", metavar="PATH", help="登记模型存放目录之外的模型（如内置的 model/）")
+    parser.add_argument("--json", action="store_true", help="以JSON输出索引")
+    args = parser.parse_args()
+
+    registry = get_registry(args.models_dir)
+    if args.register:
+        if not _is_model_dir(args.register):
+            print(f"错误：不是模型目录: {args.register}")
+            return 1
+        registry.register(args.register)
+    models = registry.refresh() if args.refresh else registry.list_models()
+    if args.json:
+        print(json.dumps(models, ensure_ascii=False, indent=2))
+    elif not models:
+        print("未找到任何模型，请先运行 download_model.py 下载模型")
+    else:
+        for entry in models:
+            print(_format_entry(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
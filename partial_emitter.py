@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节流、只发送增量的部分识别结果发送器
+识别循环不再每个块都调用 PartialResult() 并重新打印整句，而是：
+- 按音频时钟节流，两次查询之间至少间隔 min_interval 秒
+- 假设没有变化时不发送事件
+- 只发送增量：新确认（连续两次假设中都未变化）的词，加上仍可能变化的尾部
+"""
+
+import json
+from typing import Callable, List, Optional
+
+# Vosk 的 PartialResult() 返回 {"partial" : "..."} 格式的JSON，文本之外的固定开销
+_PARTIAL_JSON_OVERHEAD = len('{\n  "partial" : ""\n}')
+
+
+class PartialUpdate:
+    """一次部分结果增量"""
+
+    __slots__ = ("committed", "tail", "retracted", "final")
+
+    def __init__(self, committed: List[str], tail: List[str], retracted: int = 0, final: bool = False):
+        """
+        Args:
+            committed (List[str]): 本次新确认的词，之后不会再出现在增量中
+            tail (List[str]): 尚未确认的尾部词
+            retracted (int): 解码器修正了之前已确认的词时，需要撤回的词数
+            final (bool): 是否为句末的完整结果
+        """
+        self.committed = committed
+        self.tail = tail
+        self.retracted = retracted
+        self.final = final
+
+    def to_json(self) -> str:
+        """
+        序列化为紧凑JSON，空字段省略
+        """
+        data = {}
+        if self.committed:
+            data["c"] = " ".join(self.committed)
+        if self.tail:
+            data["t"] = " ".join(self.tail)
+        if self.retracted:
+            data["r"] = self.retracted
+        if self.final:
+            data["f"] = 1
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class PartialEmitter:
+    """部分结果节流与增量计算"""
+
+    def __init__(self, min_interval: float = 0.5, sample_rate: int = 16000):
+        """
+        初始化发送器
+
+        Args:
+            min_interval (float): 两次查询部分结果的最小间隔（音频秒），0表示每个块都查询
+            sample_rate (int): 音频采样率，用于把块字节数换算为音频时长
+        """
+        self.min_interval = min_interval
+        self.sample_rate = sample_rate
+        self._listeners: List[Callable[[PartialUpdate], None]] = []
+        self._clock = 0.0
+        self._last_poll = None
+        self._previous: List[str] = []
+        self._committed: List[str] = []
+        self._last_text = ""
+        # 统计
+        self.chunks = 0
+        self.polls = 0
+        self.skipped_polls = 0
+        self.unchanged = 0
+        self.events = 0
+        self.baseline_bytes = 0
+        self.emitted_bytes = 0
+
+    def add_listener(self, callback: Callable[[PartialUpdate], None]):
+        """
+        注册事件回调
+
+        Args:
+            callback (Callable[[PartialUpdate], None]): 收到增量时调用
+        """
+        self._listeners.append(callback)
+
+    def _emit(self, update: PartialUpdate):
+        self.events += 1
+        # 句末结果新旧方式都要输出一次，不计入部分结果流量
+        if not update.final:
+            self.emitted_bytes += len(update.to_json().encode("utf-8"))
+        for callback in self._listeners:
+            callback(update)
+
+    def poll_due(self, chunk_bytes: int) -> bool:
+        """
+        记录一个非完整结果的音频块，并判断是否需要向解码器查询部分结果
+
+        Args:
+            chunk_bytes (int): 该块的字节数（16位单声道）
+
+        Returns:
+            bool: 需要调用 PartialResult() 返回True
+        """
+        self.chunks += 1
+        self._clock += chunk_bytes / 2 / self.sample_rate
+        # 原来每个块都会取回并解析一次整句JSON，以上一次的假设长度估算
+        self.baseline_bytes += len(self._last_text.encode("utf-8")) + _PARTIAL_JSON_OVERHEAD
+        if self._last_poll is not None and self._clock - self._last_poll < self.min_interval:
+            self.skipped_polls += 1
+            return False
+        self._last_poll = self._clock
+        self.polls += 1
+        return True
+
+    def update(self, text: str) -> Optional[PartialUpdate]:
+        """
+        处理一次部分结果，假设有变化时发送增量
+
+        Args:
+            text (str): 部分结果文本
+
+        Returns:
+            Optional[PartialUpdate]: 发送的增量，没有变化时返回None
+        """
+        self._last_text = text
+        words = text.split()
+        if words == self._previous:
+            self.unchanged += 1
+            return None
+
+        # 与上一次假设的公共前缀视为已稳定
+        stable = 0
+        for old, new in zip(self._previous, words):
+            if old != new:
+                break
+            stable += 1
+        self._previous = words
+
+        retracted = 0
+        committed = len(self._committed)
+        if words[:committed] != self._committed:
+            # 解码器修正了已确认的词，撤回到与新假设一致的位置
+            keep = 0
+            while keep < committed and self._committed[keep] == words[keep]:
+                keep += 1
+            retracted = committed - keep
+            committed = keep
+            del self._committed[keep:]
+
+        new_committed = words[committed:stable] if stable > committed else []
+        self._committed.extend(new_committed)
+        update = PartialUpdate(new_committed, words[len(self._committed):], retracted)
+        self._emit(update)
+        return update
+
+    def final(self, text: str) -> PartialUpdate:
+        """
+        句子结束：发送剩余未确认的词并清空状态
+
+        Args:
+            text (str): 完整识别结果文本
+
+        Returns:
+            PartialUpdate: 句末增量
+        """
+        words = text.split()
+        keep = 0
+        while keep < len(self._committed) and keep < len(words) and self._committed[keep] == words[keep]:
+            keep += 1
+        update = PartialUpdate(words[keep:], [], len(self._committed) - keep, final=True)
+        self.reset()
+        self._emit(update)
+        return update
+
+    def reset(self):
+        """
+        清除当前句子的状态（保留统计）
+        """
+        self._previous = []
+        self._committed = []
+        self._last_text = ""
+
+    def stats(self) -> dict:
+        """
+        获取统计信息，包括每分钟音频节省的解码器调用次数和输出字节数
+
+        Returns:
+            dict: 统计信息
+        """
+        minutes = self._clock / 60.0
+        per_minute = (lambda n: round(n / minutes, 1)) if minutes else (lambda n: None)
+        return {
+            "audio_seconds": round(self._clock, 2),
+            "partial_polls": self.polls,
+            "skipped_polls": self.skipped_polls,
+            "unchanged": self.unchanged,
+            "events": self.events,
+            "decoder_calls_saved_per_minute": per_minute(self.skipped_polls),
+            "baseline_bytes": self.baseline_bytes,
+            "emitted_bytes": self.emitted_bytes,
+            "bytes_saved_per_minute": per_minute(self.baseline_bytes - self.emitted_bytes),
+        }
+
+
+class ConsoleListener:
+    """把增量还原为整句并在终端同一行刷新显示"""
+
+    def __init__(self, prefix: str = "正在识别: "):
+        self.prefix = prefix
+        self.committed: List[str] = []
+
+    def __call__(self, update: PartialUpdate):
+        if update.retracted:
+            del self.committed[len(self.committed) - update.retracted:]
+        self.committed.extend(update.committed)
+        if update.final:
+            self.reset()
+            return
+        print(f"\r{self.prefix}{' '.join(self.committed + update.tail)}", end='', flush=True)
+
+    def reset(self):
+        """
+        句子结束，清空已显示的内容
+        """
+        self.committed = []
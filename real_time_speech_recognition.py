@@ -8,75 +8,95 @@
 import sys
 import os
 import json
-import pyaudio
-from vosk import Model, KaldiRecognizer
-
-def list_available_models():
-    """
-    列出可用的模型
-    """
-    models_dir = "models"
-    if not os.path.exists(models_dir):
-        return []
-    
-    models = []
-    for item in os.listdir(models_dir):
-        model_path = os.path.join(models_dir, item)
-        if os.path.isdir(model_path):
-            models.append(item)
-    return models
-
-def select_model():
-    """
-    选择要使用的模型
-    """
-    # 列出models目录中的模型
-    available_models = list_available_models()
-    if not available_models:
-        print("错误：未找到任何模型")
-        print("请先运行 download_model.py 下载模型")
-        return None
-    
-    print("\n可用的模型：")
-    for i, model in enumerate(available_models, 1):
-        print(f"{i}. {model}")
-    
-    while True:
-        try:
-            choice = input(f"\n请选择模型 (1-{len(available_models)}): ")
-            index = int(choice) - 1
-            if 0 <= index < len(available_models):
-                selected_model = os.path.join("models", available_models[index])
-                print(f"已选择模型: {selected_model}")
-                return selected_model
-            else:
-                print("无效选择，请重新输入")
-        except ValueError:
-            print("请输入有效的数字")
-        except KeyboardInterrupt:
-            print("\n取消选择")
-            return None
+import queue
+from operator import methodcaller
+from audio_pipeline import AudioPipeline
+from audio_buffers import accept_waveform
+from startup_timing import StartupTimer
+from model_daemon import DEFAULT_SOCKET, daemon_available
+from recognition_profile import resolve_profile
+from partial_emitter import PartialEmitter, ConsoleListener
+from recognition_events import PartialEvent, FinalEvent, async_events
+from model_warmup import prefetch_model_files, warm_up_recognizer
+from model_manifest import validate_model
+from model_registry import select_model
 
 class RealTimeSpeechRecognizer:
-    def __init__(self, model_path="model", sample_rate=16000):
+    def __init__(self, model_path="model", sample_rate=16000, pool=None, daemon_socket=None, profile=None,
+                 use_vad=True, partial_interval=0.5, warm_up=True, prefetch=False, metrics_port=None,
+                 profile_dir=None):
         """
         初始化实时语音识别器
         
         Args:
-            model_path (str): Vosk模型路径
+            model_path (str): Vosk模型路径，客户端模式下为None表示使用守护进程的默认模型
             sample_rate (int): 音频采样率
+            pool (RecognizerPool): 可选的共享识别器池，提供时从池中租借识别器而不单独加载模型
+            daemon_socket (str): 可选的模型守护进程套接字，提供时以客户端模式连接守护进程
+            profile (str): 可选的识别配置文件（块大小与model.conf覆盖项），由 bench/tune_parameters.py 生成
+            use_vad (bool): 是否启用静音门控，静音块不送入解码器
+            partial_interval (float): 两次查询部分结果的最小间隔（音频秒），0表示每个块都查询
+            warm_up (bool): 加载模型后先用合成音频解码一遍，避免首句承担缺页和延迟初始化的开销
+            prefetch (bool): 加载模型前把模型文件预取到页缓存
+            metrics_port (int): 指标HTTP端口（/metrics），None表示不启用指标
+            profile_dir (str): 解码性能分析输出目录（折叠栈、逐句耗时、最慢句子的音频），None表示不启用
         """
         self.model_path = model_path
         self.sample_rate = sample_rate
+        self.pool = pool
+        self.daemon_socket = daemon_socket
+        self.profile = profile
+        self.chunk_frames = 4096
+        self.use_vad = use_vad
+        self.vad = None
+        self.warm_up = warm_up
+        self.prefetch = prefetch
+        # 识别循环各阶段调用的函数，启用指标时由 setup_metrics() 替换为计时版本
+        self.metrics_port = metrics_port
+        self.metrics = None
+        self.metrics_server = None
+        self.profile_dir = profile_dir
+        self.profiler = None
+        self._accept = accept_waveform
+        self._result = methodcaller("Result")
+        self._partial_result = methodcaller("PartialResult")
+        self._loads = json.loads
+        # 部分结果按间隔节流，只发送增量
+        self.emitter = PartialEmitter(partial_interval, sample_rate)
+        # 解码线程产生的识别事件，由 events() 的调用方消费
+        self.event_queue = queue.Queue()
+        self.console = ConsoleListener("正在识别: ")
+        self.is_running = False
+        self.timer = StartupTimer()
         self.model = None
         self.recognizer = None
         self.audio = None
         self.stream = None
+        self.pipeline = None
         
     def load_model(self):
         """
         加载Vosk模型
         """
+        if self.daemon_socket:
+            try:
+                from model_daemon import RemoteRecognizer
+                self.recognizer = RemoteRecognizer(self.daemon_socket, self.model_path, self.sample_rate)
+                print(f"已连接模型守护进程，使用模型: {self.recognizer.model_path}")
+                return True
+            except Exception as e:
+                print(f"连接模型守护进程失败: {e}")
+                return False
+        
+        if self.pool is not None:
+            try:
+                self.recognizer = self.pool.acquire()
+                self.model = self.pool.model
+                return True
+            except Exception as e:
+                print(f"从识别器池获取识别器失败: {e}")
+                return False
+        
         if not os.path.exists(self.model_path):
             print(f"错误：模型路径 '{self.model_path}' 不存在！")
             print("请从以下链接下载最小参数模型：")
@@ -86,10 +106,35 @@ class RealTimeSpeechRecognizer:
             return False
             
         try:
-            print(f"正在加载模型: {self.model_path}")
-            self.model = Model(self.model_path)
+            from vosk import Model, KaldiRecognizer
+            
+            # 有清单时按清单快速校验模型文件（只 stat，不读取内容）
+            problems = validate_model(self.model_path)
+            if problems:
+                print(f"错误：模型文件与清单不符: {'; '.join(problems[:5])}")
+                print("请重新运行 download_model.py 安装模型")
+                return False
+            
+            # 识别配置会生成一个应用了覆盖项的模型目录，并可能修改块大小
+            model_dir, chunk_frames = resolve_profile(self.model_path, self.profile)
+            if chunk_frames:
+                self.chunk_frames = chunk_frames
+            
+            if self.prefetch:
+                files, size = prefetch_model_files(model_dir)
+                self.timer.mark("prefetch")
+                print(f"已预取模型文件: {files} 个，{size / 1048576:.1f} MB")
+            print(f"正在加载模型: {model_dir}")
+            self.model = Model(model_dir)
             self.recognizer = KaldiRecognizer(self.model, self.sample_rate)
+            # 与识别器池一致，开启词级时间戳和置信度（FinalEvent.words / confidence）
+            self.recognizer.SetWords(True)
+            self.timer.mark("model_loaded")
             print("模型加载成功！")
+            if self.warm_up:
+                elapsed = warm_up_recognizer(self.recognizer, self.sample_rate, chunk_frames=self.chunk_frames)
+                self.timer.mark("warmed_up")
+                print(f"模型预热完成 ({elapsed * 1000:.0f} ms)")
             return True
         except Exception as e:
             print(f"模型加载失败: {e}")
@@ -100,6 +145,9 @@ class RealTimeSpeechRecognizer:
         设置音频输入
         """
         try:
+            # 只有实时采集才需要PyAudio，延迟导入以加快其他用途的启动
+            import pyaudio
+            
             self.audio = pyaudio.PyAudio()
             
             # 检查可用的音频设备
@@ -109,14 +157,9 @@ class RealTimeSpeechRecognizer:
                 if info['maxInputChannels'] > 0:
                     print(f"设备 {i}: {info['name']} (输入通道: {info['maxInputChannels']})")
             
-            # 创建音频流
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=4096
-            )
+            # 以回调模式创建音频流，采集线程只负责把音频写入环形缓冲区
+            self.pipeline = AudioPipeline(self.sample_rate, chunk_frames=self.chunk_frames)
+            self.stream = self.pipeline.open_stream(self.audio)
             
             print(f"\n音频流设置成功 (采样率: {self.sample_rate}Hz)")
             return True
@@ -126,14 +169,70 @@ class RealTimeSpeechRecognizer:
             print("请确保您的麦克风设备正常工作")
             return False
     
-    def start_recognition(self):
+    def start(self):
         """
-        开始实时语音识别
+        加载模型、打开音频并启动解码线程，之后通过 events() 获取识别事件
+        
+        Returns:
+            bool: 启动成功返回True
         """
         if not self.load_model():
-            return
+            return False
+        self.timer.mark("model_ready")
             
         if not self.setup_audio():
+            return False
+        self.timer.mark("audio_ready")
+        self.setup_vad()
+        self.setup_metrics()
+        process = self.setup_profiler()
+        
+        self.is_running = True
+        self.stream.start_stream()
+        self.pipeline.start(process)
+        return True
+    
+    def events(self):
+        """
+        识别事件生成器，音频管线结束或 is_running 被置为False后停止并清理资源
+        
+        Yields:
+            PartialEvent 或 FinalEvent
+        """
+        try:
+            while True:
+                try:
+                    yield self.event_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not (self.is_running and self.pipeline and self.pipeline.is_running()):
+                        break
+            if self.pipeline.error:
+                raise self.pipeline.error
+        finally:
+            self.cleanup()
+    
+    def aevents(self):
+        """
+        events() 的异步迭代器版本，用于 async for
+        """
+        return async_events(self)
+    
+    def print_event(self, event):
+        """
+        在终端显示一个识别事件
+        """
+        if event.kind == "partial":
+            self.console(event.update)
+            return
+        self.console.reset()
+        if event.text:
+            print(f"     ----    识别结果: {event.text}")
+    
+    def start_recognition(self):
+        """
+        开始实时语音识别
+        """
+        if not self.start():
             return
             
         print("\n=== 实时语音识别已启动 ===")
@@ -141,38 +240,122 @@ class RealTimeSpeechRecognizer:
         print("-" * 50)
         
         try:
-            while True:
-                # 读取音频数据
-                data = self.stream.read(4096, exception_on_overflow=False)
-                
-                # 进行语音识别
-                if self.recognizer.AcceptWaveform(data):
-                    # 完整的识别结果
-                    result = json.loads(self.recognizer.Result())
-                    if result['text']:
-                        print(f"     ----    识别结果: {result['text']}")
-                else:
-                    # 部分识别结果（实时显示）
-                    partial_result = json.loads(self.recognizer.PartialResult())
-                    if partial_result['partial']:
-                        print(f"\r正在识别: {partial_result['partial']}", end='', flush=True)
+            # 解码在独立线程中进行，主线程只显示识别事件
+            for event in self.events():
+                self.print_event(event)
                         
         except KeyboardInterrupt:
             print("\n\n=== 语音识别已停止 ===")
         except Exception as e:
             print(f"\n识别过程中发生错误: {e}")
-        finally:
-            self.cleanup()
+    
+    def setup_vad(self):
+        """
+        设置静音门控（需要numpy，未安装时不启用）
+        """
+        if not self.use_vad:
+            return
+        try:
+            from vad import EnergyVAD
+        except ImportError:
+            print("警告：未安装 numpy，静音门控未启用 (pip install numpy)")
+            return
+        self.vad = EnergyVAD(self.sample_rate)
+    
+    def setup_profiler(self):
+        """
+        启用性能分析时开始采样解码线程，并返回带逐句计时的音频块处理函数
+        
+        Returns:
+            Callable: 交给音频管线的处理函数
+        """
+        if self.profile_dir is None:
+            return self.process_audio
+        from decode_profiler import DecodeProfiler
+        self.profiler = DecodeProfiler(self.profile_dir, self.sample_rate)
+        self._accept = self.profiler.wrap_accept(self._accept)
+        self.profiler.start()
+        print(f"已启用解码性能分析，结果将写入: {self.profile_dir}")
+        return self.profiler.wrap_process(self.process_audio)
+    
+    def setup_metrics(self):
+        """
+        启用指标时把识别循环的各阶段函数替换为计时版本，并导出音频管线计数器；
+        未启用时各阶段仍是原始函数，识别循环没有额外开销
+        """
+        if self.metrics_port is None:
+            return
+        from metrics import start_metrics
+        self.metrics, self.metrics_server = start_metrics(self.metrics_port)
+        if self.metrics is None:
+            return
+        self.metrics.bind_pipeline(self.pipeline)
+        self._accept = self.metrics.timed_accept(accept_waveform)
+        self._result = self.metrics.timed_result(methodcaller("Result"))
+        self._partial_result = self.metrics.timed(self.metrics.partial_result, methodcaller("PartialResult"))
+        self._loads = self.metrics.timed(self.metrics.json_parse, json.loads)
+    
+    def process_audio(self, data):
+        """
+        识别一个音频块（在解码线程中调用）
+        
+        Args:
+            data (memoryview): 16位单声道PCM数据（复用的缓冲区）
+        """
+        # 静音块不进入解码器
+        if self.vad is not None:
+            data = self.vad.process(data)
+            if data is None:
+                return
+        
+        if self._accept(self.recognizer, data):
+            # 完整的识别结果，JSON留给消费者按需解析
+            self.emitter.reset()
+            self.event_queue.put(FinalEvent(self._result(self.recognizer), metrics=self.metrics))
+        elif self.emitter.poll_due(len(data)):
+            # 部分识别结果，未到查询间隔的块不调用解码器
+            text = self._loads(self._partial_result(self.recognizer))['partial']
+            self.timer.mark("first_decode")
+            if text:
+                self.timer.mark("first_partial")
+            update = self.emitter.update(text)
+            if update is not None:
+                self.event_queue.put(PartialEvent(text, update))
     
     def cleanup(self):
         """
         清理资源
         """
+        self.is_running = False
         if self.stream:
             self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
+        if self.pipeline:
+            self.pipeline.stop()
+            print(f"\n音频管线统计: {self.pipeline.stats()}")
+            self.pipeline = None
+        if self.vad:
+            print(f"静音门控统计: {self.vad.stats()}")
+        print(f"部分结果统计: {self.emitter.stats()}")
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.profiler is not None:
+            path = self.profiler.stop()
+            if path:
+                print(f"解码性能分析结果已写入: {path} ({self.profiler.summary()})")
+            self.profiler = None
         if self.audio:
             self.audio.terminate()
+            self.audio = None
+        if self.pool is not None and self.recognizer is not None:
+            self.pool.release(self.recognizer)
+            self.recognizer = None
+        if self.daemon_socket and self.recognizer is not None:
+            self.recognizer.close()
+            self.recognizer = None
+        print(self.timer.report())
         print("资源清理完成")
 
 def main():
@@ -183,13 +366,25 @@ def main():
     print("使用Vosk模型进行实时语音识别")
     print()
     
-    # 选择模型
-    model_path = select_model()
-    if not model_path:
-        return
+    # 设置 VOSK_METRICS_PORT 后在该端口导出 /metrics
+    metrics_port = int(os.environ["VOSK_METRICS_PORT"]) if os.environ.get("VOSK_METRICS_PORT") else None
+    # 设置 VOSK_PROFILER_DIR 后采样解码线程，退出时写出折叠栈和最慢句子的音频
+    profile_dir = os.environ.get("VOSK_PROFILER_DIR")
     
-    # 创建识别器实例
-    recognizer = RealTimeSpeechRecognizer(model_path=model_path)
+    # 模型守护进程在运行时以客户端模式启动，跳过模型选择和加载
+    if daemon_available(DEFAULT_SOCKET):
+        print(f"检测到模型守护进程: {DEFAULT_SOCKET}")
+        recognizer = RealTimeSpeechRecognizer(model_path=None, daemon_socket=DEFAULT_SOCKET,
+                                              metrics_port=metrics_port, profile_dir=profile_dir)
+    else:
+        # 选择模型
+        model_path = select_model()
+        if not model_path:
+            return
+        
+        # 创建识别器实例
+        recognizer = RealTimeSpeechRecognizer(model_path=model_path, profile=os.environ.get("VOSK_PROFILE"),
+                                              metrics_port=metrics_port, profile_dir=profile_dir)
     
     # 开始识别
     recognizer.start_recognition()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化识别结果事件
+识别器的 events() 生成器产出这些事件，替代原来在识别循环中直接 print；
+事件对象使用 __slots__，完整结果的JSON在首次访问字段时才解析，
+只关心部分结果或只统计事件数的消费者不需要为词时间戳和置信度付出解析开销
+"""
+
+import json
+import asyncio
+from time import perf_counter
+from typing import AsyncIterator, List, Optional
+
+
+class WordTiming:
+    """一个词的时间戳和置信度"""
+
+    __slots__ = ("word", "start", "end", "conf")
+
+    def __init__(self, word: str, start: float, end: float, conf: float):
+        self.word = word
+        self.start = start
+        self.end = end
+        self.conf = conf
+
+    def __repr__(self) -> str:
+        return f"WordTiming({self.word!r}, {self.start:.2f}-{self.end:.2f}, conf={self.conf:.2f})"
+
+
+class PartialEvent:
+    """部分识别结果"""
+
+    __slots__ = ("text", "update")
+    kind = "partial"
+
+    def __init__(self, text: str, update):
+        """
+        Args:
+            text (str): 当前完整假设
+            update (PartialUpdate): 相对上一次事件的增量（新确认的词和未确认的尾部）
+        """
+        self.text = text
+        self.update = update
+
+    def __repr__(self) -> str:
+        return f"PartialEvent({self.text!r})"
+
+
+class FinalEvent:
+    """完整识别结果，字段按需从原始JSON解析"""
+
+    __slots__ = ("raw", "_data", "_words", "_matcher", "_matched", "_parser", "_command", "_metrics")
+    kind = "final"
+
+    def __init__(self, raw: str, matcher=None, parser=None, metrics=None):
+        """
+        Args:
+            raw (str): 识别器 Result() 返回的原始JSON
+            matcher (VocabMatcher): 可选的词汇匹配器，用于计算 matched_terms
+            parser (CommandParser): 可选的指令解析器，用于计算 command
+            metrics (RecognitionMetrics): 可选的指标，记录JSON解析和词汇匹配耗时
+        """
+        self.raw = raw
+        self._data = None
+        self._words = None
+        self._matcher = matcher
+        self._matched = None
+        self._parser = parser
+        self._command = False
+        self._metrics = metrics
+
+    @property
+    def data(self) -> dict:
+        """解析后的完整结果"""
+        if self._data is None:
+            if self._metrics is None:
+                self._data = json.loads(self.raw)
+            else:
+                start = perf_counter()
+                self._data = json.loads(self.raw)
+                self._metrics.json_parse.observe(perf_counter() - start)
+        return self._data
+
+    @property
+    def text(self) -> str:
+        """识别文本"""
+        return self.data.get("text", "")
+
+    @property
+    def words(self) -> List[WordTiming]:
+        """词级时间戳，识别器未开启 SetWords 时为空"""
+        if self._words is None:
+            self._words = [WordTiming(w["word"], w["start"], w["end"], w.get("conf", 1.0))
+                           for w in self.data.get("result", ())]
+        return self._words
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """词置信度的平均值，没有词信息时为None"""
+        words = self.words
+        if not words:
+            return None
+        return sum(w.conf for w in words) / len(words)
+
+    @property
+    def matched_terms(self) -> List[str]:
+        """识别文本中出现的自定义词汇"""
+        if self._matched is None:
+            text = self.text
+            if self._matcher and text:
+                start = perf_counter()
+                self._matched = self._matcher.matched_words(text)
+                if self._metrics is not None:
+                    self._metrics.vocab_match.observe(perf_counter() - start)
+            else:
+                self._matched = []
+        return self._matched
+
+    @property
+    def command(self) -> Optional[dict]:
+        """从识别文本提取的结构化指令（意图和槽位），没有解析器或未识别出指令时为None"""
+        if self._command is False:
+            self._command = self._parser.parse(self.text) if self._parser else None
+        return self._command
+
+    def __repr__(self) -> str:
+        return f"FinalEvent({self.raw!r})"
+
+
+async def async_events(recognizer) -> AsyncIterator:
+    """
+    把识别器阻塞的 events() 生成器包装为异步迭代器，每次取事件在线程池中等待
+
+    Args:
+        recognizer: 已调用 start() 的识别器
+
+    Yields:
+        PartialEvent 或 FinalEvent
+    """
+    loop = asyncio.get_running_loop()
+    events = recognizer.events()
+    done = object()
+    future = None
+    try:
+        while True:
+            future = loop.run_in_executor(None, next, events, done)
+            event = await future
+            future = None
+            if event is done:
+                break
+            yield event
+    finally:
+        # 通知生成器结束；线程中仍在等待的 next() 返回后再关闭生成器，由它清理资源
+        recognizer.is_running = False
+        if future is None:
+            events.close()
+        else:
+            future.add_done_callback(lambda _: events.close())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+识别参数配置(profile)
+配置文件记录块大小和对 model/conf/model.conf 的覆盖项（beam、max-active、端点静音时长等），
+由 bench/tune_parameters.py 生成，识别程序加载后得到一个应用了覆盖项的模型目录
+
+配置文件格式:
+{
+  "chunk_frames": 4000,
+  "model_conf": {"beam": 10.0, "max-active": 3000, "endpoint.rule2.min-trailing-silence": 0.4}
+}
+"""
+
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+
+from model_manifest import MANIFEST_NAME
+
+DEFAULT_PROFILE_MODELS_DIR = ".profile_models"
+
+
+def load_profile(path: str) -> Optional[dict]:
+    """
+    读取配置文件
+
+    Args:
+        path (str): 配置文件路径
+
+    Returns:
+        Optional[dict]: 配置内容，读取失败返回None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"读取识别配置失败: {e}")
+        return None
+    profile.setdefault("model_conf", {})
+    return profile
+
+
+def save_profile(path: str, profile: dict):
+    """
+    保存配置文件
+
+    Args:
+        path (str): 配置文件路径
+        profile (dict): 配置内容
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def apply_conf_overrides(conf_text: str, overrides: Dict[str, object]) -> str:
+    """
+    把覆盖项应用到Kaldi风格的 --key=value 配置文本
+
+    Args:
+        conf_text (str): 原始配置文本
+        overrides (Dict[str, object]): 覆盖项，键不带前导 --
+
+    Returns:
+        str: 新的配置文本
+    """
+    remaining = {key.lstrip('-'): value for key, value in overrides.items()}
+    lines = []
+    for line in conf_text.splitlines():
+        key = line.strip().lstrip('-').split('=', 1)[0]
+        if key in remaining:
+            lines.append(f"--{key}={remaining.pop(key)}")
+        else:
+            lines.append(line)
+    for key, value in remaining.items():
+        lines.append(f"--{key}={value}")
+    return "\n".join(lines) + "\n"
+
+
+def prepare_model_dir(model_path: str, overrides: Dict[str, object],
+                      cache_root: str = DEFAULT_PROFILE_MODELS_DIR) -> str:
+    """
+    生成应用了配置覆盖项的模型目录
+    除 conf/model.conf 外的文件和目录都以符号链接指向原模型，不复制大文件
+
+    Args:
+        model_path (str): 原模型路径
+        overrides (Dict[str, object]): model.conf 覆盖项
+        cache_root (str): 生成目录的存放位置
+
+    Returns:
+        str: 可直接传给 vosk.Model 的模型目录；没有覆盖项时返回原路径
+    """
+    if not overrides:
+        return model_path
+    model_path = os.path.abspath(model_path)
+    conf_path = os.path.join(model_path, "conf", "model.conf")
+    with open(conf_path, 'r', encoding='utf-8') as f:
+        conf_text = apply_conf_overrides(f.read(), overrides)
+
+    digest = hashlib.sha256(f"{model_path}\n{conf_text}".encode("utf-8")).hexdigest()[:16]
+    target = os.path.abspath(os.path.join(cache_root, f"{os.path.basename(model_path)}-{digest}"))
+    if os.path.exists(os.path.join(target, "conf", "model.conf")):
+        return target
+
+    os.makedirs(os.path.join(target, "conf"), exist_ok=True)
+    for name in os.listdir(model_path):
+        # 清单记录的是原始 model.conf，不链接到生成目录
+        if name in ("conf", MANIFEST_NAME):
+            continue
+        link = os.path.join(target, name)
+        if not os.path.lexists(link):
+            os.symlink(os.path.join(model_path, name), link)
+    for name in os.listdir(os.path.join(model_path, "conf")):
+        if name == "model.conf":
+            continue
+        link = os.path.join(target, "conf", name)
+        if not os.path.lexists(link):
+            os.symlink(os.path.join(model_path, "conf", name), link)
+    # 最后写入 model.conf，它的存在标志目录已完整生成
+    tmp_path = os.path.join(target, "conf", f"model.conf.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(conf_text)
+    os.replace(tmp_path, os.path.join(target, "conf", "model.conf"))
+    return target
+
+
+def resolve_profile(model_path: str, profile_path: Optional[str]):
+    """
+    根据配置文件得到实际使用的模型目录和块大小
+
+    Args:
+        model_path (str): 原模型路径
+        profile_path (Optional[str]): 配置文件路径，None表示不使用配置
+
+    Returns:
+        tuple: (模型目录, 块大小或None)
+    """
+    if not profile_path:
+        return model_path, None
+    profile = load_profile(profile_path)
+    if profile is None:
+        return model_path, None
+    try:
+        model_dir = prepare_model_dir(model_path, profile["model_conf"])
+    except OSError as e:
+        print(f"生成配置模型目录失败，使用原模型配置: {e}")
+        model_dir = model_path
+    print(f"已加载识别配置: {profile_path}")
+    return model_dir, profile.get("chunk_frames")
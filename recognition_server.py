@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio 流式语音识别服务
+通过原始TCP或WebSocket接收PCM音频块，在有界线程池中运行
+AcceptWaveform（Vosk的C调用会释放GIL），并把部分/完整识别结果以JSON推送给客户端
+输入的采样率、声道数或采样格式与模型不同时，每个会话用一个流式重采样器（resampler.py）在解码线程中转换
+
+协议：
+- TCP: 客户端持续发送PCM字节，发送完毕后半关闭连接(EOF)；服务端每行返回一个JSON，输入格式由启动参数指定
+- WebSocket: 二进制消息为PCM数据，文本消息 {"eof": 1} 表示结束；服务端以文本消息返回JSON
+  发送音频前可以先发送 {"config": {"sample_rate": 48000, "channels": 2, "format": "float32"}} 声明输入格式
+- 健康检查(HTTP): GET /live 进程存活即返回200；GET /ready 模型加载、预热完成且识别端口全部开始监听后返回200，
+  之前返回503，响应体为预热耗时报告。模型在健康检查端口启动后才加载，识别端口在预热完成后才开始监听
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+from recognizer_pool import RecognizerPool
+from model_registry import resolve_model_path
+from resampler import make_resampler
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+class RecognitionServer:
+    """基于asyncio的流式识别服务"""
+
+    def __init__(self, pool: RecognizerPool, max_workers: int = 4, max_sessions: Optional[int] = None,
+                 queue_chunks: int = 8, chunk_bytes: int = 8000, input_rate: Optional[int] = None,
+                 input_channels: int = 1, input_format: str = "int16"):
+        """
+        初始化识别服务
+
+        Args:
+            pool (RecognizerPool): 共享模型的识别器池
+            max_workers (int): 执行AcceptWaveform的线程数
+            max_sessions (Optional[int]): 最大并发会话数，默认等于识别器池大小
+            queue_chunks (int): 每个会话待解码音频块队列的长度，队列满时停止读取socket以形成背压
+            chunk_bytes (int): 每次从socket读取的最大字节数
+            input_rate (Optional[int]): 客户端音频的默认采样率，默认等于模型采样率
+            input_channels (int): 客户端音频的默认声道数
+            input_format (str): 客户端音频的默认采样格式（int16 或 float32）
+        """
+        self.pool = pool
+        self.max_workers = max_workers
+        self.max_sessions = max_sessions or pool.max_size
+        self.queue_chunks = queue_chunks
+        self.chunk_bytes = chunk_bytes
+        self.input_config = {"sample_rate": input_rate or pool.sample_rate, "channels": input_channels,
+                             "format": input_format}
+        # 提前检查默认输入格式，参数错误在启动时就报出来
+        self._make_resampler(self.input_config)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="decoder")
+        self._sessions: Optional[asyncio.Semaphore] = None
+        self.active_sessions = 0
+        self.total_sessions = 0
+        # 识别端口全部开始监听后才置位；识别器池的预热完成不代表服务可以接受连接
+        self.ready = threading.Event()
+
+    def _make_resampler(self, config: dict):
+        """
+        按输入格式创建会话的重采样器，输入已是模型格式时返回None
+
+        Args:
+            config (dict): {"sample_rate", "channels", "format"}，缺少的字段使用服务默认值
+        """
+        config = dict(self.input_config, **config)
+        return make_resampler(int(config["sample_rate"]), self.pool.sample_rate,
+                              int(config["channels"]), config["format"])
+
+    @staticmethod
+    def _decode(recognizer, data: bytes, resampler=None) -> str:
+        """
+        在线程池中解码一个音频块，返回vosk生成的JSON字符串
+        重采样也在这里进行，事件循环线程只负责收发数据
+        """
+        if resampler is not None:
+            data = resampler.process(data)
+        if recognizer.AcceptWaveform(data):
+            return recognizer.Result()
+        return recognizer.PartialResult()
+
+    @staticmethod
+    def _finish(recognizer, resampler=None) -> str:
+        """
+        冲出重采样器中剩余的音频后返回最终结果
+        """
+        if resampler is not None:
+            recognizer.AcceptWaveform(resampler.flush())
+        return recognizer.FinalResult()
+
+    async def run_session(self, receive: Callable[[], Awaitable[Optional[bytes]]],
+                          send: Callable[[str], Awaitable[None]]):
+        """
+        处理一个识别会话，与具体传输方式无关
+
+        Args:
+            receive: 协程函数，返回下一个PCM块，连接结束时返回None；返回dict时表示新的输入格式声明
+            send: 协程函数，发送一条JSON文本
+        """
+        if self._sessions is None:
+            self._sessions = asyncio.Semaphore(self.max_sessions)
+        loop = asyncio.get_running_loop()
+
+        async with self._sessions:
+            recognizer = await loop.run_in_executor(self.executor, self.pool.acquire)
+            self.active_sessions += 1
+            self.total_sessions += 1
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_chunks)
+            resampler = self._make_resampler({})
+
+            async def reader():
+                # 队列满时put会挂起，不再从socket读取数据，TCP窗口随之填满，客户端被迫放慢
+                pending = b""
+                try:
+                    while True:
+                        data = await receive()
+                        if isinstance(data, dict):
+                            await queue.put(data)
+                            continue
+                        if not data:
+                            break
+                        # 保证每块都是完整的16位采样
+                        data = pending + data
+                        if len(data) % 2:
+                            data, pending = data[:-1], data[-1:]
+                        else:
+                            pending = b""
+                        if data:
+                            await queue.put(data)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    pass
+                await queue.put(None)
+
+            # 正在解码线程中使用识别器的调用；会话被取消时它可能还没结束
+            inflight = None
+
+            def decode(func, *args):
+                nonlocal inflight
+                inflight = loop.run_in_executor(self.executor, func, recognizer, *args)
+                # shield：会话任务被取消时不取消这个future，它一直反映解码线程是否仍在运行
+                return asyncio.shield(inflight)
+
+            reader_task = asyncio.ensure_future(reader())
+            try:
+                last_partial = None
+                while True:
+                    data = await queue.get()
+                    if data is None:
+                        break
+                    if isinstance(data, dict):
+                        # 格式声明：之前的音频先冲出旧重采样器，再切换到新格式
+                        if resampler is not None:
+                            result = await decode(self._decode, resampler.flush())
+                            if result != last_partial:
+                                await send(result)
+                            last_partial = None
+                        resampler = self._make_resampler(data)
+                        continue
+                    result = await decode(self._decode, data, resampler)
+                    # 部分结果没有变化时不重复推送
+                    if result != last_partial:
+                        await send(result)
+                        last_partial = result
+                final = await decode(self._finish, resampler)
+                await send(final)
+            finally:
+                reader_task.cancel()
+                self.active_sessions -= 1
+                if inflight is not None and not inflight.done():
+                    # 解码线程还在使用识别器，等它返回后再重置并归还，避免交给其他会话时被并发使用
+                    inflight.add_done_callback(lambda future: (future.cancelled() or future.exception(),
+                                                               self.pool.release(recognizer)))
+                else:
+                    self.pool.release(recognizer)
+
+    async def handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        处理原始TCP连接
+        """
+        async def receive():
+            return await reader.read(self.chunk_bytes)
+
+        async def send(text: str):
+            writer.write(text.replace("\n", " ").encode("utf-8") + b"\n")
+            await writer.drain()
+
+        try:
+            await self.run_session(receive, send)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"TCP会话出错: {e}", file=sys.stderr)
+        finally:
+            writer.close()
+
+    async def handle_websocket(self, websocket, path=None):
+        """
+        处理WebSocket连接
+        """
+        async def receive():
+            while True:
+                try:
+                    message = await websocket.recv()
+                except websockets.exceptions.ConnectionClosedOK:
+                    return None
+                if isinstance(message, bytes):
+                    return message
+                message = json.loads(message)
+                if message.get("eof"):
+                    return None
+                if isinstance(message.get("config"), dict):
+                    return message["config"]
+
+        try:
+            await self.run_session(receive, websocket.send)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            print(f"WebSocket会话出错: {e}", file=sys.stderr)
+
+    async def handle_health(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        处理健康检查HTTP请求：/live 和 /ready
+        """
+        try:
+            request_line = await reader.readline()
+            # 读完请求头，忽略内容
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+            if path == "/live":
+                status, body = 200, {"live": True}
+            elif path == "/ready":
+                body = self.pool.warmup.to_dict()
+                body["listening"] = self.ready.is_set()
+                body["active_sessions"] = self.active_sessions
+                status = 200 if self.ready.is_set() else 503
+            else:
+                status, body = 404, {"error": "not found"}
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            reason = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}[status]
+            writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "0.0.0.0", tcp_port: int = 2700, ws_port: int = 0,
+                    health_port: int = 0, prewarm: int = 0):
+        """
+        启动服务并一直运行
+
+        Args:
+            host (str): 监听地址
+            tcp_port (int): TCP端口，0表示不启用
+            ws_port (int): WebSocket端口，0表示不启用
+            health_port (int): 健康检查HTTP端口，0表示不启用
+            prewarm (int): 预热完成后预先创建的识别器数量
+        """
+        servers = []
+        if health_port:
+            servers.append(await asyncio.start_server(self.handle_health, host, health_port))
+            print(f"健康检查已启动: http://{host}:{health_port}/ready")
+        # 模型加载和预热在线程中进行，期间健康检查可以正常应答（/ready 返回503）
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, self.pool.load_model):
+            for server in servers:
+                server.close()
+            return
+        if prewarm:
+            await loop.run_in_executor(None, self.pool.prewarm, prewarm)
+        print(self.pool.warmup.report())
+        if tcp_port:
+            servers.append(await asyncio.start_server(self.handle_tcp, host, tcp_port))
+            print(f"TCP 识别服务已启动: {host}:{tcp_port}")
+        if ws_port:
+            if websockets is None:
+                print("警告：未安装 websockets，WebSocket 服务未启用 (pip install websockets)")
+            else:
+                servers.append(await websockets.serve(self.handle_websocket, host, ws_port))
+                print(f"WebSocket 识别服务已启动: ws://{host}:{ws_port}")
+        if len(servers) == (1 if health_port else 0):
+            print("错误：没有启用任何识别端口")
+            for server in servers:
+                server.close()
+            return
+        print(f"解码线程数: {self.max_workers}，最大并发会话数: {self.max_sessions}")
+        self.ready.set()
+        try:
+            await asyncio.Future()
+        finally:
+            self.ready.clear()
+            for server in servers:
+                server.close()
+            self.executor.shutdown(wait=False)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 流式语音识别服务")
+    parser.add_argument("-m", "--model", default="model", help="Vosk模型路径、名称或语言代码 (默认: model)")
+    parser.add_argument("--host", default="0.0.0.0", help="监听地址 (默认: 0.0.0.0)")
+    parser.add_argument("--tcp-port", type=int, default=2700, help="TCP端口，0表示不启用 (默认: 2700)")
+    parser.add_argument("--ws-port", type=int, default=2701, help="WebSocket端口，0表示不启用 (默认: 2701)")
+    parser.add_argument("--workers", type=int, default=4, help="解码线程数 (默认: 4)")
+    parser.add_argument("--max-sessions", type=int, default=16, help="最大并发会话数 (默认: 16)")
+    parser.add_argument("--health-port", type=int, default=0, help="健康检查HTTP端口，0表示不启用 (默认: 0)")
+    parser.add_argument("--prefetch", action="store_true", help="加载前把模型文件预取到页缓存")
+    parser.add_argument("--no-warm-up", action="store_true", help="跳过模型预热")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="模型采样率 (默认: 16000)")
+    parser.add_argument("--input-rate", type=int, default=None, help="客户端音频的采样率 (默认: 等于模型采样率)")
+    parser.add_argument("--input-channels", type=int, default=1, help="客户端音频的声道数 (默认: 1)")
+    parser.add_argument("--input-format", choices=["int16", "float32"], default="int16",
+                        help="客户端音频的采样格式 (默认: int16)")
+    args = parser.parse_args()
+
+    model_path = resolve_model_path(args.model)
+    if model_path is None:
+        print(f"错误：模型路径不存在: {args.model}")
+        return 1
+    pool = RecognizerPool(model_path, sample_rate=args.sample_rate, max_size=args.max_sessions,
+                          warm_up=not args.no_warm_up, prefetch=args.prefetch)
+
+    server = RecognitionServer(pool, max_workers=args.workers, max_sessions=args.max_sessions,
+                               input_rate=args.input_rate, input_channels=args.input_channels,
+                               input_format=args.input_format)
+    try:
+        asyncio.run(server.serve(args.host, args.tcp_port, args.ws_port, args.health_port,
+                                 prewarm=min(args.workers, args.max_sessions)))
+    except KeyboardInterrupt:
+        print("\n识别服务已停止")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
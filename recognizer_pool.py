@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享模型的识别器池
+同一进程内只加载一次Vosk模型，按会话租借预先创建好的KaldiRecognizer，
+并按词汇表/语法划分子池，归还时重置识别器状态
+加载模型后用合成音频预热（见 model_warmup.py），完成后 ready 才为True
+"""
+
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Union
+
+from model_manifest import validate_model
+from model_warmup import WarmupReport, prefetch_model_files, warm_up_recognizer
+
+
+class RecognizerPool:
+    """共享模型的KaldiRecognizer池"""
+
+    def __init__(self, model_path: str = "model", sample_rate: int = 16000, max_size: int = 8,
+                 model=None, enable_words: bool = True, warm_up: bool = True, prefetch: bool = False):
+        """
+        初始化识别器池
+
+        Args:
+            model_path (str): Vosk模型路径
+            sample_rate (int): 音频采样率
+            max_size (int): 池中识别器（空闲+租借中）的最大总数
+            model: 已加载的vosk.Model，提供时不再从model_path加载
+            enable_words (bool): 是否为识别器启用词级别结果
+            warm_up (bool): 加载后是否用合成音频预热，预创建的识别器也逐个预热
+            prefetch (bool): 加载前是否把模型文件预取到页缓存
+        """
+        if max_size < 1:
+            raise ValueError("max_size 必须大于0")
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.max_size = max_size
+        self.model = model
+        self.enable_words = enable_words
+        self.warm_up = warm_up
+        self.prefetch = prefetch
+        self.warmup = WarmupReport()
+        # 子池：语法键 -> 空闲识别器列表；OrderedDict记录最近使用顺序，满员时优先淘汰最久未用的子池
+        self._idle: "OrderedDict[Optional[str], List]" = OrderedDict()
+        self._leased: Dict[int, Optional[str]] = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.evicted = 0
+
+    @property
+    def ready(self) -> bool:
+        """模型已加载并预热完成，可以接收流量"""
+        return self.warmup.ready
+
+    def load_model(self) -> bool:
+        """
+        加载Vosk模型（整个池只加载一次）并预热
+
+        Returns:
+            bool: 加载成功返回True，失败返回False
+        """
+        if self.model is not None:
+            if not self.ready:
+                self._warm_up_model()
+            return True
+        if not os.path.exists(self.model_path):
+            print(f"错误：模型路径不存在: {self.model_path}")
+            return False
+        start = time.perf_counter()
+        problems = validate_model(self.model_path)
+        if problems:
+            print(f"错误：模型文件与清单不符: {'; '.join(problems[:5])}")
+            return False
+        if problems is not None:
+            self.warmup.add("validate", time.perf_counter() - start)
+        try:
+            from vosk import Model
+
+            if self.prefetch:
+                start = time.perf_counter()
+                files, size = prefetch_model_files(self.model_path)
+                self.warmup.add("prefetch", time.perf_counter() - start,
+                                prefetched_files=files, prefetched_mb=round(size / 1048576, 1))
+            print(f"正在加载模型: {self.model_path}")
+            start = time.perf_counter()
+            self.model = Model(self.model_path)
+            self.warmup.add("load", time.perf_counter() - start)
+            print("模型加载成功")
+        except Exception as e:
+            print(f"加载模型时出错: {e}")
+            return False
+        self._warm_up_model()
+        return True
+
+    def _warm_up_model(self):
+        """
+        用一个识别器预热模型，预热后放入默认子池，完成后标记就绪；预热失败不影响使用，只是首句会慢一些
+        """
+        if self.warm_up:
+            with self._cond:
+                try:
+                    recognizer = self._create(None)
+                    self.warmup.add("warm_up", warm_up_recognizer(recognizer, self.sample_rate))
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._idle.setdefault(None, []).append(recognizer)
+                except Exception as e:
+                    print(f"模型预热失败: {e}")
+        self.warmup.set_ready()
+
+    @staticmethod
+    def grammar_key(grammar: Union[None, str, List[str]]) -> Optional[str]:
+        """
+        把语法/词汇表规范化为子池的键
+
+        Args:
+            grammar: None（完整词典）、语法字符串或词汇列表
+
+        Returns:
+            Optional[str]: 子池键
+        """
+        if grammar is None or isinstance(grammar, str):
+            return grammar
+        return json.dumps(list(grammar), ensure_ascii=False)
+
+    def _create(self, key: Optional[str]):
+        """
+        创建一个新的识别器（调用方需持有锁并已预留名额）
+        """
+        from vosk import KaldiRecognizer
+
+        if key is None:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        else:
+            recognizer = KaldiRecognizer(self.model, self.sample_rate, key)
+        if self.enable_words:
+            recognizer.SetWords(True)
+        self.created += 1
+        return recognizer
+
+    def _restore_settings(self, recognizer):
+        """
+        恢复池配置的识别选项：租借者可能修改过 SetWords/SetPartialWords/SetMaxAlternatives，
+        不恢复的话会带给下一个从同一子池租借的会话
+        """
+        recognizer.SetWords(self.enable_words)
+        if hasattr(recognizer, "SetPartialWords"):
+            recognizer.SetPartialWords(False)
+        if hasattr(recognizer, "SetMaxAlternatives"):
+            recognizer.SetMaxAlternatives(0)
+
+    def _evict_idle(self, keep_key: Optional[str]) -> bool:
+        """
+        淘汰其他子池中最久未用的一个空闲识别器，为新的子池腾出名额
+        """
+        for key, idle in self._idle.items():
+            if key != keep_key and idle:
+                idle.pop()
+                self._size -= 1
+                self.evicted += 1
+                return True
+        return False
+
+    def prewarm(self, count: int, grammar: Union[None, str, List[str]] = None) -> int:
+        """
+        为指定语法预先创建空闲识别器，使会话启动时无需创建解码器
+
+        Args:
+            count (int): 希望子池中空闲识别器达到的数量（加载模型时预热的识别器也计算在内）
+            grammar: 子池对应的语法/词汇表
+
+        Returns:
+            int: 实际新创建的数量（受max_size限制）
+        """
+        if not self.load_model():
+            return 0
+        key = self.grammar_key(grammar)
+        created = 0
+        with self._cond:
+            idle = self._idle.setdefault(key, [])
+            while len(idle) < count and self._size < self.max_size:
+                self._size += 1
+                try:
+                    recognizer = self._create(key)
+                    if self.warm_up:
+                        # 每个识别器各自的解码器结构也是首次解码时才初始化
+                        self.warmup.add("warm_up_recognizers", warm_up_recognizer(recognizer, self.sample_rate))
+                    idle.append(recognizer)
+                except Exception:
+                    self._size -= 1
+                    raise
+                created += 1
+        return created
+
+    def acquire(self, grammar: Union[None, str, List[str]] = None, timeout: Optional[float] = None):
+        """
+        租借一个识别器
+
+        Args:
+            grammar: None（完整词典）、语法字符串或词汇列表
+            timeout (Optional[float]): 池已满时的最长等待秒数，None表示一直等待
+
+        Returns:
+            KaldiRecognizer: 可直接使用的识别器
+
+        Raises:
+            TimeoutError: 等待超时仍没有可用识别器
+        """
+        if self.model is None and not self.load_model():
+            raise RuntimeError(f"无法加载模型: {self.model_path}")
+        key = self.grammar_key(grammar)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    self._idle.move_to_end(key)
+                    recognizer = idle.pop()
+                    break
+                if self._size < self.max_size or self._evict_idle(key):
+                    self._size += 1
+                    try:
+                        recognizer = self._create(key)
+                    except Exception:
+                        self._size -= 1
+                        self._cond.notify()
+                        raise
+                    self._idle.setdefault(key, [])
+                    self._idle.move_to_end(key)
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("识别器池已满，等待超时")
+                self._cond.wait(remaining)
+            self._leased[id(recognizer)] = key
+        return recognizer
+
+    def release(self, recognizer):
+        """
+        归还识别器：重置解码状态并恢复池配置的识别选项后放回对应子池
+
+        Args:
+            recognizer: 由acquire租借的识别器
+        """
+        with self._cond:
+            if id(recognizer) not in self._leased:
+                raise ValueError("归还的识别器不属于此池或已被归还")
+            key = self._leased.pop(id(recognizer))
+            try:
+                recognizer.Reset()
+                self._restore_settings(recognizer)
+                self._idle.setdefault(key, []).append(recognizer)
+            except Exception:
+                # 重置失败的识别器直接丢弃，释放名额
+                self._size -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, grammar: Union[None, str, List[str]] = None, timeout: Optional[float] = None):
+        """
+        以上下文管理器的方式租借识别器，退出时自动归还
+
+        Args:
+            grammar: None（完整词典）、语法字符串或词汇列表
+            timeout (Optional[float]): 池已满时的最长等待秒数
+        """
+        recognizer = self.acquire(grammar, timeout)
+        try:
+            yield recognizer
+        finally:
+            self.release(recognizer)
+
+    def stats(self) -> dict:
+        """
+        获取池的统计信息
+
+        Returns:
+            dict: 总数、租借数、各子池空闲数及累计创建/淘汰次数
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "max_size": self.max_size,
+                "leased": len(self._leased),
+                "idle": {("<default>" if k is None else k[:40]): len(v) for k, v in self._idle.items()},
+                "created": self.created,
+                "evicted": self.evicted,
+                "ready": self.ready,
+            }
+
+
+def main():
+    """
+    主函数 - 测量会话启动耗时
+    """
+    import sys
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "model"
+    pool = RecognizerPool(model_path, max_size=4, prefetch=True)
+    if not pool.load_model():
+        return
+
+    pool.prewarm(4)
+    print(pool.warmup.report())
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        with pool.session():
+            pass
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"会话租借+归还平均耗时: {elapsed * 1000:.3f} ms")
+    print(f"池状态: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
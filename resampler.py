@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式重采样与格式转换前端
+把任意采样率（8/44.1/48 kHz 等）、任意声道数、int16 或 float32 的PCM转换为识别器需要的
+16位单声道PCM：先对各声道取平均下混，再用多相(polyphase)FIR滤波器按 L/M 有理倍率重采样
+
+滤波器状态（最近 T-1 个输入采样和下一个输出的相位）在块之间保留，所以任意切块的输出
+与一次性转换整段音频完全一致，块边界处没有爆音；每块的计算是一次向量化的 gather + 点积，
+不需要Python级的逐采样循环
+"""
+
+from math import gcd
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_FORMATS = {"int16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+
+
+def design_filter(up: int, down: int, zero_crossings: int = 16, rolloff: float = 0.9,
+                  beta: float = 8.6) -> np.ndarray:
+    """
+    设计重采样用的低通FIR（Kaiser窗 sinc），工作在上采样后的采样率上
+
+    Args:
+        up (int): 上采样倍数 L
+        down (int): 下采样倍数 M
+        zero_crossings (int): 单侧保留的 sinc 过零点个数，越大过渡带越窄、计算量越大
+        rolloff (float): 截止频率相对于较低奈奎斯特频率的比例
+        beta (float): Kaiser窗参数，8.6 约对应 80dB 阻带衰减
+
+    Returns:
+        np.ndarray: 滤波器系数（已乘以增益 L）
+    """
+    cutoff = rolloff * 0.5 / max(up, down)
+    # 半长取 M 的整数倍，群延迟正好是整数个输出采样，丢弃后时间轴不会有小数偏移
+    half = -(-int(np.ceil(zero_crossings / (2 * cutoff))) // down) * down
+    n = np.arange(-half, half + 1, dtype=np.float64)
+    return up * 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(len(n), beta)
+
+
+class StreamingResampler:
+    """保持滤波器状态的流式多相重采样器和下混器"""
+
+    def __init__(self, in_rate: int, out_rate: int = 16000, channels: int = 1, sample_format: str = "int16",
+                 zero_crossings: int = 16):
+        """
+        初始化重采样器
+
+        Args:
+            in_rate (int): 输入采样率
+            out_rate (int): 输出采样率（识别模型的采样率）
+            channels (int): 输入声道数，多声道按帧交织
+            sample_format (str): 输入采样格式，int16 或 float32（取值范围 -1.0~1.0）
+            zero_crossings (int): 滤波器单侧过零点个数
+        """
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"不支持的采样格式: {sample_format}（支持 {', '.join(SAMPLE_FORMATS)}）")
+        if in_rate <= 0 or out_rate <= 0 or channels <= 0:
+            raise ValueError("采样率和声道数必须为正数")
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+        self.sample_format = sample_format
+        self.dtype = SAMPLE_FORMATS[sample_format]
+        self.frame_bytes = self.dtype.itemsize * channels
+        # float32 输入放大到 int16 的数值范围，之后统一按 int16 截断输出
+        self._scale = 32768.0 if sample_format == "float32" else 1.0
+
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.passthrough = self.up == self.down and channels == 1 and sample_format == "int16"
+        self.convert_only = self.up == self.down
+
+        self._pending = b""
+        self.input_frames = 0
+        self.output_frames = 0
+        if self.convert_only:
+            return
+
+        h = design_filter(self.up, self.down, zero_crossings)
+        taps = -(-len(h) // self.up)
+        padded = np.concatenate([h, np.zeros(taps * self.up - len(h))])
+        # 第 p 相的系数为 h[p], h[p+L], h[p+2L], ...；按时间顺序反转后可与输入窗口直接点积
+        self._phases = np.ascontiguousarray(padded.reshape(taps, self.up).T[:, ::-1], dtype=np.float32)
+        self.taps = taps
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        # 已送入滤波器的输入采样数（不含历史中的初始零）和下一个输出采样的全局序号
+        self._consumed = 0
+        self._next_output = 0
+        # 滤波器的群延迟折算为输出采样数，丢弃开头这么多个输出使时间戳与原始音频对齐
+        self._delay = (len(h) - 1) // 2 // self.down
+        self._skip = self._delay
+        self._flushed = False
+
+    @property
+    def ratio(self) -> float:
+        return self.out_rate / self.in_rate
+
+    def _to_mono(self, data) -> np.ndarray:
+        """
+        把字节数据（含上一块剩下的不完整帧）解码为单声道 float32 采样
+        """
+        if self._pending:
+            data = self._pending + bytes(data)
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = bytes(data[usable:])
+        samples = np.frombuffer(data, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        else:
+            samples = samples.astype(np.float32)
+        if self._scale != 1.0:
+            samples *= self._scale
+        return samples
+
+    @staticmethod
+    def _to_int16(samples: np.ndarray) -> bytes:
+        np.clip(samples, -32768, 32767, out=samples)
+        return np.rint(samples).astype("<i2").tobytes()
+
+    def _filter(self, samples: np.ndarray) -> np.ndarray:
+        """
+        对一段新输入做多相滤波，返回这段输入能确定的所有输出采样
+        """
+        buffer = np.concatenate([self._history, samples])
+        end = self._consumed + len(samples)
+        # 第 k 个输出以第 (k*M)//L 个输入采样为窗口的最后一个采样，只计算窗口已完整的输出
+        last = (end * self.up - 1) // self.down if end else -1
+        outputs = np.arange(self._next_output, last + 1, dtype=np.int64)
+        if len(outputs):
+            positions = outputs * self.down
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)[
+                positions // self.up - self._consumed]
+            result = np.einsum("kt,kt->k", windows, self._phases[positions % self.up])
+            self._next_output = last + 1
+        else:
+            result = np.zeros(0, dtype=np.float32)
+        self._consumed = end
+        self._history = buffer[len(buffer) - (self.taps - 1):].copy() if self.taps > 1 else buffer[:0]
+        if self._skip:
+            dropped = min(self._skip, len(result))
+            result = result[dropped:]
+            self._skip -= dropped
+        return result
+
+    def process(self, data) -> bytes:
+        """
+        转换一块音频
+
+        Args:
+            data: 输入PCM（bytes、bytearray 或 memoryview），可以不是整帧
+
+        Returns:
+            bytes: 16位单声道PCM，长度与输入块不成固定比例，开头几块可能为空
+        """
+        if self.passthrough:
+            self.input_frames += len(data) // 2
+            self.output_frames += len(data) // 2
+            return bytes(data)
+        samples = self._to_mono(data)
+        self.input_frames += len(samples)
+        if not self.convert_only:
+            samples = self._filter(samples)
+        self.output_frames += len(samples)
+        return self._to_int16(samples)
+
+    def flush(self) -> bytes:
+        """
+        输入结束时调用：补零冲出滤波器中剩余的输出，总输出长度与输入时长相符
+
+        Returns:
+            bytes: 剩余的16位单声道PCM
+        """
+        if self.convert_only or self._flushed:
+            return b""
+        self._flushed = True
+        expected = -(-self.input_frames * self.up // self.down)
+        missing = expected - self.output_frames
+        if missing <= 0:
+            return b""
+        tail = self._filter(np.zeros(self.taps + -(-self._delay * self.down // self.up) + 1, dtype=np.float32))
+        tail = tail[:missing]
+        self.output_frames += len(tail)
+        return self._to_int16(tail)
+
+    def reset(self):
+        """
+        清除滤波器状态，开始一段新的音频
+        """
+        self._pending = b""
+        self.input_frames = 0
+        self.output_frames = 0
+        if not self.convert_only:
+            self._history[:] = 0
+            self._consumed = 0
+            self._next_output = 0
+            self._skip = self._delay
+            self._flushed = False
+
+
+def make_resampler(in_rate: int, out_rate: int = 16000, channels: int = 1,
+                   sample_format: str = "int16") -> Optional[StreamingResampler]:
+    """
+    按需创建重采样器：输入已经是目标格式时返回None，调用方直接送入识别器
+
+    Args:
+        in_rate (int): 输入采样率
+        out_rate (int): 输出采样率
+        channels (int): 输入声道数
+        sample_format (str): 输入采样格式
+
+    Returns:
+        Optional[StreamingResampler]: 重采样器或None
+    """
+    resampler = StreamingResampler(in_rate, out_rate, channels, sample_format)
+    return None if resampler.passthrough else resampler
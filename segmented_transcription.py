@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单个长录音的分段并行转写
+逐块解码一个两小时的录音只能以约1倍实时的速度串行进行。这里先用一遍能量VAD找出静音，
+在静音中点把录音切成约 --segment-seconds 长的段，各段在工作进程中用各自的 KaldiRecognizer 解码，
+最后按顺序拼接文本，词时间戳加上段起点的偏移得到全局时间（可用 --words-dir 导出 JSONL/SRT/WebVTT）
+
+切分点都在足够长的静音中间，每段的开头和结尾都带有静音，端点检测与串行解码时一致，
+识别结果与串行解码基本相同；bench/bench_segmented.py 在语料上对比两者的字错误率和耗时
+
+    python segmented_transcription.py long.wav -m model -j 8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from audio_buffers import SAMPLE_WIDTHS, accept_waveform, iter_chunks, open_raw_audio
+from batch_transcription import check_model, load_worker_model
+
+# 工作进程各自持有一份模型
+_worker_model = None
+_worker_model_error = None
+_worker_options = {}
+
+
+def _init_worker(model_path: str, model_rate: int, chunk_frames: int, sample_rate: int, channels: int,
+                 sample_format: str, words: bool):
+    """
+    工作进程初始化：加载一次Vosk模型
+
+    Args:
+        model_path (str): Vosk模型路径
+        model_rate (int): 识别器的采样率
+        chunk_frames (int): 每次送入识别器的帧数
+        sample_rate (int): 裸PCM文件的采样率（WAV文件以文件头为准）
+        channels (int): 裸PCM文件的声道数
+        sample_format (str): 裸PCM文件的采样格式
+        words (bool): 是否输出词级时间戳
+    """
+    global _worker_model, _worker_model_error, _worker_options
+    _worker_model, _worker_model_error = load_worker_model(model_path)
+    _worker_options = {"model_rate": model_rate, "chunk_frames": chunk_frames, "sample_rate": sample_rate,
+                       "channels": channels, "sample_format": sample_format, "words": words}
+
+
+def analyze_energy(path: str, sample_rate: int = 16000, channels: int = 1, sample_format: str = "int16",
+                   frame_ms: int = 20) -> Tuple[np.ndarray, int, int, int]:
+    """
+    流式计算整个文件每个分析帧的能量（多声道和 float32 先下混转换）
+
+    Args:
+        path (str): 音频文件路径
+        sample_rate (int): 裸PCM文件的采样率
+        channels (int): 裸PCM文件的声道数
+        sample_format (str): 裸PCM文件的采样格式
+        frame_ms (int): 分析帧长（毫秒）
+
+    Returns:
+        tuple: (每帧能量dBFS, 采样率, 总帧数, 每个分析帧的采样数)
+    """
+    from resampler import StreamingResampler
+    from vad import EnergyVAD
+
+    audio, rate, channels, sample_format, total_frames = open_raw_audio(path, sample_rate, channels, sample_format)
+    vad = EnergyVAD(rate, frame_ms)
+    converter = StreamingResampler(rate, rate, channels, sample_format)
+    energies = []
+    with audio:
+        # 块长取分析帧的整数倍，分析帧不跨块
+        for data in iter_chunks(audio, vad.frame_samples * 200, total_frames,
+                                SAMPLE_WIDTHS[sample_format] * channels):
+            energy_db, _ = vad.frame_features(converter.process(data))
+            energies.append(energy_db)
+    energy = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return energy, rate, total_frames, vad.frame_samples
+
+
+def find_split_points(energy_db: np.ndarray, frame_seconds: float, target_seconds: float = 60.0,
+                      min_silence: float = 0.3, threshold_db: float = 12.0,
+                      min_energy_db: float = -55.0) -> List[int]:
+    """
+    选择切分点：每段约 target_seconds 长，切在附近最长的静音中点；
+    附近没有足够长的静音时切在最安静的分析帧
+
+    Args:
+        energy_db (np.ndarray): 每个分析帧的能量
+        frame_seconds (float): 分析帧时长
+        target_seconds (float): 目标段长
+        min_silence (float): 可作为切分点的最短静音
+        threshold_db (float): 低于噪声基底加这么多dB视为静音
+        min_energy_db (float): 静音阈值的下限（dBFS）
+
+    Returns:
+        List[int]: 切分点所在的分析帧序号
+    """
+    n = len(energy_db)
+    target = max(1, int(target_seconds / frame_seconds))
+    if n <= target * 3 // 2:
+        return []
+    floor = float(np.percentile(energy_db, 10))
+    silent = energy_db < max(min_energy_db, floor + threshold_db)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    lengths = ends - starts
+    keep = lengths >= max(1, int(min_silence / frame_seconds))
+    centers = (starts[keep] + ends[keep]) // 2
+    lengths = lengths[keep]
+
+    cuts = []
+    last = 0
+    while n - last > target * 3 // 2:
+        lo, hi = last + target // 2, min(n - 1, last + target * 3 // 2)
+        candidates = np.flatnonzero((centers > lo) & (centers <= hi))
+        if len(candidates):
+            cut = int(centers[candidates[np.argmax(lengths[candidates])]])
+        else:
+            cut = lo + int(np.argmin(energy_db[lo:hi]))
+        cuts.append(cut)
+        last = cut
+    return cuts
+
+
+def plan_segments(path: str, segment_seconds: float = 60.0, min_silence: float = 0.3, sample_rate: int = 16000,
+                  channels: int = 1, sample_format: str = "int16") -> Tuple[List[Tuple[int, int]], int, int]:
+    """
+    把文件切分为若干段
+
+    Returns:
+        tuple: ([(起始帧, 结束帧), ...], 采样率, 总帧数)
+    """
+    energy, rate, total_frames, frame_samples = analyze_energy(path, sample_rate, channels, sample_format)
+    cuts = find_split_points(energy, frame_samples / rate, segment_seconds, min_silence)
+    bounds = [0] + [cut * frame_samples for cut in cuts] + [total_frames]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)], rate, total_frames
+
+
+def decode_segment(task) -> dict:
+    """
+    在工作进程中解码一段音频
+
+    Args:
+        task (tuple): (段序号, 文件路径, 起始帧, 结束帧)
+
+    Returns:
+        dict: {"index", "texts", "results", "decode_time"}，results 为带词时间戳的完整结果（段内时间）
+    """
+    from vosk import KaldiRecognizer
+    from resampler import make_resampler
+
+    index, path, start_frame, end_frame = task
+    if _worker_model_error:
+        raise RuntimeError(_worker_model_error)
+    options = _worker_options
+    start = time.perf_counter()
+    audio, rate, channels, sample_format, _ = open_raw_audio(path, options["sample_rate"], options["channels"],
+                                                             options["sample_format"])
+    frame_bytes = SAMPLE_WIDTHS[sample_format] * channels
+    texts = []
+    results = []
+    with audio:
+        audio.seek(audio.tell() + start_frame * frame_bytes)
+        resampler = make_resampler(rate, options["model_rate"], channels, sample_format)
+        recognizer = KaldiRecognizer(_worker_model, options["model_rate"])
+        if options["words"]:
+            recognizer.SetWords(True)
+
+        def collect(raw):
+            result = json.loads(raw)
+            if result.get("text"):
+                texts.append(result["text"])
+                if options["words"]:
+                    results.append(result)
+
+        for data in iter_chunks(audio, options["chunk_frames"], end_frame - start_frame, frame_bytes):
+            if accept_waveform(recognizer, resampler.process(data) if resampler else data):
+                collect(recognizer.Result())
+        if resampler and accept_waveform(recognizer, resampler.flush()):
+            collect(recognizer.Result())
+        collect(recognizer.FinalResult())
+    return {"index": index, "texts": texts, "results": results, "decode_time": time.perf_counter() - start}
+
+
+def transcribe_long_file(path: str, model_path: str = "model", processes: Optional[int] = None,
+                         segment_seconds: float = 60.0, min_silence: float = 0.3, chunk_frames: int = 4000,
+                         model_rate: int = 16000, sample_rate: int = 16000, channels: int = 1,
+                         sample_format: str = "int16", words_dir: Optional[str] = None,
+                         word_formats=None) -> dict:
+    """
+    分段并行转写一个长录音
+
+    Args:
+        path (str): 音频文件路径
+        model_path (str): Vosk模型路径
+        processes (Optional[int]): 工作进程数，默认为CPU核心数
+        segment_seconds (float): 目标段长（秒），段数应明显多于进程数以便负载均衡
+        min_silence (float): 可作为切分点的最短静音（秒）
+        chunk_frames (int): 每次送入识别器的帧数
+        model_rate (int): 识别器的采样率
+        sample_rate (int): 裸PCM文件的采样率
+        channels (int): 裸PCM文件的声道数
+        sample_format (str): 裸PCM文件的采样格式
+        words_dir (Optional[str]): 词级时间戳的输出目录，None表示不导出
+        word_formats: 词级导出格式，默认全部
+
+    Returns:
+        dict: 转写结果，包含文本、音频时长、分段数、墙钟耗时、各段解码耗时之和和实时率
+
+    Raises:
+        RuntimeError: 工作进程加载模型失败
+    """
+    start = time.perf_counter()
+    segments, rate, total_frames = plan_segments(path, segment_seconds, min_silence, sample_rate,
+                                                 channels, sample_format)
+    plan_time = time.perf_counter() - start
+
+    exporter = None
+    if words_dir:
+        from word_export import EXPORT_FORMATS, WordExporter, output_prefixes
+        exporter = WordExporter(output_prefixes([path], words_dir)[path], word_formats or EXPORT_FORMATS)
+
+    tasks = [(i, path, seg_start, seg_end) for i, (seg_start, seg_end) in enumerate(segments)]
+    processes = max(1, min(processes or os.cpu_count() or 1, len(tasks)))
+    texts = []
+    decode_time = 0.0
+    try:
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(model_path, model_rate, chunk_frames, sample_rate, channels,
+                                            sample_format, exporter is not None)) as pool:
+            # 按段的顺序取回结果，先完成的后续段在结果队列中等待，拼接和导出始终按时间顺序进行
+            for segment in pool.imap(decode_segment, tasks, chunksize=1):
+                texts.extend(segment["texts"])
+                decode_time += segment["decode_time"]
+                if exporter is not None:
+                    offset = segments[segment["index"]][0] / rate
+                    for result in segment["results"]:
+                        exporter.add_result(result, offset)
+    finally:
+        word_stats = exporter.close() if exporter is not None else None
+
+    wall = time.perf_counter() - start
+    duration = total_frames / float(rate) if rate else 0.0
+    record = {
+        "file": path,
+        "text": " ".join(texts),
+        "duration": round(duration, 3),
+        "segments": len(segments),
+        "processes": processes,
+        "plan_time": round(plan_time, 3),
+        "decode_time": round(decode_time, 3),
+        "wall_time": round(wall, 3),
+        "rtf": round(wall / duration, 4) if duration > 0 else None,
+        "speedup": round(decode_time / wall, 2) if wall > 0 else None,
+    }
+    if exporter is not None:
+        record["confidence"] = word_stats
+        record["word_files"] = exporter.paths
+    return record
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="Vosk 长录音分段并行转写")
+    parser.add_argument("input", help="音频文件（WAV/PCM）")
+    parser.add_argument("-m", "--model", default="model", help="Vosk模型路径 (默认: model)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="工作进程数 (默认: CPU核心数)")
+    parser.add_argument("--segment-seconds", type=float, default=60.0, help="目标段长（秒）(默认: 60)")
+    parser.add_argument("--min-silence", type=float, default=0.3, help="可作为切分点的最短静音（秒）(默认: 0.3)")
+    parser.add_argument("--chunk-frames", type=int, default=4000, help="每次送入识别器的帧数 (默认: 4000)")
+    parser.add_argument("--model-rate", type=int, default=16000, help="模型采样率 (默认: 16000)")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="裸PCM文件的采样率 (默认: 16000)")
+    parser.add_argument("--channels", type=int, default=1, help="裸PCM文件的声道数 (默认: 1)")
+    parser.add_argument("--sample-format", choices=["int16", "float32"], default="int16",
+                        help="裸PCM文件的采样格式 (默认: int16)")
+    parser.add_argument("--words-dir", default=None, help="词级时间戳和置信度的输出目录")
+    parser.add_argument("--word-formats", default="jsonl,srt,vtt", help="词级导出格式，逗号分隔 (默认: jsonl,srt,vtt)")
+    args = parser.parse_args()
+
+    error = check_model(args.model)
+    if error:
+        print(f"错误：{error}", file=sys.stderr)
+        return 1
+    if not os.path.isfile(args.input):
+        print(f"错误：音频文件不存在: {args.input}", file=sys.stderr)
+        return 1
+
+    formats = [name.strip() for name in args.word_formats.split(",") if name.strip()]
+    try:
+        record = transcribe_long_file(args.input, args.model, args.jobs, args.segment_seconds, args.min_silence,
+                                      args.chunk_frames, args.model_rate, args.sample_rate, args.channels,
+                                      args.sample_format, args.words_dir, formats)
+    except KeyboardInterrupt:
+        print("\n用户中断转写", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"转写失败: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(record, ensure_ascii=False))
+    print(f"{record['segments']} 段，{record['processes']} 个进程，音频 {record['duration']:.1f}s，"
+          f"耗时 {record['wall_time']:.1f}s（切分 {record['plan_time']:.1f}s），"
+          f"并行加速 {record['speedup']}x", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
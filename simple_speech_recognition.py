@@ -5,57 +5,8 @@
 使用Vosk最小参数模型
 """
 
-import sys
-import os
 import json
-import pyaudio
-from vosk import Model, KaldiRecognizer
-
-def list_available_models():
-    """
-    列出可用的模型
-    """
-    models_dir = "models"
-    if not os.path.exists(models_dir):
-        return []
-    
-    models = []
-    for item in os.listdir(models_dir):
-        model_path = os.path.join(models_dir, item)
-        if os.path.isdir(model_path):
-            models.append(item)
-    return models
-
-def select_model():
-    """
-    选择要使用的模型
-    """
-    # 列出models目录中的模型
-    available_models = list_available_models()
-    if not available_models:
-        print("错误：未找到任何模型")
-        print("请先运行 download_model.py 下载模型")
-        return None
-    
-    print("\n可用的模型：")
-    for i, model in enumerate(available_models, 1):
-        print(f"{i}. {model}")
-    
-    while True:
-        try:
-            choice = input(f"\n请选择模型 (1-{len(available_models)}): ")
-            index = int(choice) - 1
-            if 0 <= index < len(available_models):
-                selected_model = os.path.join("models", available_models[index])
-                print(f"已选择模型: {selected_model}")
-                return selected_model
-            else:
-                print("无效选择，请重新输入")
-        except ValueError:
-            print("请输入有效的数字")
-        except KeyboardInterrupt:
-            print("\n取消选择")
-            return None
+from model_registry import get_model, select_model
 
 def main():
     """
@@ -71,7 +22,9 @@ def main():
     # 加载模型
     print("正在加载模型...")
     try:
-        model = Model(model_path)
+        from vosk import KaldiRecognizer
+        
+        model = get_model(model_path)
         rec = KaldiRecognizer(model, 16000)
         print("模型加载成功！")
     except Exception as e:
@@ -81,6 +34,9 @@ def main():
     # 设置音频
     print("正在设置音频...")
     try:
+        # 延迟导入，只有实时采集才需要PyAudio
+        import pyaudio
+        
         p = pyaudio.PyAudio()
         stream = p.open(
             format=pyaudio.paInt16,
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时统计
+记录从进程启动到模型就绪、音频就绪、首次解码和首个部分结果的耗时
+"""
+
+import os
+import time
+from typing import List, Optional, Tuple
+
+
+def process_uptime() -> float:
+    """
+    当前进程已运行的秒数（包含解释器启动和模块导入），无法获取时返回0
+
+    Returns:
+        float: 进程运行时长（秒）
+    """
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class StartupTimer:
+    """启动阶段计时器"""
+
+    def __init__(self):
+        # 以进程启动时刻为零点
+        self.origin = time.perf_counter() - process_uptime()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str, once: bool = True):
+        """
+        记录一个阶段完成的时刻
+
+        Args:
+            name (str): 阶段名称
+            once (bool): 为True时同名阶段只记录第一次
+        """
+        if once and self.get(name) is not None:
+            return
+        self.marks.append((name, time.perf_counter()))
+
+    def get(self, name: str) -> Optional[float]:
+        """
+        获取阶段相对进程启动的耗时（秒），未记录时返回None
+        """
+        for mark_name, t in self.marks:
+            if mark_name == name:
+                return t - self.origin
+        return None
+
+    def report(self) -> str:
+        """
+        生成启动耗时报告
+
+        Returns:
+            str: 每个阶段一行的文本报告
+        """
+        lines = ["启动耗时报告 (自进程启动起):"]
+        previous = self.origin
+        for name, t in self.marks:
+            lines.append(f"  {name:<16} {(t - self.origin) * 1000:9.1f} ms  (+{(t - previous) * 1000:.1f} ms)")
+            previous = t
+        return "\n".join(lines)
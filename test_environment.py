@@ -137,9 +137,21 @@ def test_model_files():
         if missing_files:
             print(f"✗ 缺少必要文件: {', '.join(missing_files)}")
             return False
+        
+        try:
+            from model_manifest import validate_model
+            problems = validate_model("model")
+        except ImportError:
+            problems = None
+        if problems:
+            for problem in problems[:10]:
+                print(f"✗ {problem}")
+            return False
+        if problems is None:
+            print("✓ 模型文件完整（未找到清单，可运行 'python model_manifest.py model' 生成）")
         else:
-            print("✓ 模型文件完整")
-            return True
+            print("✓ 模型文件完整（已按清单校验）")
+        return True
     else:
         print("✗ 未找到模型文件夹 'model'")
         print("请运行 'python download_model.py' 下载模型")
@@ -179,6 +191,231 @@ def test_vosk_functionality():
         print(f"✗ Vosk 功能测试失败: {e}")
         return False
 
+def test_zero_copy_ingestion():
+    """
+    测试零拷贝音频读取：稳定运行后每个音频块不应再分配内存
+    """
+    print("\n=== 零拷贝音频读取检查 ===")
+    
+    try:
+        import io
+        import tracemalloc
+        from audio_buffers import accept_waveform, iter_chunks
+        from audio_pipeline import RingBuffer
+    except ImportError as e:
+        print(f"✗ 无法导入零拷贝读取模块: {e}")
+        raise AssertionError(f"无法导入零拷贝读取模块: {e}")
+    
+    class Sink:
+        """只统计字节数的识别器替身"""
+        def __init__(self):
+            self.total = 0
+        
+        def AcceptWaveform(self, data):
+            self.total += len(data)
+            return False
+    
+    chunk_frames = 4096
+    chunk_bytes = chunk_frames * 2
+    count = 200
+    sink = Sink()
+    
+    # 文件路径：readinto 到复用的缓冲区
+    chunks = iter_chunks(io.BytesIO(bytes(chunk_bytes * (count + 10))), chunk_frames)
+    for _ in range(10):
+        accept_waveform(sink, next(chunks))
+    tracemalloc.start()
+    for data in chunks:
+        accept_waveform(sink, data)
+    file_current, file_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    # 实时路径：环形缓冲区 readinto 到解码线程复用的缓冲区
+    ring = RingBuffer(chunk_bytes * 4)
+    block = bytes(chunk_bytes)
+    out = memoryview(bytearray(chunk_bytes))
+    for _ in range(10):
+        ring.write(block)
+        accept_waveform(sink, out[:ring.readinto(out)])
+    tracemalloc.start()
+    for _ in range(count):
+        ring.write(block)
+        accept_waveform(sink, out[:ring.readinto(out)])
+    ring_current, ring_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    print(f"文件读取 {count} 块: 残留 {file_current} 字节，峰值 {file_peak} 字节")
+    print(f"环形缓冲区 {count} 块: 残留 {ring_current} 字节，峰值 {ring_peak} 字节")
+    # 峰值小于一个音频块说明没有按块复制数据，残留很小说明稳定运行时没有累积分配
+    ok = max(file_peak, ring_peak) < chunk_bytes and max(file_current, ring_current) < 1024
+    print("✓ 稳定运行时每块零分配" if ok else f"✗ 检测到按块分配内存（块大小 {chunk_bytes} 字节）")
+    assert ok, "稳定运行时按块分配了内存"
+
+def test_model_download():
+    """
+    测试模型下载器：用本地HTTP服务模拟模型服务器，检查分段并行、断点续传、SHA-256校验和缓存
+    """
+    print("\n=== 模型下载器检查 ===")
+    
+    try:
+        import hashlib
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        import download_model
+    except ImportError as e:
+        print(f"✗ 无法导入下载模块: {e}")
+        raise AssertionError(f"无法导入下载模块: {e}")
+    
+    payload = os.urandom(3 * 1024 * 1024 + 123)
+    digest = hashlib.sha256(payload).hexdigest()
+    requests = []
+    
+    class RangeHandler(BaseHTTPRequestHandler):
+        """支持Range请求的最小文件服务；fail_after 不为None时每个响应只发送这么多字节就断开"""
+        fail_after = None
+        
+        def do_GET(self):
+            header = self.headers.get("Range")
+            start, end = 0, len(payload) - 1
+            if header:
+                first, last = header.split("=", 1)[1].split("-")
+                start, end = int(first), min(int(last), end)
+            requests.append((start, end))
+            body = payload[start:end + 1]
+            self.send_response(206 if header else 200)
+            if header:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            limit = RangeHandler.fail_after
+            self.wfile.write(body if limit is None or len(body) <= 1 else body[:limit])
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/model.zip"
+    saved_segment_size = download_model.MIN_SEGMENT_SIZE
+    download_model.MIN_SEGMENT_SIZE = 256 * 1024
+    checks = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, "cache")
+            target = os.path.join(tmp, "model.zip")
+            
+            # 第一次下载中途断开，留下 .part 和进度文件
+            RangeHandler.fail_after = 256 * 1024
+            try:
+                download_model.download_file(url, target, digest, segments=4, cache_dir=cache_dir, retries=0)
+                checks.append(("中断时报错", False))
+            except OSError:
+                checks.append(("中断时报错", os.path.exists(target + ".part.json")))
+            
+            # 续传只请求剩余部分
+            RangeHandler.fail_after = None
+            del requests[:]
+            result = download_model.download_file(url, target, digest, segments=4, cache_dir=cache_dir)
+            with open(target, 'rb') as f:
+                checks.append(("续传后内容一致", result == digest and f.read() == payload))
+            checks.append(("只请求剩余部分", all(start > 0 for start, _ in requests[1:]) and len(requests) == 5))
+            
+            # 缓存命中时不再访问服务器
+            del requests[:]
+            other = os.path.join(tmp, "copy.zip")
+            download_model.download_file(url, other, cache_dir=cache_dir)
+            checks.append(("缓存命中", not requests and os.path.getsize(other) == len(payload)))
+            
+            # 哈希不符时报错且不留下文件
+            bad = os.path.join(tmp, "bad.zip")
+            try:
+                download_model.download_file(url, bad, "0" * 64, cache_dir=None)
+                checks.append(("校验失败时报错", False))
+            except ValueError:
+                checks.append(("校验失败时报错", not os.path.exists(bad) and not os.path.exists(bad + ".part")))
+            
+            # 未指定哈希时不写入缓存
+            unpinned_cache = os.path.join(tmp, "unpinned")
+            download_model.download_file(url, os.path.join(tmp, "unpinned.zip"), cache_dir=unpinned_cache)
+            checks.append(("未校验不写缓存", not os.path.exists(unpinned_cache)))
+    finally:
+        download_model.MIN_SEGMENT_SIZE = saved_segment_size
+        server.shutdown()
+        server.server_close()
+    
+    print()
+    for name, ok in checks:
+        print(f"{'✓' if ok else '✗'} {name}")
+    for name, ok in checks:
+        assert ok, name
+
+def test_model_extraction():
+    """
+    测试模型解压：并行解压到临时目录后重命名，生成的清单能发现被修改或缺失的文件
+    """
+    print("\n=== 模型解压检查 ===")
+    
+    try:
+        import tempfile
+        import zipfile
+        import download_model
+        from model_manifest import validate_model
+    except ImportError as e:
+        print(f"✗ 无法导入解压模块: {e}")
+        raise AssertionError(f"无法导入解压模块: {e}")
+    
+    checks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "vosk-model-test.zip")
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("vosk-model-test/", "")
+            zf.writestr("vosk-model-test/am/final.mdl", os.urandom(300000))
+            zf.writestr("vosk-model-test/graph/HCLr.fst", bytes(500000))
+            zf.writestr("vosk-model-test/ivector/final.ie", os.urandom(1000))
+            zf.writestr("vosk-model-test/conf/model.conf", "--min-active=200\n")
+        models_dir = os.path.join(tmp, "models")
+        model_dir = os.path.join(models_dir, "vosk-model-test")
+        
+        extracted = download_model.extract_model(zip_path, models_dir, workers=4)
+        checks.append(("解压到目标目录", extracted == [model_dir] and os.listdir(models_dir) == ["vosk-model-test"]))
+        checks.append(("清单校验通过", validate_model(model_dir) == [] and validate_model(model_dir, deep=True) == []))
+        
+        with open(os.path.join(model_dir, "ivector", "final.ie"), 'ab') as f:
+            f.write(b"x")
+        os.remove(os.path.join(model_dir, "graph", "HCLr.fst"))
+        checks.append(("发现修改和缺失", len(validate_model(model_dir)) == 2))
+        
+        # 重新解压替换旧目录
+        download_model.extract_model(zip_path, models_dir)
+        checks.append(("重新解压后完整", validate_model(model_dir) == []))
+        
+        unsafe = os.path.join(tmp, "unsafe.zip")
+        with zipfile.ZipFile(unsafe, 'w') as zf:
+            zf.writestr("../escape.txt", "x")
+        try:
+            download_model.extract_model(unsafe, models_dir)
+            checks.append(("拒绝不安全路径", False))
+        except ValueError:
+            checks.append(("拒绝不安全路径", not os.path.exists(os.path.join(tmp, "escape.txt"))
+                           and os.listdir(models_dir) == ["vosk-model-test"]))
+    
+    print()
+    for name, ok in checks:
+        print(f"{'✓' if ok else '✗'} {name}")
+    for name, ok in checks:
+        assert ok, name
+
+def _passed(test_func):
+    """
+    运行一项检查：返回布尔值的检查以返回值为准，用 assert 的检查以是否抛出 AssertionError 为准
+    """
+    try:
+        return test_func() is not False
+    except AssertionError as e:
+        print(f"✗ 检查未通过: {e}")
+        return False
+
 def main():
     """
     主测试函数
@@ -194,14 +431,17 @@ def main():
         ("依赖包", test_dependencies),
         ("音频设备", test_audio_devices),
         ("模型文件", test_model_files),
-        ("Vosk功能", test_vosk_functionality)
+        ("Vosk功能", test_vosk_functionality),
+        ("零拷贝读取", test_zero_copy_ingestion),
+        ("模型下载", test_model_download),
+        ("模型解压", test_model_extraction)
     ]
     
     results = []
     
     for test_name, test_func in tests:
         try:
-            result = test_func()
+            result = _passed(test_func)
             results.append((test_name, result))
         except Exception as e:
             print(f"\n测试 '{test_name}' 时发生错误: {e}")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于能量和过零率的轻量语音活动检测(VAD)
+放在识别器之前，静音块不送入解码器；带拖尾(hangover)保证端点检测能看到句尾静音，
+带预录(pre-roll)缓冲保证词首不被截掉
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class EnergyVAD:
+    """能量/过零率VAD门控"""
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, threshold_db: float = 12.0,
+                 min_energy_db: float = -55.0, zcr_threshold: float = 0.25, min_speech_frames: int = 2,
+                 hangover_ms: int = 800, preroll_ms: int = 300, noise_adapt: float = 0.05):
+        """
+        初始化VAD
+
+        Args:
+            sample_rate (int): 音频采样率
+            frame_ms (int): 分析帧长（毫秒）
+            threshold_db (float): 高于噪声基底多少dB判为语音
+            min_energy_db (float): 判为语音的最低绝对能量（dBFS）
+            zcr_threshold (float): 过零率高于此值的较弱帧（清辅音）也计为语音
+            min_speech_frames (int): 一个块中至少多少个语音帧才判为语音块
+            hangover_ms (int): 语音结束后继续送入解码器的时长，应大于端点规则的最短尾部静音
+            preroll_ms (int): 语音开始前补送的静音时长
+            noise_adapt (float): 噪声基底的更新速率
+        """
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db
+        self.min_energy_db = min_energy_db
+        self.zcr_threshold = zcr_threshold
+        self.min_speech_frames = min_speech_frames
+        self.hangover_bytes = sample_rate * hangover_ms // 1000 * 2
+        self.preroll_bytes = sample_rate * preroll_ms // 1000 * 2
+        self.noise_adapt = noise_adapt
+        self.noise_floor_db: Optional[float] = None
+        self._active = False
+        self._hangover_left = 0
+        self._preroll = b""
+        self.chunks = 0
+        self.skipped_chunks = 0
+        self.skipped_bytes = 0
+        self.segments = 0
+
+    def frame_features(self, data: bytes):
+        """
+        计算每个分析帧的能量(dBFS)和过零率
+
+        Args:
+            data (bytes): 16位单声道PCM数据
+
+        Returns:
+            tuple: (能量数组, 过零率数组)
+        """
+        samples = np.frombuffer(data, dtype=np.int16)
+        n = len(samples) // self.frame_samples * self.frame_samples
+        if n == 0:
+            samples = np.pad(samples, (0, self.frame_samples - len(samples)))
+            n = self.frame_samples
+        frames = samples[:n].reshape(-1, self.frame_samples).astype(np.float32)
+        energy = np.mean(frames * frames, axis=1)
+        energy_db = 10.0 * np.log10(energy / (32768.0 * 32768.0) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(self.frame_samples - 1)
+        return energy_db, zcr
+
+    def is_speech(self, data: bytes) -> bool:
+        """
+        判断一个音频块是否包含语音
+
+        Args:
+            data (bytes): 16位单声道PCM数据
+
+        Returns:
+            bool: 包含语音返回True
+        """
+        energy_db, zcr = self.frame_features(data)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(np.median(energy_db))
+        threshold = max(self.min_energy_db, self.noise_floor_db + self.threshold_db)
+        voiced = energy_db > threshold
+        # 清辅音能量较低但过零率高，放宽一半阈值
+        unvoiced = (energy_db > threshold - self.threshold_db / 2) & (zcr > self.zcr_threshold)
+        speech = int(np.count_nonzero(voiced | unvoiced)) >= self.min_speech_frames
+        # 噪声基底向下立即跟踪，向上只在静音时缓慢抬升
+        median = float(np.median(energy_db))
+        if median < self.noise_floor_db:
+            self.noise_floor_db = median
+        elif not speech and not self._active:
+            self.noise_floor_db += self.noise_adapt * (median - self.noise_floor_db)
+        return speech
+
+    def process(self, data: bytes) -> Optional[bytes]:
+        """
+        门控一个音频块
+
+        Args:
+            data (bytes): 16位单声道PCM数据
+
+        Returns:
+            Optional[bytes]: 需要送入解码器的数据（语音开始时包含预录部分），静音时返回None
+        """
+        self.chunks += 1
+        if self.is_speech(data):
+            self._hangover_left = self.hangover_bytes
+            if not self._active:
+                self._active = True
+                self.segments += 1
+                data = self._preroll + data
+                self._preroll = b""
+            return data
+
+        if self._active:
+            self._hangover_left -= len(data)
+            if self._hangover_left <= 0:
+                self._active = False
+            return data
+
+        if self.preroll_bytes:
+            self._preroll = (self._preroll + data)[-self.preroll_bytes:]
+        self.skipped_chunks += 1
+        self.skipped_bytes += len(data)
+        return None
+
+    def reset(self):
+        """
+        清除门控状态（保留噪声基底）
+        """
+        self._active = False
+        self._hangover_left = 0
+        self._preroll = b""
+
+    def stats(self) -> dict:
+        """
+        获取VAD统计信息
+
+        Returns:
+            dict: 总块数、跳过的静音块数和时长、语音段数以及当前噪声基底
+        """
+        return {
+            "chunks": self.chunks,
+            "skipped_chunks": self.skipped_chunks,
+            "skipped_seconds": round(self.skipped_bytes / 2 / self.sample_rate, 2),
+            "speech_segments": self.segments,
+            "noise_floor_db": round(self.noise_floor_db, 1) if self.noise_floor_db is not None else None,
+        }
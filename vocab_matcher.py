@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于Aho-Corasick自动机的自定义词汇匹配
+词汇表只在加载时构建一次索引，之后每次匹配的耗时只与文本长度（和命中数）线性相关，
+与词汇表大小无关
+"""
+
+from typing import Iterable, List, Tuple
+
+
+class VocabMatcher:
+    """Aho-Corasick多模式匹配器，返回最左最长且互不重叠的匹配"""
+
+    def __init__(self, words: Iterable[str] = ()):
+        """
+        构建自动机
+
+        Args:
+            words (Iterable[str]): 词汇列表，空串会被忽略
+        """
+        # 每个节点：子节点字典、失败指针、以该节点结尾的词长度、输出链（最近的有词的后缀节点）
+        self._goto = [{}]
+        self._fail = [0]
+        self._length = [0]
+        self._output = [0]
+        self.words = []
+        for word in words:
+            self._add(word)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _add(self, word: str):
+        if not word:
+            return
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._length.append(0)
+                self._output.append(0)
+            node = nxt
+        if not self._length[node]:
+            self.words.append(word)
+        self._length[node] = len(word)
+
+    def _build(self):
+        # 按层次(BFS)计算失败指针，第一层节点的失败指针为根
+        goto, fail, length, output = self._goto, self._fail, self._length, self._output
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[child] = f
+                output[child] = f if length[f] else output[f]
+
+    def find(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        查找文本中最左最长、互不重叠的词汇匹配
+
+        Args:
+            text (str): 识别文本
+
+        Returns:
+            List[Tuple[int, int, str]]: (起始位置, 结束位置, 词汇) 列表，按位置排序
+        """
+        goto, fail, length, output = self._goto, self._fail, self._length, self._output
+        # 每个起始位置上最长的匹配长度
+        longest = {}
+        node = 0
+        for end, ch in enumerate(text, 1):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = node if length[node] else output[node]
+            while hit:
+                n = length[hit]
+                start = end - n
+                if n > longest.get(start, 0):
+                    longest[start] = n
+                hit = output[hit]
+
+        matches = []
+        pos = 0
+        for start in sorted(longest):
+            if start >= pos:
+                pos = start + longest[start]
+                matches.append((start, pos, text[start:pos]))
+        return matches
+
+    def matched_words(self, text: str) -> List[str]:
+        """
+        返回文本中命中的词汇（按出现顺序去重）
+
+        Args:
+            text (str): 识别文本
+
+        Returns:
+            List[str]: 命中的词汇列表
+        """
+        return list(dict.fromkeys(word for _, _, word in self.find(text)))
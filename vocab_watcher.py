@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词汇表文件监视
+后台线程定期 stat 词汇表文件，修改时间、大小或inode变化且稳定一个周期后（避免读到写了一半的文件）
+调用回调；编辑器"写临时文件再重命名"的保存方式同样能检测到
+"""
+
+import os
+import threading
+from typing import Callable, Optional
+
+
+class VocabWatcher:
+    """轮询方式的文件变化监视器"""
+
+    def __init__(self, path: str, on_change: Callable[[], None], interval: float = 1.0):
+        """
+        初始化监视器
+
+        Args:
+            path (str): 监视的文件路径
+            on_change (Callable[[], None]): 文件变化时在监视线程中调用
+            interval (float): 检查间隔（秒）
+        """
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def start(self):
+        """
+        启动监视线程
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="vocab-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        pending = None
+        while not self._stop.wait(self.interval):
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                pending = None
+                continue
+            if signature != pending:
+                # 第一次看到新状态，等下一个周期确认写入已完成
+                pending = signature
+                continue
+            self._signature = signature
+            pending = None
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"\n处理词汇表变化时出错: {e}")
+
+    def stop(self):
+        """
+        停止监视线程
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
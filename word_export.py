@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词级时间戳与置信度导出
+把识别器开启 SetWords(True) 后每个完整结果中的词时间戳和置信度，逐句写出为：
+
+- JSONL：每个词一行 {"word", "start", "end", "conf", "utt"}
+- SRT / WebVTT 字幕：每句话按时长和字数切分为若干条字幕
+
+每句话到达时立即写出并丢弃，内存占用与录音长度无关；置信度统计（均值、标准差、分位数、低置信度词数）
+只累加计数和固定分桶的直方图。JSONL 用预先拼好的格式串加 C 实现的字符串转义生成，
+不对每个词调用 json.dumps
+"""
+
+import os
+import json
+import math
+from collections import Counter
+from json.encoder import encode_basestring
+from typing import Dict, List, Optional, Union
+
+EXPORT_FORMATS = ("jsonl", "srt", "vtt")
+# 置信度直方图的分桶数，分位数按桶估计
+CONFIDENCE_BINS = 100
+
+
+def format_timestamp(seconds: float, separator: str = ",") -> str:
+    """
+    把秒数格式化为字幕时间戳
+
+    Args:
+        seconds (float): 秒数
+        separator (str): 秒与毫秒的分隔符，SRT 为逗号，WebVTT 为句点
+
+    Returns:
+        str: HH:MM:SS,mmm
+    """
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+class ConfidenceStats:
+    """词置信度的流式统计"""
+
+    def __init__(self, low_threshold: float = 0.5):
+        """
+        Args:
+            low_threshold (float): 低于该值的词计为低置信度
+        """
+        self.low_threshold = low_threshold
+        self.words = 0
+        self.utterances = 0
+        self.low = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.minimum = None
+        self.speech_seconds = 0.0
+        self.bins = [0] * CONFIDENCE_BINS
+
+    def add(self, conf: float, duration: float = 0.0):
+        self.words += 1
+        self.total += conf
+        self.total_sq += conf * conf
+        if self.minimum is None or conf < self.minimum:
+            self.minimum = conf
+        if conf < self.low_threshold:
+            self.low += 1
+        self.speech_seconds += duration
+        self.bins[min(CONFIDENCE_BINS - 1, max(0, int(conf * CONFIDENCE_BINS)))] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        按直方图估计分位数（误差不超过一个桶宽，即0.01）
+        """
+        if not self.words:
+            return None
+        target = q * self.words
+        cumulative = 0
+        for index, count in enumerate(self.bins):
+            cumulative += count
+            if cumulative >= target and count:
+                return round((index + 0.5) / CONFIDENCE_BINS, 3)
+        return 1.0
+
+    def to_dict(self) -> dict:
+        if not self.words:
+            return {"words": 0, "utterances": self.utterances}
+        mean = self.total / self.words
+        variance = max(0.0, self.total_sq / self.words - mean * mean)
+        return {
+            "words": self.words,
+            "utterances": self.utterances,
+            "mean": round(mean, 4),
+            "std": round(math.sqrt(variance), 4),
+            "min": round(self.minimum, 4),
+            "p10": self.quantile(0.1),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "low_confidence_words": self.low,
+            "low_confidence_ratio": round(self.low / self.words, 4),
+            "speech_seconds": round(self.speech_seconds, 2),
+        }
+
+
+class JsonlWordWriter:
+    """每个词一行的JSONL"""
+
+    extension = "jsonl"
+
+    def __init__(self, f):
+        self.f = f
+
+    def write_utterance(self, index: int, words: List[dict]):
+        encode = encode_basestring
+        self.f.write("".join(
+            f'{{"word":{encode(w["word"])},"start":{w["start"]:.3f},"end":{w["end"]:.3f},'
+            f'"conf":{w.get("conf", 1.0):.4f},"utt":{index}}}\n'
+            for w in words))
+
+    def close(self):
+        pass
+
+
+class SubtitleWriter:
+    """SRT字幕，每句话按最长时长和字数切分为多条"""
+
+    extension = "srt"
+    separator = ","
+
+    def __init__(self, f, max_seconds: float = 7.0, max_chars: int = 42):
+        """
+        Args:
+            f: 文本文件对象
+            max_seconds (float): 每条字幕的最长时长
+            max_chars (int): 每条字幕的最多字数（不含空格）
+        """
+        self.f = f
+        self.max_seconds = max_seconds
+        self.max_chars = max_chars
+        self.cues = 0
+        self.write_header()
+
+    def write_header(self):
+        pass
+
+    def write_cue(self, start: float, end: float, text: str):
+        self.cues += 1
+        self.f.write(f"{self.cues}\n{format_timestamp(start, self.separator)} --> "
+                     f"{format_timestamp(end, self.separator)}\n{text}\n\n")
+
+    def write_utterance(self, index: int, words: List[dict]):
+        cue: List[str] = []
+        chars = 0
+        start = end = 0.0
+        for w in words:
+            word = w["word"]
+            if cue and (w["end"] - start > self.max_seconds or chars + len(word) > self.max_chars):
+                self.write_cue(start, end, " ".join(cue))
+                cue = []
+                chars = 0
+            if not cue:
+                start = w["start"]
+            cue.append(word)
+            chars += len(word)
+            end = w["end"]
+        if cue:
+            self.write_cue(start, end, " ".join(cue))
+
+    def close(self):
+        pass
+
+
+class VttWriter(SubtitleWriter):
+    """WebVTT字幕"""
+
+    extension = "vtt"
+    separator = "."
+
+    def write_header(self):
+        self.f.write("WEBVTT\n\n")
+
+
+WRITERS = {"jsonl": JsonlWordWriter, "srt": SubtitleWriter, "vtt": VttWriter}
+
+
+def output_prefixes(paths: List[str], words_dir: str) -> Dict[str, str]:
+    """
+    为每个输入文件生成导出路径前缀：在 words_dir 下保留输入相对于共同上级目录的路径，
+    不同目录的同名文件不会互相覆盖；去掉扩展名后仍重名的（如 x.wav 和 x.pcm）保留扩展名
+
+    Args:
+        paths (List[str]): 音频文件路径
+        words_dir (str): 导出目录
+
+    Returns:
+        Dict[str, str]: 输入路径到导出前缀的映射
+    """
+    absolute = [os.path.abspath(path) for path in paths]
+    try:
+        root = os.path.commonpath([os.path.dirname(path) for path in absolute]) if absolute else ""
+    except ValueError:
+        # Windows 上不同盘符的文件没有共同上级目录
+        root = ""
+    relative = [os.path.relpath(path, root) if root else os.path.splitdrive(path)[1].lstrip("\\/")
+                for path in absolute]
+    stems = [os.path.splitext(name)[0] for name in relative]
+    counts = Counter(stems)
+    return {path: os.path.join(words_dir, stem if counts[stem] == 1 else name)
+            for path, name, stem in zip(paths, relative, stems)}
+
+
+class WordExporter:
+    """把识别器的完整结果逐句写出为词级JSONL/SRT/WebVTT，并统计置信度"""
+
+    def __init__(self, output_prefix: str, formats=EXPORT_FORMATS, low_confidence: float = 0.5):
+        """
+        Args:
+            output_prefix (str): 输出路径前缀，各格式写到 <前缀>.<扩展名>
+            formats: 要导出的格式，可选 jsonl、srt、vtt
+            low_confidence (float): 低置信度阈值
+        """
+        unknown = set(formats) - set(WRITERS)
+        if unknown:
+            raise ValueError(f"不支持的导出格式: {', '.join(sorted(unknown))}")
+        directory = os.path.dirname(output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.paths: Dict[str, str] = {}
+        self._files = []
+        self.writers = []
+        for name in formats:
+            path = f"{output_prefix}.{WRITERS[name].extension}"
+            # 大缓冲区，长录音逐句写出时减少系统调用
+            f = open(path, 'w', encoding='utf-8', buffering=1 << 16)
+            self._files.append(f)
+            self.writers.append(WRITERS[name](f))
+            self.paths[name] = path
+        self.stats = ConfidenceStats(low_confidence)
+        self.utterances = 0
+
+    def add_result(self, result: Union[str, dict], offset: float = 0.0) -> int:
+        """
+        写出一个完整结果中的词
+
+        Args:
+            result: 识别器 Result()/FinalResult() 返回的JSON字符串或解析后的字典
+            offset (float): 加到词时间戳上的偏移（秒），用于分段识别后拼接为全局时间
+
+        Returns:
+            int: 写出的词数
+        """
+        if isinstance(result, str):
+            result = json.loads(result)
+        words = result.get("result")
+        if not words:
+            return 0
+        if offset:
+            words = [dict(w, start=w["start"] + offset, end=w["end"] + offset) for w in words]
+        stats = self.stats
+        for w in words:
+            stats.add(w.get("conf", 1.0), w["end"] - w["start"])
+        stats.utterances += 1
+        for writer in self.writers:
+            writer.write_utterance(self.utterances, words)
+        self.utterances += 1
+        return len(words)
+
+    def close(self) -> dict:
+        """
+        关闭输出文件
+
+        Returns:
+            dict: 置信度统计
+        """
+        for writer in self.writers:
+            writer.close()
+        for f in self._files:
+            f.close()
+        self._files = []
+        return self.stats.to_dict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()